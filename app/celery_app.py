@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 from django.conf import settings
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
@@ -7,6 +8,30 @@ app = Celery('dip', broker=settings.CELERY_BROKER_URL)
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
+
+@worker_process_init.connect
+def reset_process_clients(**kwargs):
+    """
+    Give each prefork child its own clients instead of sockets inherited from the parent
+
+    Celery's Django fixup already closes plain DB connections; the psycopg pool,
+    Redis client, rate limiter scripts and response cache are reset here.
+    """
+    from django.db import connections
+    from dip.clients.cache import reset_response_cache
+    from dip.clients.rate_limit import reset_rate_limiters
+    from dip.redis_client import reset_redis_client
+
+    # An inherited psycopg pool has lost its worker threads, and closing it would
+    # terminate the parent's connections, so only drop it; the child builds its own
+    for connection in connections.all():
+        getattr(connection, '_connection_pools', {}).pop(connection.alias, None)
+
+    reset_redis_client()
+    reset_rate_limiters()
+    reset_response_cache()
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
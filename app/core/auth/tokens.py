@@ -13,11 +13,27 @@ from oauth2_provider.settings import oauth2_settings
 
 import settings
 
+from core.auth.validators import invalidate_cached_access_token
+
+_application = None
+
+
+def get_application():
+    """The single OAuth2 Application, loaded once per process"""
+    global _application
+    if _application is None:
+        _application = Application.objects.get()
+    return _application
+
+
+def clear_application_cache():
+    global _application
+    _application = None
 
 
 def get_or_create_tokens_for_user(user):
     try:
-        application = Application.objects.get()
+        application = get_application()
     except Application.DoesNotExist:
         return {"error": "OAuth2 Application not found"}
 
@@ -88,6 +104,7 @@ def refresh_access_token(refresh_token_value: str):
             refresh_token.save()
 
             old_access_token.revoke()
+            invalidate_cached_access_token(old_access_token)
 
             return {
                 "access_token": new_access_token.token,
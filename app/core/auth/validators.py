@@ -0,0 +1,57 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
+from oauth2_provider.models import AccessToken
+from oauth2_provider.oauth2_validators import OAuth2Validator
+
+# Upper bound for a cached token, so user changes (e.g. deactivation) are picked up
+ACCESS_TOKEN_CACHE_TTL = 5 * 60
+
+
+def token_checksum(token: str) -> str:
+    """Same SHA-256 checksum oauth2_provider stores in ``AccessToken.token_checksum``"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def access_token_cache_key(checksum: str) -> str:
+    return f'oauth2:access-token:{checksum}'
+
+
+def get_cached_access_token(token: str):
+    """
+    Access token with its user and application, from the cache when possible
+
+    Cached entries never outlive the token itself, and are deleted when the token
+    is revoked or saved (see ``core.signals``). Unknown tokens are not cached.
+    """
+    checksum = token_checksum(token)
+    key = access_token_cache_key(checksum)
+
+    access_token = cache.get(key)
+    if access_token is not None:
+        return access_token
+
+    access_token = (
+        AccessToken.objects.select_related('application', 'user')
+        .filter(token_checksum=checksum)
+        .first()
+    )
+    if access_token is not None and access_token.expires:
+        ttl = min(ACCESS_TOKEN_CACHE_TTL, int((access_token.expires - timezone.now()).total_seconds()))
+        if ttl > 0:
+            cache.set(key, access_token, ttl)
+
+    return access_token
+
+
+def invalidate_cached_access_token(access_token):
+    checksum = access_token.token_checksum or token_checksum(access_token.token)
+    cache.delete(access_token_cache_key(checksum))
+
+
+class CachedOAuth2Validator(OAuth2Validator):
+    """Validator that serves bearer token lookups from the cache instead of Postgres"""
+
+    def _load_access_token(self, token):
+        return get_cached_access_token(token)
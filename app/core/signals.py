@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from oauth2_provider.models import AccessToken, Application
+
+from core.auth.tokens import clear_application_cache
+from core.auth.validators import access_token_cache_key, invalidate_cached_access_token
+
+
+@receiver(post_save, sender=AccessToken)
+@receiver(post_delete, sender=AccessToken)
+def invalidate_access_token_cache(sender, instance, **kwargs):
+    invalidate_cached_access_token(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_access_tokens(sender, instance, created, update_fields=None, **kwargs):
+    """Cached tokens carry the user, so drop them when the user changes"""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    checksums = AccessToken.objects.filter(
+        user=instance, expires__gt=timezone.now()
+    ).values_list('token_checksum', flat=True)
+    cache.delete_many([access_token_cache_key(checksum) for checksum in checksums])
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_application_cache(sender, instance, **kwargs):
+    clear_application_cache()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DipConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dip'
+
+    def ready(self):
+        from dip import signals  # noqa: F401
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from dip.db import db_sync_to_async
+from dip.models import ScrapingSession
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCheckpoint:
+    """
+    Resume point of a crawl, saved on its ``ScrapingSession`` as pages reach the database
+
+    The spider registers every page with the paper ids it yields, and the pipeline
+    reports the ids it has committed. A page is done once all of its ids are committed
+    or dropped. Relevance pages are fetched concurrently, so each finished offset is
+    kept. Bulk pages are sequential, so the token advances past a page only after
+    every earlier page is done. The committed paper ids are kept as well, so a
+    resumed crawl skips papers from a page that was only partly written.
+    """
+
+    def __init__(self, session_id: Optional[int], state: Optional[Dict[str, Any]] = None,
+                 continuation_token: Optional[str] = None):
+        state = state or {}
+        self.session_id = session_id
+        self.done_offsets = set(state.get('offsets') or [])
+        self.seen_ids = set(state.get('seen_ids') or [])
+        self.token = continuation_token
+
+        self.pending: Dict[Any, set] = {}
+        self.page_of: Dict[str, Any] = {}
+        # Bulk pages in fetch order, with the token that continues after each
+        self.bulk_pages: 'OrderedDict[int, Optional[str]]' = OrderedDict()
+        self.changed = False
+        self.save_lock = asyncio.Lock()
+
+    @classmethod
+    def load(cls, session_id: int) -> 'CrawlCheckpoint':
+        session = ScrapingSession.objects.filter(id=session_id).values('checkpoint', 'continuation_token').first() or {}
+        return cls(session_id, session.get('checkpoint'), session.get('continuation_token'))
+
+    def is_seen(self, paper_id: str) -> bool:
+        """Whether the paper is already committed or pending in another page"""
+        return paper_id in self.seen_ids or paper_id in self.page_of
+
+    def start_page(self, key, paper_ids: Iterable[str], next_token: Optional[str] = None, bulk: bool = False):
+        """Register a page before its items are yielded; ``key`` is the offset or bulk page number"""
+        ids = {paper_id for paper_id in paper_ids if paper_id}
+        self.pending[key] = ids
+        for paper_id in ids:
+            self.page_of[paper_id] = key
+        if bulk:
+            self.bulk_pages[key] = next_token
+        if not ids:
+            self._finish_page(key)
+
+    def discard(self, paper_id: str):
+        """The spider dropped the paper, so its page no longer waits for it"""
+        self._release(paper_id)
+
+    def commit(self, paper_ids: Iterable[str]) -> bool:
+        """The pipeline wrote these papers; returns whether that finished a page"""
+        finished = False
+        for paper_id in paper_ids:
+            if paper_id in self.page_of:
+                self.seen_ids.add(paper_id)
+                self.changed = True
+                finished = self._release(paper_id) or finished
+        return finished
+
+    def _release(self, paper_id: str) -> bool:
+        key = self.page_of.pop(paper_id, None)
+        if key is None:
+            return False
+        ids = self.pending[key]
+        ids.discard(paper_id)
+        if ids:
+            return False
+        self._finish_page(key)
+        return True
+
+    def _finish_page(self, key):
+        del self.pending[key]
+        self.changed = True
+
+        if key not in self.bulk_pages:
+            self.done_offsets.add(key)
+            return
+
+        while self.bulk_pages:
+            first = next(iter(self.bulk_pages))
+            if first in self.pending:
+                break
+            self.token = self.bulk_pages.pop(first)
+
+    def state(self) -> Dict[str, Any]:
+        return {'offsets': sorted(self.done_offsets), 'seen_ids': sorted(self.seen_ids)}
+
+    async def save(self):
+        """Persist the checkpoint if it moved; failures are logged, never raised into the pipeline"""
+        if not self.session_id:
+            return
+
+        async with self.save_lock:
+            if not self.changed:
+                return
+            self.changed = False
+            state, token = self.state(), self.token
+            try:
+                await db_sync_to_async(ScrapingSession.objects.filter(id=self.session_id).update)(
+                    checkpoint=state, continuation_token=token
+                )
+            except Exception as e:
+                self.changed = True
+                logger.warning(f"Could not save checkpoint of session {self.session_id}: {e}")
@@ -0,0 +1,138 @@
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from dip.clients.semantic_scholar import PAPER_BATCH_SIZE, SemanticScholarAPI
+from dip.models import CitationEdge, ScholarRawRecord, ScrapingSession
+
+logger = logging.getLogger(__name__)
+
+# Only the ids of neighbouring papers are needed to extend the graph
+GRAPH_FIELDS = "paperId,citations.paperId,references.paperId"
+
+
+def paper_neighbours(data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Ids of the papers ``data`` references and of those citing it"""
+    references = [paper['paperId'] for paper in data.get('references') or [] if paper and paper.get('paperId')]
+    citations = [paper['paperId'] for paper in data.get('citations') or [] if paper and paper.get('paperId')]
+    return references, citations
+
+
+def fan_out_cap(depth: int) -> int:
+    """Neighbours followed from each paper at ``depth``; the last cap applies to deeper levels"""
+    caps = settings.CITATION_GRAPH['FAN_OUT']
+    return caps[min(depth, len(caps) - 1)]
+
+
+def insert_edges(edges: Iterable[Tuple[str, str]]) -> int:
+    """Bulk insert edges, skipping ones already stored; returns how many were sent"""
+    rows = [CitationEdge(paper_id=paper_id, cited_id=cited_id) for paper_id, cited_id in set(edges)]
+    CitationEdge.objects.bulk_create(
+        rows, ignore_conflicts=True, batch_size=settings.CITATION_GRAPH['EDGE_BATCH_SIZE']
+    )
+    return len(rows)
+
+
+def session_seed_ids(session: ScrapingSession) -> List[str]:
+    """Paper ids of the session's results, following a coalesced session to its crawl"""
+    return list(
+        ScholarRawRecord.objects.filter(scraping_session_id=session.results_session_id or session.id)
+        .exclude(semantic_scholar_id=None)
+        .values_list('semantic_scholar_id', flat=True)
+    )
+
+
+class CitationGraphCrawler:
+    """
+    Breadth-first expansion of the citation graph around a set of seed papers
+
+    The frontier is a queue of ``(paper_id, depth)``; papers of one depth are fetched
+    in paper/batch calls of up to 500 ids, and every reference and citation returned
+    becomes an edge. From each fetched paper at most ``fan_out_cap(depth)`` unvisited
+    neighbours join the next depth, and no more than ``max_papers`` papers are fetched
+    in total. Papers at ``max_depth`` are only reached, not fetched.
+    """
+
+    def __init__(self, max_depth: int, max_papers: Optional[int] = None, api: Optional[SemanticScholarAPI] = None):
+        self.max_depth = max_depth
+        self.max_papers = max_papers or settings.CITATION_GRAPH['MAX_PAPERS']
+        self.api = api or SemanticScholarAPI()
+
+        self.frontier: deque = deque()
+        self.visited = set()
+        self.fetched = 0
+        self.edges = 0
+        # Deepest level fetched so far; the seeds are depth 0
+        self.depth_reached = 0
+
+    def crawl(self, seed_ids: Iterable[str]) -> Dict[str, int]:
+        for paper_id in seed_ids:
+            if paper_id not in self.visited:
+                self.visited.add(paper_id)
+                self.frontier.append((paper_id, 0))
+
+        while self.frontier and self.fetched < self.max_papers:
+            depth, batch = self.next_batch()
+            self.expand(depth, batch)
+
+        summary = {
+            'papers_fetched': self.fetched,
+            'papers_reached': len(self.visited),
+            'edges': self.edges,
+            'depth_reached': self.depth_reached,
+            'frontier_left': len(self.frontier),
+        }
+        logger.info(f"Citation graph crawl finished: {summary}")
+        return summary
+
+    def next_batch(self) -> Tuple[int, List[str]]:
+        """Pop up to one batch request worth of papers, all of the same depth"""
+        depth = self.frontier[0][1]
+        size = min(PAPER_BATCH_SIZE, self.max_papers - self.fetched)
+        batch = []
+        while self.frontier and self.frontier[0][1] == depth and len(batch) < size:
+            batch.append(self.frontier.popleft()[0])
+        return depth, batch
+
+    def expand(self, depth: int, batch: List[str]):
+        details = self.api.get_papers_batch(batch, fields=GRAPH_FIELDS)
+        self.fetched += len(batch)
+        self.depth_reached = max(self.depth_reached, depth)
+
+        edges = []
+        follow = depth + 1 < self.max_depth
+        cap = fan_out_cap(depth)
+
+        for paper_id, data in details.items():
+            references, citations = paper_neighbours(data)
+            edges.extend((paper_id, cited_id) for cited_id in references)
+            edges.extend((citing_id, paper_id) for citing_id in citations)
+
+            if not follow:
+                continue
+            followed = 0
+            for neighbour in references + citations:
+                if followed >= cap:
+                    break
+                if neighbour not in self.visited:
+                    self.visited.add(neighbour)
+                    self.frontier.append((neighbour, depth + 1))
+                    followed += 1
+
+        self.edges += insert_edges(edges)
+        logger.info(
+            f"Depth {depth}: fetched {len(details)} of {len(batch)} papers, "
+            f"{len(edges)} edges, frontier {len(self.frontier)}"
+        )
+
+
+def expand_session_citations(session_id: int, depth: int, max_papers: Optional[int] = None) -> Dict[str, Any]:
+    """Expand the citation graph from a session's papers up to ``depth`` hops"""
+    session = ScrapingSession.objects.get(id=session_id)
+    depth = max(1, min(depth, settings.CITATION_GRAPH['MAX_DEPTH']))
+    seed_ids = session_seed_ids(session)
+
+    summary = CitationGraphCrawler(depth, max_papers).crawl(seed_ids)
+    return {'session_id': session_id, 'depth': depth, 'seeds': len(seed_ids), **summary}
@@ -1,3 +1,4 @@
 from .semantic_scholar import SemanticScholarAPI
+from .async_semantic_scholar import AsyncSemanticScholarAPI
 
-__all__ = ['SemanticScholarAPI']
+__all__ = ['SemanticScholarAPI', 'AsyncSemanticScholarAPI']
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Collection, List, Dict, Optional, Any, Tuple
+
+import httpx
+from django.conf import settings
+
+from .semantic_scholar import (
+    SemanticScholarAPI,
+    AUTHOR_BATCH_SIZE,
+    AUTHOR_DETAIL_FIELDS,
+    PAPER_BATCH_SIZE,
+    PAPER_DETAIL_FIELDS,
+    build_bulk_search_params,
+    build_search_params,
+    chunked,
+)
+from .cache import get_response_cache
+from .rate_limit import get_rate_limiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSemanticScholarAPI:
+    """
+    Non-blocking client for Semantic Scholar Academic Graph API
+
+    Mirrors the method surface of ``SemanticScholarAPI``. Requests share one pooled
+    ``httpx.AsyncClient``, take tokens from the shared rate limiter and at most
+    ``MAX_IN_FLIGHT`` of them are outstanding at once.
+    """
+
+    BASE_URL = SemanticScholarAPI.BASE_URL
+    RATE_LIMIT_BACKOFF = SemanticScholarAPI.RATE_LIMIT_BACKOFF
+    MAX_RETRIES = SemanticScholarAPI.MAX_RETRIES
+    MAX_IN_FLIGHT = 4
+    PAGE_SIZE = 100
+    RETRY_STATUSES = {500, 502, 503, 504}
+
+    def __init__(self, api_key: Optional[str] = None, max_in_flight: Optional[int] = None):
+        self.api_key = api_key or settings.SEMANTIC_SCHOLAR_API_KEY
+        self.max_in_flight = max_in_flight or self.MAX_IN_FLIGHT
+        self.rate_limiter = get_rate_limiter(self.api_key)
+        self.cache = get_response_cache()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create pooled HTTP client on first use"""
+        if self._client is None:
+            headers = {"User-Agent": "DIP-Scholar-Scraper/1.0"}
+            if self.api_key:
+                headers["x-api-key"] = self.api_key
+
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                headers=headers,
+                timeout=30,
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _rate_limit(self):
+        """Take a token from the shared rate limiter without blocking the event loop"""
+        await self.rate_limiter.async_wait()
+
+    async def _make_request(self,
+                            endpoint: str,
+                            params: Dict[str, Any],
+                            json: Optional[Dict[str, Any]] = None) -> Any:
+        """Make API request with caching, rate limiting, in-flight window and error handling"""
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, endpoint, params, json)
+            if cached is not None:
+                return cached
+
+        attempt = 0
+
+        while True:
+            async with self._in_flight:
+                await self._rate_limit()
+
+                try:
+                    logger.debug(f"Making request to: {endpoint} with params: {params}")
+                    if json is not None:
+                        response = await self._get_client().post(endpoint, params=params, json=json)
+                    else:
+                        response = await self._get_client().get(endpoint, params=params)
+                except httpx.HTTPError as e:
+                    logger.error(f"Request failed: {e}")
+                    raise
+
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"), self.RATE_LIMIT_BACKOFF)
+                logger.warning(f"Rate limit exceeded, backing off for {retry_after:.0f} seconds...")
+                await asyncio.to_thread(self.rate_limiter.penalize, retry_after)
+                continue
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.MAX_RETRIES:
+                attempt += 1
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                logger.error(f"HTTP error {response.status_code}: {e}")
+                raise
+
+            data = response.json()
+            if self.cache:
+                await asyncio.to_thread(self.cache.set, endpoint, params, json, data)
+            return data
+
+    async def search_papers(self, query: str, **kwargs) -> Dict[str, Any]:
+        """Search for papers, see ``SemanticScholarAPI.search_papers`` for arguments"""
+        return await self._make_request("paper/search", build_search_params(query=query, **kwargs))
+
+    async def search_papers_bulk(self, query: str, token: Optional[str] = None, **filters) -> Dict[str, Any]:
+        """Search papers with the bulk endpoint, see ``SemanticScholarAPI.search_papers_bulk``"""
+        return await self._make_request("paper/search/bulk", build_bulk_search_params(query, token, **filters))
+
+    async def iter_bulk_search(self,
+                               query: str,
+                               total_limit: Optional[int] = None,
+                               token: Optional[str] = None,
+                               **filters) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Iterate bulk search pages, yielding ``(papers, next_token)``"""
+        fetched = 0
+
+        while total_limit is None or fetched < total_limit:
+            response = await self.search_papers_bulk(query, token=token, **filters)
+            papers = response.get("data") or []
+            token = response.get("token")
+
+            if total_limit is not None:
+                papers = papers[:total_limit - fetched]
+            fetched += len(papers)
+
+            logger.info(f"Bulk search page: {len(papers)} papers, {fetched} total, more: {bool(token)}")
+            yield papers, token
+
+            if not token or not papers:
+                break
+
+    async def get_paper_details(self, paper_id: str) -> Dict[str, Any]:
+        """Get detailed information about a specific paper"""
+        return await self._make_request(f"paper/{paper_id}", {"fields": PAPER_DETAIL_FIELDS})
+
+    async def get_author_details(self, author_id: str) -> Dict[str, Any]:
+        """Get detailed information about an author"""
+        return await self._make_request(f"author/{author_id}", {"fields": AUTHOR_DETAIL_FIELDS})
+
+    async def _fetch_batch_chunk(self,
+                                 endpoint: str,
+                                 chunk: List[str],
+                                 fields: str) -> List[Optional[Dict[str, Any]]]:
+        try:
+            return await self._make_request(endpoint, {"fields": fields}, json={"ids": chunk}) or []
+        except httpx.HTTPError as e:
+            logger.error(f"Batch request to {endpoint} failed for {len(chunk)} ids: {e}")
+            return []
+
+    async def _fetch_batch(self,
+                           endpoint: str,
+                           ids: List[str],
+                           fields: str,
+                           chunk_size: int,
+                           id_key: str) -> Dict[str, Dict[str, Any]]:
+        """Concurrent counterpart of ``SemanticScholarAPI._fetch_batch``"""
+        unique_ids = list(dict.fromkeys(i for i in ids if i))
+        chunks = await asyncio.gather(*[
+            self._fetch_batch_chunk(endpoint, chunk, fields)
+            for chunk in chunked(unique_ids, chunk_size)
+        ])
+
+        results = {
+            record[id_key]: record
+            for records in chunks
+            for record in records
+            if record and record.get(id_key)
+        }
+
+        missing = len(unique_ids) - len(results)
+        if missing:
+            logger.warning(f"{endpoint}: {missing} of {len(unique_ids)} ids were not returned")
+
+        return results
+
+    async def get_papers_batch(self,
+                               paper_ids: List[str],
+                               fields: str = PAPER_DETAIL_FIELDS) -> Dict[str, Dict[str, Any]]:
+        """Get details for many papers, chunked to the API limit of 500 ids per call"""
+        return await self._fetch_batch("paper/batch", paper_ids, fields, PAPER_BATCH_SIZE, "paperId")
+
+    async def get_authors_batch(self,
+                                author_ids: List[str],
+                                fields: str = AUTHOR_DETAIL_FIELDS) -> Dict[str, Dict[str, Any]]:
+        """Get details for many authors, chunked to the API limit of 1000 ids per call"""
+        return await self._fetch_batch("author/batch", author_ids, fields, AUTHOR_BATCH_SIZE, "authorId")
+
+    async def _fetch_page(self, query: str, offset: int, limit: int,
+                          **kwargs) -> Tuple[List[Dict[str, Any]], int]:
+        logger.info(f"Fetching page {offset // self.PAGE_SIZE + 1}, offset: {offset}, limit: {limit}")
+        try:
+            response = await self.search_papers(query=query, limit=limit, offset=offset, **kwargs)
+        except Exception as e:
+            logger.error(f"Error fetching page at offset {offset}: {e}")
+            return [], offset
+        return response.get("data", []), offset
+
+    async def iter_search_pages(self,
+                                query: str,
+                                total_limit: int = 100,
+                                skip_offsets: Collection[int] = (),
+                                **kwargs) -> AsyncIterator[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Yield ``(papers, offset)`` for each page of search results as soon as it arrives
+
+        The first page is fetched alone to learn how many results exist; the remaining
+        offsets are then requested concurrently and yielded in completion order.
+        Pages at ``skip_offsets`` (already stored by an earlier run) are not yielded,
+        and apart from the first one not fetched.
+        """
+        try:
+            first = await self.search_papers(
+                query=query,
+                limit=min(self.PAGE_SIZE, total_limit),
+                offset=0,
+                **kwargs
+            )
+        except Exception as e:
+            logger.error(f"Error fetching page at offset 0: {e}")
+            return
+
+        papers = first.get("data", [])
+        if not papers:
+            logger.info("No more papers found, stopping pagination")
+            return
+
+        if 0 not in skip_offsets:
+            yield papers[:total_limit], 0
+
+        total = min(total_limit, first.get("total", 0))
+        pending = [
+            asyncio.ensure_future(self._fetch_page(
+                query, offset, min(self.PAGE_SIZE, total - offset), **kwargs
+            ))
+            for offset in range(self.PAGE_SIZE, total, self.PAGE_SIZE)
+            if offset not in skip_offsets
+        ]
+
+        try:
+            for next_page in asyncio.as_completed(pending):
+                papers, offset = await next_page
+                if papers:
+                    yield papers, offset
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def search_multiple_pages(self,
+                                    query: str,
+                                    total_limit: int = 100,
+                                    **kwargs) -> List[Dict[str, Any]]:
+        """Search multiple pages concurrently and return all papers"""
+        all_papers = []
+        async for papers, _ in self.iter_search_pages(query, total_limit=total_limit, **kwargs):
+            all_papers.extend(papers)
+
+        logger.info(f"Retrieved {len(all_papers)} papers total")
+        return all_papers[:total_limit]
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import redis
+from django.conf import settings
+
+from dip.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Comma separated params whose order does not change the response
+UNORDERED_LIST_PARAMS = {'fields', 'fieldsOfStudy', 'publicationTypes'}
+
+
+class RedisCacheBackend:
+    """
+    Stores responses on the Redis instance from settings
+
+    Besides the per-entry TTL, keys are tracked in a sorted set by last access and
+    the least recently used ones are evicted once the stored bytes exceed ``max_bytes``.
+    """
+
+    PREFIX = 'scholar:cache'
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.lru_key = f'{self.PREFIX}:lru'
+        self.sizes_key = f'{self.PREFIX}:sizes'
+        self.bytes_key = f'{self.PREFIX}:bytes'
+
+    def _entry_key(self, key: str) -> str:
+        return f'{self.PREFIX}:entry:{key}'
+
+    def get(self, key: str) -> Optional[bytes]:
+        client = get_redis_client()
+        value = client.get(self._entry_key(key))
+        if value is not None:
+            client.zadd(self.lru_key, {key: time.time()})
+        return value
+
+    def set(self, key: str, value: bytes, ttl: int):
+        client = get_redis_client()
+        previous_size = client.hget(self.sizes_key, key)
+
+        with client.pipeline() as pipe:
+            pipe.set(self._entry_key(key), value, ex=ttl)
+            pipe.zadd(self.lru_key, {key: time.time()})
+            pipe.hset(self.sizes_key, key, len(value))
+            pipe.incrby(self.bytes_key, len(value) - int(previous_size or 0))
+            total_bytes = pipe.execute()[-1]
+
+        if total_bytes > self.max_bytes:
+            self._evict(client)
+
+    def _evict(self, client: redis.Redis, batch: int = 100):
+        """Drop least recently used entries until the byte budget is met"""
+        while True:
+            excess = int(client.get(self.bytes_key) or 0) - self.max_bytes
+            if excess <= 0:
+                return
+
+            candidates = [key.decode() for key in client.zrange(self.lru_key, 0, batch - 1)]
+            if not candidates:
+                client.set(self.bytes_key, 0)
+                return
+
+            keys = []
+            freed = 0
+            for key, size in zip(candidates, client.hmget(self.sizes_key, candidates)):
+                keys.append(key)
+                freed += int(size or 0)
+                if freed >= excess:
+                    break
+
+            with client.pipeline() as pipe:
+                pipe.delete(*[self._entry_key(key) for key in keys])
+                pipe.zrem(self.lru_key, *keys)
+                pipe.hdel(self.sizes_key, *keys)
+                pipe.decrby(self.bytes_key, freed)
+                pipe.execute()
+
+
+class DiskCacheBackend:
+    """
+    Stores responses in a local SQLite file with the same TTL and LRU byte budget
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB, size INTEGER, expires_at REAL, accessed_at REAL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute(
+            'SELECT value FROM entries WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+
+        connection.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: int):
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            'INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+            (key, value, len(value), now + ttl, now)
+        )
+        self._evict(connection, now)
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        connection.execute('DELETE FROM entries WHERE expires_at <= ?', (now,))
+        total_bytes = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        excess = total_bytes - self.max_bytes
+        freed = 0
+        keys = []
+        for key, size in connection.execute('SELECT key, size FROM entries ORDER BY accessed_at'):
+            keys.append(key)
+            freed += size
+            if freed >= excess:
+                break
+
+        connection.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key in keys])
+
+
+class ResponseCache:
+    """
+    Caches Semantic Scholar responses keyed on endpoint and canonicalised params
+
+    TTLs are chosen per endpoint by the longest matching prefix in ``ttls``.
+    Backend errors are logged and treated as misses so the API stays reachable.
+    """
+
+    def __init__(self, backend, ttls: Dict[str, int], default_ttl: int):
+        self.backend = backend
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any], body: Optional[Dict[str, Any]] = None) -> str:
+        canonical_params = {}
+        for name, value in (params or {}).items():
+            if value is None:
+                continue
+            value = str(value)
+            if name in UNORDERED_LIST_PARAMS:
+                value = ','.join(sorted(part.strip() for part in value.split(',')))
+            elif name == 'query':
+                value = ' '.join(value.split())
+            canonical_params[name] = value
+
+        canonical_body = None
+        if body:
+            canonical_body = {
+                name: sorted(value) if isinstance(value, list) else value
+                for name, value in body.items()
+            }
+
+        payload = json.dumps(
+            {'endpoint': endpoint.strip('/'), 'params': canonical_params, 'body': canonical_body},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> int:
+        matches = [prefix for prefix in self.ttls if endpoint.startswith(prefix)]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def get(self, endpoint: str, params: Dict[str, Any], body: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        try:
+            value = self.backend.get(self.make_key(endpoint, params, body))
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"Response cache hit for {endpoint}")
+        return json.loads(value)
+
+    def set(self, endpoint: str, params: Dict[str, Any], body: Optional[Dict[str, Any]], value: Any):
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return
+
+        try:
+            self.backend.set(self.make_key(endpoint, params, body), json.dumps(value).encode(), ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide response cache configured by SEMANTIC_SCHOLAR_CACHE, None when disabled"""
+    global _response_cache
+    config = settings.SEMANTIC_SCHOLAR_CACHE
+
+    if config['BACKEND'] == 'none':
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            if config['BACKEND'] == 'disk':
+                backend = DiskCacheBackend(config['PATH'], config['MAX_BYTES'])
+            else:
+                backend = RedisCacheBackend(config['MAX_BYTES'])
+
+            _response_cache = ResponseCache(backend, config['TTL'], config['DEFAULT_TTL'])
+        return _response_cache
+
+
+def reset_response_cache():
+    """Drop the cache so a forked worker process opens its own backend connections"""
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = None
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import redis
+from django.conf import settings
+
+from dip.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS[1] - bucket hash, ARGV: rate (tokens/s), burst, tokens requested.
+# Returns seconds to wait as a string; 0 means the tokens were taken.
+ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+# KEYS[1] - bucket hash, ARGV[1] - seconds the API asked us to back off.
+PENALIZE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local blocked_until = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+
+if blocked_until > current then
+    redis.call('HSET', KEYS[1], 'blocked_until', blocked_until, 'tokens', 0, 'ts', blocked_until)
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[1])) + 60)
+end
+return tostring(math.max(blocked_until, current) - now)
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket shared by every worker and spider through Redis
+
+    ``rate`` is the sustained number of requests per second and ``burst`` the number
+    of requests that may go out back to back after an idle period. Falls back to
+    in-process spacing when Redis is unreachable.
+    """
+
+    def __init__(self, key: str, rate: float, burst: int):
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self._acquire_script = None
+        self._penalize_script = None
+        self._local_lock = threading.Lock()
+        self._local_next = 0.0
+
+    def _scripts(self):
+        if self._acquire_script is None:
+            client = get_redis_client()
+            self._acquire_script = client.register_script(ACQUIRE_SCRIPT)
+            self._penalize_script = client.register_script(PENALIZE_SCRIPT)
+        return self._acquire_script, self._penalize_script
+
+    def _local_reserve(self) -> float:
+        with self._local_lock:
+            now = time.monotonic()
+            wait = max(0.0, self._local_next - now)
+            self._local_next = max(now, self._local_next) + 1 / self.rate
+            return wait
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Try to take tokens, return how long to wait before trying again (0 when taken)"""
+        try:
+            acquire, _ = self._scripts()
+            return float(acquire(keys=[self.key], args=[self.rate, self.burst, tokens]))
+        except redis.RedisError as e:
+            logger.warning(f"Shared rate limiter unavailable, using local limit: {e}")
+            wait = self._local_reserve()
+            if wait:
+                time.sleep(wait)
+            return 0.0
+
+    def wait(self, tokens: int = 1):
+        """Block until tokens are available"""
+        while True:
+            wait = self.reserve(tokens)
+            if wait <= 0:
+                return
+            logger.debug(f"Rate limiting: sleeping for {wait:.2f} seconds")
+            time.sleep(wait)
+
+    async def async_wait(self, tokens: int = 1):
+        """Wait for tokens without blocking the event loop"""
+        while True:
+            wait = await asyncio.to_thread(self.reserve, tokens)
+            if wait <= 0:
+                return
+            logger.debug(f"Rate limiting: sleeping for {wait:.2f} seconds")
+            await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: float):
+        """Stop handing out tokens to everyone for ``retry_after`` seconds"""
+        try:
+            _, penalize = self._scripts()
+            penalize(keys=[self.key], args=[retry_after])
+        except redis.RedisError as e:
+            logger.warning(f"Shared rate limiter unavailable, backing off locally: {e}")
+            with self._local_lock:
+                self._local_next = max(self._local_next, time.monotonic() + retry_after)
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Seconds from a Retry-After header (delta-seconds form only)"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+_buckets: Dict[str, RedisTokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: Optional[str] = None) -> RedisTokenBucket:
+    """Shared bucket for the given API key (anonymous callers share the public quota)"""
+    key_id = hashlib.sha256(api_key.encode()).hexdigest()[:16] if api_key else 'public'
+
+    with _buckets_lock:
+        if key_id not in _buckets:
+            _buckets[key_id] = RedisTokenBucket(
+                key=f'scholar:ratelimit:{key_id}',
+                rate=settings.SEMANTIC_SCHOLAR_RATE_LIMIT['rate'],
+                burst=settings.SEMANTIC_SCHOLAR_RATE_LIMIT['burst'],
+            )
+        return _buckets[key_id]
+
+
+def reset_rate_limiters():
+    """Drop buckets whose Lua scripts are bound to a Redis client from before a fork"""
+    with _buckets_lock:
+        _buckets.clear()
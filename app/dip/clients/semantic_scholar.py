@@ -1,12 +1,98 @@
 import requests
-import time
 import logging
-from typing import List, Dict, Optional, Any
+from typing import Iterator, List, Dict, Optional, Any, Tuple
+from django.conf import settings
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .cache import get_response_cache
+from .rate_limit import get_rate_limiter, parse_retry_after
+
 logger = logging.getLogger(__name__)
 
+PAPER_SEARCH_FIELDS = "paperId,title,abstract,year,venue,authors,citationCount,referenceCount,influentialCitationCount,isOpenAccess,openAccessPdf,externalIds"
+PAPER_DETAIL_FIELDS = f"{PAPER_SEARCH_FIELDS},citations,references"
+AUTHOR_DETAIL_FIELDS = "authorId,name,affiliations,homepage,paperCount,citationCount,hIndex"
+
+# Max ids per call of the paper/batch and author/batch endpoints
+PAPER_BATCH_SIZE = 500
+AUTHOR_BATCH_SIZE = 1000
+
+
+def chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def build_search_params(query: str,
+                        year_from: Optional[int] = None,
+                        year_to: Optional[int] = None,
+                        fields_of_study: Optional[List[str]] = None,
+                        publication_types: Optional[List[str]] = None,
+                        min_citation_count: Optional[int] = None,
+                        open_access_only: bool = False,
+                        limit: int = 100,
+                        offset: int = 0) -> Dict[str, Any]:
+    """Build query params for the paper/search endpoint"""
+    params = {
+        "query": query,
+        "limit": min(limit, 100),  # API max is 100 per request
+        "offset": offset,
+        "fields": PAPER_SEARCH_FIELDS
+    }
+
+    # Add year filters
+    if year_from or year_to:
+        year_filter = []
+        if year_from:
+            year_filter.append(f"{year_from}-")
+        if year_to:
+            if year_from:
+                year_filter = [f"{year_from}-{year_to}"]
+            else:
+                year_filter.append(f"-{year_to}")
+        params["year"] = ",".join(year_filter)
+
+    # Add fields of study filter
+    if fields_of_study:
+        params["fieldsOfStudy"] = ",".join(fields_of_study)
+
+    # Add publication type filter (Semantic Scholar uses different naming)
+    if publication_types:
+        # Map our types to Semantic Scholar types
+        type_mapping = {
+            "JournalArticle": "JournalArticle",
+            "Conference": "Conference",
+            "Review": "Review",
+            "Book": "Book",
+            "BookSection": "BookSection",
+            "Dataset": "Dataset"
+        }
+        mapped_types = [type_mapping.get(t, t) for t in publication_types]
+        params["publicationTypes"] = ",".join(mapped_types)
+
+    # Add minimum citation filter
+    if min_citation_count is not None:
+        params["minCitationCount"] = min_citation_count
+
+    # Add open access filter
+    if open_access_only:
+        params["openAccessPdf"] = ""
+
+    return params
+
+
+def build_bulk_search_params(query: str, token: Optional[str] = None, **filters) -> Dict[str, Any]:
+    """Build query params for the paper/search/bulk endpoint (no limit/offset, paged by token)"""
+    params = build_search_params(query=query, **filters)
+    params.pop("limit")
+    params.pop("offset")
+
+    if token:
+        params["token"] = token
+
+    return params
+
 
 class SemanticScholarAPI:
     """
@@ -15,14 +101,15 @@ class SemanticScholarAPI:
 
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
 
-    # Rate limiting: 100 requests per 5 minutes for public API
-    REQUEST_DELAY = 3.0  # seconds between requests
+    # Rate limiting is shared across workers, see SEMANTIC_SCHOLAR_RATE_LIMIT
+    RATE_LIMIT_BACKOFF = 60.0  # seconds to back off on 429 without Retry-After
     MAX_RETRIES = 3
 
     def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key
+        self.api_key = api_key or settings.SEMANTIC_SCHOLAR_API_KEY
         self.session = self._create_session()
-        self.last_request_time = 0
+        self.rate_limiter = get_rate_limiter(self.api_key)
+        self.cache = get_response_cache()
 
     def _create_session(self) -> requests.Session:
         """Create session with retry strategy"""
@@ -30,7 +117,7 @@ class SemanticScholarAPI:
 
         retry_strategy = Retry(
             total=self.MAX_RETRIES,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
             backoff_factor=2,
             respect_retry_after_header=True
         )
@@ -42,19 +129,19 @@ class SemanticScholarAPI:
         return session
 
     def _rate_limit(self):
-        """Implement rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-
-        if time_since_last < self.REQUEST_DELAY:
-            sleep_time = self.REQUEST_DELAY - time_since_last
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        """Take a token from the shared rate limiter"""
+        self.rate_limiter.wait()
+
+    def _make_request(self,
+                      endpoint: str,
+                      params: Dict[str, Any],
+                      json: Optional[Dict[str, Any]] = None) -> Any:
+        """Make API request with caching, rate limiting and error handling (POST when json body is given)"""
+        if self.cache:
+            cached = self.cache.get(endpoint, params, json)
+            if cached is not None:
+                return cached
 
-        self.last_request_time = time.time()
-
-    def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make API request with rate limiting and error handling"""
         self._rate_limit()
 
         url = f"{self.BASE_URL}/{endpoint}"
@@ -65,16 +152,23 @@ class SemanticScholarAPI:
 
         try:
             logger.debug(f"Making request to: {url} with params: {params}")
-            response = self.session.get(url, headers=headers, params=params, timeout=30)
+            if json is not None:
+                response = self.session.post(url, headers=headers, params=params, json=json, timeout=30)
+            else:
+                response = self.session.get(url, headers=headers, params=params, timeout=30)
             response.raise_for_status()
 
-            return response.json()
+            data = response.json()
+            if self.cache:
+                self.cache.set(endpoint, params, json, data)
+            return data
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 429:
-                logger.warning("Rate limit exceeded, waiting longer...")
-                time.sleep(60)  # Wait 1 minute for rate limit reset
-                return self._make_request(endpoint, params)
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"), self.RATE_LIMIT_BACKOFF)
+                logger.warning(f"Rate limit exceeded, backing off for {retry_after:.0f} seconds...")
+                self.rate_limiter.penalize(retry_after)
+                return self._make_request(endpoint, params, json=json)
             else:
                 logger.error(f"HTTP error {e.response.status_code}: {e}")
                 raise
@@ -110,59 +204,62 @@ class SemanticScholarAPI:
         Returns:
             API response with papers data
         """
+        params = build_search_params(
+            query=query,
+            year_from=year_from,
+            year_to=year_to,
+            fields_of_study=fields_of_study,
+            publication_types=publication_types,
+            min_citation_count=min_citation_count,
+            open_access_only=open_access_only,
+            limit=limit,
+            offset=offset,
+        )
 
-        # Build search parameters
-        params = {
-            "query": query,
-            "limit": min(limit, 100),  # API max is 100 per request
-            "offset": offset,
-            "fields": "paperId,title,abstract,year,venue,authors,citationCount,referenceCount,influentialCitationCount,isOpenAccess,openAccessPdf,externalIds"
-        }
+        return self._make_request("paper/search", params)
 
-        # Add year filters
-        if year_from or year_to:
-            year_filter = []
-            if year_from:
-                year_filter.append(f"{year_from}-")
-            if year_to:
-                if year_from:
-                    year_filter = [f"{year_from}-{year_to}"]
-                else:
-                    year_filter.append(f"-{year_to}")
-            params["year"] = ",".join(year_filter)
-
-        # Add fields of study filter
-        if fields_of_study:
-            params["fieldsOfStudy"] = ",".join(fields_of_study)
-
-        # Add publication type filter (Semantic Scholar uses different naming)
-        if publication_types:
-            # Map our types to Semantic Scholar types
-            type_mapping = {
-                "JournalArticle": "JournalArticle",
-                "Conference": "Conference",
-                "Review": "Review",
-                "Book": "Book",
-                "BookSection": "BookSection",
-                "Dataset": "Dataset"
-            }
-            mapped_types = [type_mapping.get(t, t) for t in publication_types]
-            params["publicationTypes"] = ",".join(mapped_types)
-
-        # Add minimum citation filter
-        if min_citation_count is not None:
-            params["minCitationCount"] = min_citation_count
-
-        # Add open access filter
-        if open_access_only:
-            params["openAccessPdf"] = ""
+    def search_papers_bulk(self, query: str, token: Optional[str] = None, **filters) -> Dict[str, Any]:
+        """
+        Search papers with the bulk endpoint
 
-        return self._make_request("paper/search", params)
+        Returns up to 1000 papers per call together with a continuation ``token``
+        for the next call; the token is absent on the last page. Accepts the same
+        filters as ``search_papers`` except ``limit`` and ``offset``.
+        """
+        return self._make_request("paper/search/bulk", build_bulk_search_params(query, token, **filters))
+
+    def iter_bulk_search(self,
+                         query: str,
+                         total_limit: Optional[int] = None,
+                         token: Optional[str] = None,
+                         **filters) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Iterate bulk search pages until the end of results or ``total_limit``
+
+        Yields ``(papers, next_token)``; pass a saved ``next_token`` back as ``token``
+        to resume an interrupted iteration.
+        """
+        fetched = 0
+
+        while total_limit is None or fetched < total_limit:
+            response = self.search_papers_bulk(query, token=token, **filters)
+            papers = response.get("data") or []
+            token = response.get("token")
+
+            if total_limit is not None:
+                papers = papers[:total_limit - fetched]
+            fetched += len(papers)
+
+            logger.info(f"Bulk search page: {len(papers)} papers, {fetched} total, more: {bool(token)}")
+            yield papers, token
+
+            if not token or not papers:
+                break
 
     def get_paper_details(self, paper_id: str) -> Dict[str, Any]:
         """Get detailed information about a specific paper"""
         params = {
-            "fields": "paperId,title,abstract,year,venue,authors,citationCount,referenceCount,influentialCitationCount,isOpenAccess,openAccessPdf,externalIds,citations,references"
+            "fields": PAPER_DETAIL_FIELDS
         }
 
         return self._make_request(f"paper/{paper_id}", params)
@@ -170,11 +267,59 @@ class SemanticScholarAPI:
     def get_author_details(self, author_id: str) -> Dict[str, Any]:
         """Get detailed information about an author"""
         params = {
-            "fields": "authorId,name,affiliations,homepage,paperCount,citationCount,hIndex"
+            "fields": AUTHOR_DETAIL_FIELDS
         }
 
         return self._make_request(f"author/{author_id}", params)
 
+    def _fetch_batch(self,
+                     endpoint: str,
+                     ids: List[str],
+                     fields: str,
+                     chunk_size: int,
+                     id_key: str,
+                     raise_errors: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        POST ids to a batch endpoint in chunks
+
+        Returns a mapping of id to record. Unknown ids (returned as null by the API)
+        and ids from chunks that failed are left out, so callers can fall back for them.
+        With ``raise_errors`` a failed chunk raises instead, for callers that must tell
+        an outage apart from unknown ids.
+        """
+        results = {}
+        unique_ids = list(dict.fromkeys(i for i in ids if i))
+
+        for chunk in chunked(unique_ids, chunk_size):
+            try:
+                records = self._make_request(endpoint, {"fields": fields}, json={"ids": chunk})
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Batch request to {endpoint} failed for {len(chunk)} ids: {e}")
+                if raise_errors:
+                    raise
+                continue
+
+            for record in records or []:
+                if record and record.get(id_key):
+                    results[record[id_key]] = record
+
+        missing = len(unique_ids) - len(results)
+        if missing:
+            logger.warning(f"{endpoint}: {missing} of {len(unique_ids)} ids were not returned")
+
+        return results
+
+    def get_papers_batch(self,
+                         paper_ids: List[str],
+                         fields: str = PAPER_DETAIL_FIELDS,
+                         raise_errors: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Get details for many papers, chunked to the API limit of 500 ids per call"""
+        return self._fetch_batch("paper/batch", paper_ids, fields, PAPER_BATCH_SIZE, "paperId", raise_errors)
+
+    def get_authors_batch(self, author_ids: List[str], fields: str = AUTHOR_DETAIL_FIELDS) -> Dict[str, Dict[str, Any]]:
+        """Get details for many authors, chunked to the API limit of 1000 ids per call"""
+        return self._fetch_batch("author/batch", author_ids, fields, AUTHOR_BATCH_SIZE, "authorId")
+
     def search_multiple_pages(self,
                               query: str,
                               total_limit: int = 100,
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from dip.models import ScrapingSession
+from dip.progress import TERMINAL_STATUSES, cache_session_snapshot, publish_progress
+from dip.stats import refresh_session_stats
+
+logger = logging.getLogger(__name__)
+
+# Bounds how long a crashed crawl can keep later requests attached to it
+SINGLE_FLIGHT_TTL = 60 * 60
+
+# Fields copied from the crawling session to its subscribers when it finishes
+SUBSCRIBER_RESULT_FIELDS = ['status', 'completed_at', 'papers_found', 'papers_saved', 'errors_count']
+
+
+def scrape_fingerprint(params: Dict[str, Any]) -> str:
+    """
+    SHA-256 of the canonicalised scrape parameters
+
+    Query case and whitespace and the order of list filters do not matter, so
+    requests that would run the same API calls get the same fingerprint.
+    """
+    canonical = {
+        'query': ' '.join((params.get('query') or '').split()).casefold(),
+        'year_from': params.get('year_from'),
+        'year_to': params.get('year_to'),
+        'limit': params.get('limit') or 100,
+        'fields_of_study': sorted(params.get('fields_of_study') or []),
+        'publication_types': sorted(params.get('publication_types') or []),
+        'min_citation_count': params.get('min_citation_count'),
+        'open_access_only': bool(params.get('open_access_only')),
+        'search_mode': params.get('search_mode') or 'relevance',
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+def single_flight_key(fingerprint: str) -> str:
+    return f'scrape:inflight:{fingerprint}'
+
+
+def claim_or_attach(session: ScrapingSession) -> Optional[ScrapingSession]:
+    """
+    Register ``session`` as the crawl for its fingerprint, or find the one in flight
+
+    Returns None when ``session`` should crawl itself, otherwise the in-flight session
+    to attach to. ``cache.add`` is atomic in Redis, so only one request wins the claim.
+    """
+    key = single_flight_key(session.fingerprint)
+
+    for _ in range(2):
+        if cache.add(key, session.id, SINGLE_FLIGHT_TTL):
+            return None
+
+        leader_id = cache.get(key)
+        leader = ScrapingSession.objects.filter(id=leader_id).first() if leader_id else None
+        if leader is not None and leader.status not in TERMINAL_STATUSES:
+            return leader
+
+        # The registered crawl is gone or already finished, take over the key
+        cache.delete(key)
+
+    return None
+
+
+def attach_subscriber(session: ScrapingSession, leader: ScrapingSession):
+    """Point ``session`` at ``leader``'s crawl instead of starting its own"""
+    session.results_session = leader
+    session.task_id = leader.task_id
+    session.status = leader.status
+    session.save(update_fields=['results_session', 'task_id', 'status'])
+
+    # The crawl may have finished between the claim check and the save above
+    leader.refresh_from_db()
+    if leader.status in TERMINAL_STATUSES:
+        complete_subscribers(leader)
+
+
+def release_single_flight(session: ScrapingSession):
+    """Drop the registry entry of a finished crawl and finish its subscribers"""
+    if session.fingerprint:
+        key = single_flight_key(session.fingerprint)
+        if cache.get(key) == session.id:
+            cache.delete(key)
+    complete_subscribers(session)
+
+
+def complete_subscribers(leader: ScrapingSession):
+    """Copy the crawl's final status and counters to every attached session"""
+    subscribers = list(ScrapingSession.objects.filter(results_session=leader))
+    if not subscribers:
+        return
+
+    for subscriber in subscribers:
+        for field in SUBSCRIBER_RESULT_FIELDS:
+            setattr(subscriber, field, getattr(leader, field))
+    ScrapingSession.objects.bulk_update(subscribers, SUBSCRIBER_RESULT_FIELDS)
+
+    refresh_session_stats([subscriber.id for subscriber in subscribers], final=True)
+    for subscriber in subscribers:
+        cache_session_snapshot(subscriber)
+        publish_progress(subscriber.id, event='status', status=subscriber.status, results_session_id=leader.id)
+
+    logger.info(f"Shared results of session {leader.id} with sessions {[s.id for s in subscribers]}")
+
+
+def session_records_filter(profile, session_id: Optional[int], prefix: str = '') -> Q:
+    """
+    Filter for the profile's records, or the records of one of its sessions
+
+    A session attached to another session's crawl reads that session's records,
+    which may belong to a different profile. ``prefix`` is prepended to the lookups
+    for use across relations, e.g. ``'scholar_raw_records__'``.
+    """
+    if session_id is None:
+        return Q(**{f'{prefix}profile': profile})
+
+    results_session_id = ScrapingSession.objects.filter(
+        id=session_id, profile=profile
+    ).values_list('results_session_id', flat=True).first()
+
+    if results_session_id:
+        return Q(**{f'{prefix}scraping_session_id': results_session_id})
+    return Q(**{f'{prefix}profile': profile, f'{prefix}scraping_session_id': session_id})
@@ -0,0 +1,131 @@
+import json
+
+from channels.db import database_sync_to_async
+from channels.exceptions import StopConsumer
+from channels.generic.http import AsyncHttpConsumer
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from dip.models import ScrapingSession
+from dip.progress import TERMINAL_STATUSES, session_group_name, session_snapshot
+
+
+@database_sync_to_async
+def get_profile_session(profile, session_id):
+    if profile is None:
+        return None
+    return ScrapingSession.objects.filter(id=session_id, profile=profile).first()
+
+
+class ScrapeProgressConsumer(AsyncJsonWebsocketConsumer):
+    """
+    WebSocket stream of progress events for one scraping session
+
+    Sends a snapshot of the session on connect, then every event published to the
+    session group by the pipeline and the scrape task.
+    """
+
+    group_name = None
+
+    async def connect(self):
+        session = await get_profile_session(
+            self.scope.get('profile'),
+            self.scope['url_route']['kwargs']['session_id']
+        )
+        if session is None:
+            await self.close(code=4403)
+            return
+
+        self.group_name = session_group_name(session.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send_json(session_snapshot(session))
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def scrape_progress(self, event):
+        await self.send_json(event['payload'])
+
+
+class ScrapeProgressSSEConsumer(AsyncHttpConsumer):
+    """
+    Server-sent events fallback of ``ScrapeProgressConsumer``
+
+    The stream ends after the session reaches a terminal status or the client goes away.
+    """
+
+    group_name = None
+    streaming = False
+
+    async def http_request(self, message):
+        """
+        Run ``handle`` and keep the consumer alive while the stream is open
+
+        Channels dispatches one message at a time, so ``handle`` cannot wait for group
+        events itself: they would only be dispatched after it returned. Instead the
+        consumer stays running after ``handle`` and ``scrape_progress`` closes the body.
+        """
+        if "body" in message:
+            self.body.append(message["body"])
+        if message.get("more_body"):
+            return
+
+        try:
+            await self.handle(b"".join(self.body))
+        finally:
+            if not self.streaming:
+                await self.disconnect()
+        if not self.streaming:
+            raise StopConsumer()
+
+    async def handle(self, body):
+        session = await get_profile_session(
+            self.scope.get('profile'),
+            self.scope['url_route']['kwargs']['session_id']
+        )
+        if session is None:
+            await self.send_response(
+                404,
+                json.dumps({"error": "Session not found."}).encode(),
+                headers=[(b'Content-Type', b'application/json')]
+            )
+            return
+
+        await self.send_headers(headers=[
+            (b'Content-Type', b'text/event-stream'),
+            (b'Cache-Control', b'no-cache'),
+            (b'X-Accel-Buffering', b'no'),
+        ])
+
+        # Join the group before reading the snapshot so no status change falls in between
+        self.group_name = session_group_name(session.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await database_sync_to_async(session.refresh_from_db)()
+
+        snapshot = session_snapshot(session)
+        if snapshot['status'] in TERMINAL_STATUSES:
+            await self.send_event(snapshot, more_body=False)
+            return
+
+        await self.send_event(snapshot)
+        self.streaming = True
+
+    async def send_event(self, payload, more_body=True):
+        message = f"event: {payload.get('event', 'progress')}\ndata: {json.dumps(payload)}\n\n"
+        await self.send_body(message.encode(), more_body=more_body)
+
+    async def scrape_progress(self, event):
+        payload = event['payload']
+        if payload.get('status') not in TERMINAL_STATUSES:
+            await self.send_event(payload)
+            return
+
+        await self.send_event(payload, more_body=False)
+        await self.disconnect()
+        raise StopConsumer()
+
+    async def disconnect(self):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            self.group_name = None
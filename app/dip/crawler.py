@@ -0,0 +1,117 @@
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessCrawler:
+    """
+    Runs Scrapy spiders inside the current process on a long-lived reactor thread.
+
+    The reactor and the ``CrawlerRunner`` are created once per process on first use,
+    so every following job skips interpreter start, Django setup and Scrapy import.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reactor = None
+        self._runner = None
+
+    def _start_reactor(self):
+        """Install the configured reactor and run it on a daemon thread"""
+        from scrapy.crawler import CrawlerRunner
+        from scrapy.settings import Settings
+        from scrapy.utils.reactor import install_reactor
+        from scholar.scholar import settings as project_settings
+
+        settings = Settings()
+        settings.setmodule(project_settings)
+
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                install_reactor(settings['TWISTED_REACTOR'], settings['ASYNCIO_EVENT_LOOP'])
+                from twisted.internet import reactor
+
+                self._reactor = reactor
+                self._runner = CrawlerRunner(settings)
+                reactor.callWhenRunning(ready.set)
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                return
+
+            reactor.run(installSignalHandlers=False)
+
+        thread = threading.Thread(target=run, name='scrapy-reactor', daemon=True)
+        thread.start()
+        ready.wait()
+
+        if errors:
+            raise errors[0]
+
+        logger.info("Scrapy reactor started in background thread")
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._runner is None:
+                self._start_reactor()
+
+    def crawl(self, spider_cls, **spider_kwargs) -> Dict[str, Any]:
+        """
+        Run a single crawl and block the calling thread until it finishes
+
+        Returns:
+            Dict with ``returncode`` (0 on success), ``finish_reason`` and ``stats``
+        """
+        self._ensure_started()
+        future = Future()
+
+        def start():
+            crawler = self._runner.create_crawler(spider_cls)
+            deferred = self._runner.crawl(crawler, **spider_kwargs)
+            deferred.addCallbacks(
+                lambda _: future.set_result(crawler),
+                lambda failure: future.set_exception(failure.value),
+            )
+
+        self._reactor.callFromThread(start)
+        crawler = future.result()
+
+        stats = crawler.stats.get_stats() if crawler.stats else {}
+        finish_reason = crawl_finish_reason(stats)
+
+        return {
+            'returncode': 0 if finish_reason == 'finished' else 1,
+            'finish_reason': finish_reason,
+            'stats': serialize_stats(stats),
+        }
+
+
+def crawl_finish_reason(stats: Dict[str, Any]) -> str:
+    """Scrapy's finish reason, unless the bulk pipeline lost a batch while the crawl closed"""
+    from scholar.scholar.pipelines import FAILED_BATCHES_STAT, PIPELINE_ERROR_REASON
+
+    if stats.get(FAILED_BATCHES_STAT):
+        return PIPELINE_ERROR_REASON
+    return stats.get('finish_reason')
+
+
+def serialize_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Make Scrapy stats JSON serializable for the Celery result backend"""
+    result = {}
+    for key, value in stats.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, timedelta):
+            value = value.total_seconds()
+        result[key] = value
+    return result
+
+
+in_process_crawler = InProcessCrawler()
@@ -0,0 +1,14 @@
+from channels.db import database_sync_to_async
+
+
+def db_sync_to_async(func):
+    """
+    Run ORM work from a crawl's event loop on an executor thread
+
+    Plain ``sync_to_async`` sends every crawl in the process through the single
+    thread-sensitive thread, which serialises concurrent crawls under a thread pool
+    and keeps that thread's connection checked out for the life of the process.
+    Here calls use any executor thread and close old connections around each call,
+    so the connection goes back to the pool once the write is done.
+    """
+    return database_sync_to_async(func, thread_sensitive=False)
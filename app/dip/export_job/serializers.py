@@ -0,0 +1,31 @@
+from rest_framework import serializers
+from django.urls import reverse
+from dip.models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'kind', 'params', 'status', 'error', 'rows_total', 'rows_done', 'progress',
+            'file_size', 'download_url', 'created_at', 'started_at', 'completed_at'
+        ]
+        read_only_fields = [
+            'status', 'error', 'rows_total', 'rows_done', 'file_size', 'created_at', 'started_at', 'completed_at'
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != 'SUCCESS' or not obj.file:
+            return None
+
+        url = reverse('export-job-download', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("params must be an object of export query parameters.")
+        return {key: str(item) for key, item in value.items() if item is not None}
@@ -0,0 +1,68 @@
+import os
+
+from django.db import transaction
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from dip.exports import ranged_file_response
+from dip.models import ExportJob
+from dip.profiles import request_profile
+from dip.tasks import run_export_job
+from .serializers import ExportJobSerializer
+
+CONTENT_TYPES = {
+    '.csv': 'text/csv; charset=utf-8',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class ExportJobViewSet(mixins.CreateModelMixin,
+                       mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin,
+                       mixins.DestroyModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    Background exports: create a job, poll it for rows_done/progress, then download
+
+    The download supports HTTP Range requests, so an interrupted transfer can be
+    resumed from the last received byte.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(profile=request_profile(self.request))
+
+    def perform_create(self, serializer):
+        job = serializer.save(profile=request_profile(self.request))
+        transaction.on_commit(lambda: run_export_job.delay(job.id))
+
+    def perform_destroy(self, instance):
+        if instance.file:
+            instance.file.delete(save=False)
+        instance.delete()
+
+    @action(detail=True, methods=['get'], url_path='download')
+    def download(self, request, pk=None):
+        job = self.get_object()
+
+        if job.status != 'SUCCESS' or not job.file:
+            return Response({
+                "error": "Export is not ready.",
+                "status": job.status,
+                "progress": job.progress
+            }, status=status.HTTP_409_CONFLICT)
+
+        filename = os.path.basename(job.file.name)
+        extension = os.path.splitext(filename)[1]
+
+        return ranged_file_response(
+            request,
+            job.file.storage.open(job.file.name, 'rb'),
+            job.file_size if job.file_size is not None else job.file.size,
+            filename,
+            CONTENT_TYPES.get(extension, 'application/octet-stream'),
+            etag=f'"export-{job.id}-{int(job.completed_at.timestamp())}"',
+        )
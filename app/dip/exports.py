@@ -0,0 +1,537 @@
+import csv
+import io
+import re
+from datetime import datetime
+from itertools import chain, islice
+from typing import Callable, List, NamedTuple
+
+from django.db.models import Count, Q, Value
+from django.http import HttpResponse, StreamingHttpResponse
+
+from dip.models import ScholarAuthor, ScholarRawRecord, ScrapingSession
+from dip.coalesce import session_records_filter
+from dip.search import apply_search_query
+
+# Rows fetched per server-side cursor round trip (and per authors prefetch query)
+EXPORT_CHUNK_SIZE = 2000
+# Encoded rows are grouped into writes of roughly this many characters
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+class Echo:
+    """File-like object that returns what is written, so csv.writer can feed a generator"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(headers, rows, bom=True):
+    """Encode ``rows`` as CSV text in buffered pieces"""
+    writer = csv.writer(Echo())
+    yield ('\ufeff' if bom else '') + writer.writerow(headers)
+
+    buffer = []
+    size = 0
+
+    for row in rows:
+        line = writer.writerow(row)
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield ''.join(buffer)
+
+
+def streaming_csv_response(filename, headers, rows, bom=True):
+    """
+    CSV download that is written while ``rows`` is consumed
+
+    ``rows`` should be a generator over ``QuerySet.iterator(chunk_size=...)`` so memory
+    stays flat regardless of the number of exported rows.
+    """
+    response = StreamingHttpResponse(iter_csv(headers, rows, bom=bom), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+
+def export_filename(prefix, extension, session_id=None, timestamp=True):
+    filename_parts = [prefix]
+    if session_id:
+        filename_parts.append(f"session_{session_id}")
+    if timestamp:
+        filename_parts.append(datetime.now().strftime('%Y%m%d_%H%M%S'))
+    return "_".join(filename_parts) + f".{extension}"
+
+
+def parse_session_id(params):
+    """``(raw session_id, int or None)`` from export query params"""
+    session_id = params.get('session_id')
+    try:
+        return session_id, int(session_id) if session_id else None
+    except (ValueError, TypeError):
+        return session_id, None
+
+
+PAPER_EXPORT_HEADERS = [
+    'ID', 'Session ID', 'Session Query', 'Semantic Scholar ID', 'Title', 'Abstract',
+    'Publication Year', 'Venue', 'DOI', 'URL', 'PDF URL', 'Citation Count',
+    'Reference Count', 'Influential Citation Count', 'Open Access', 'Authors',
+    'Author Count', 'Scraped Date', 'Updated Date'
+]
+
+
+def papers_export_queryset(profile, params):
+    """Papers for the analyst CSV export, filtered by the results query params"""
+    _, session_pk = parse_session_id(params)
+    queryset = ScholarRawRecord.objects.filter(session_records_filter(profile, session_pk)).select_related(
+        'profile', 'scraping_session'
+    ).prefetch_related('authors')
+
+    query = params.get('query')
+    if query:
+        queryset = apply_search_query(queryset, query)
+
+    year_from = params.get('year_from')
+    if year_from:
+        try:
+            queryset = queryset.filter(publication_year__gte=int(year_from))
+        except ValueError:
+            pass
+
+    year_to = params.get('year_to')
+    if year_to:
+        try:
+            queryset = queryset.filter(publication_year__lte=int(year_to))
+        except ValueError:
+            pass
+
+    venue = params.get('venue')
+    if venue:
+        queryset = queryset.filter(venue__icontains=venue)
+
+    min_citations = params.get('min_citations')
+    if min_citations:
+        try:
+            queryset = queryset.filter(citation_count__gte=int(min_citations))
+        except ValueError:
+            pass
+
+    # Optional cap; without it the whole filtered dataset is exported
+    queryset = queryset.order_by('-scraped_at')
+    limit = params.get('limit')
+    if limit:
+        try:
+            queryset = queryset[:int(limit)]
+        except ValueError:
+            pass
+
+    return queryset
+
+
+def paper_csv_row(paper):
+    authors_list = [author.full_name for author in paper.authors.all()]
+
+    return [
+        paper.id,
+        paper.scraping_session.id if paper.scraping_session else '',
+        paper.scraping_session.query if paper.scraping_session else '',
+        paper.semantic_scholar_id,
+        paper.title,
+        paper.abstract,
+        paper.publication_year,
+        paper.venue,
+        paper.doi,
+        paper.url,
+        paper.pdf_url,
+        paper.citation_count,
+        paper.reference_count,
+        paper.influential_citation_count,
+        'Yes' if paper.is_open_access else 'No',
+        "; ".join(authors_list),
+        len(authors_list),
+        paper.scraped_at.strftime('%Y-%m-%d %H:%M:%S'),
+        paper.updated_at.strftime('%Y-%m-%d %H:%M:%S')
+    ]
+
+
+AUTHOR_EXPORT_HEADERS = [
+    'ID', 'Semantic Scholar ID', 'Full Name', 'URL', 'H-Index',
+    'Paper Count', 'Citation Count', 'Affiliations', 'Papers in Dataset',
+    'Papers in Session', 'Created Date', 'Updated Date'
+]
+
+
+def authors_export_queryset(profile, params):
+    """Authors of the profile's papers with per-author paper counts in one grouped query"""
+    session_id, session_pk = parse_session_id(params)
+    papers = ScholarRawRecord.objects.filter(session_records_filter(profile, session_pk))
+
+    in_dataset = Q(scholar_raw_records__profile=profile)
+    if session_pk is not None:
+        papers_in_session = Count(
+            'scholar_raw_records',
+            filter=session_records_filter(profile, session_pk, prefix='scholar_raw_records__')
+        )
+    elif session_id:
+        papers_in_session = Value(0)
+    else:
+        papers_in_session = Count('scholar_raw_records', filter=in_dataset)
+
+    return ScholarAuthor.objects.filter(id__in=papers.values('authors')).annotate(
+        papers_in_dataset=Count('scholar_raw_records', filter=in_dataset),
+        papers_in_session=papers_in_session,
+    )
+
+
+def author_csv_row(author):
+    return [
+        author.id,
+        author.semantic_scholar_id,
+        author.full_name,
+        author.url,
+        author.h_index,
+        author.paper_count,
+        author.citation_count,
+        "; ".join(author.affiliations) if author.affiliations else "",
+        author.papers_in_dataset,
+        author.papers_in_session,
+        author.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        author.updated_at.strftime('%Y-%m-%d %H:%M:%S')
+    ]
+
+
+RESULT_EXPORT_HEADERS = [
+    'Title', 'Authors', 'Year', 'Venue', 'Citation Count',
+    'DOI', 'Open Access', 'URL', 'Scraped Date'
+]
+
+
+def results_export_queryset(profile, params):
+    """Papers for the short results CSV of the scraper endpoints"""
+    _, session_pk = parse_session_id(params)
+    return ScholarRawRecord.objects.filter(
+        session_records_filter(profile, session_pk)
+    ).order_by('-scraped_at').prefetch_related('authors')
+
+
+def result_csv_row(paper):
+    return [
+        paper.title,
+        ", ".join([author.full_name for author in paper.authors.all()]),
+        paper.publication_year,
+        paper.venue,
+        paper.citation_count,
+        paper.doi,
+        'Yes' if paper.is_open_access else 'No',
+        paper.url,
+        paper.scraped_at.strftime('%Y-%m-%d %H:%M:%S')
+    ]
+
+
+class CsvExport(NamedTuple):
+    queryset: Callable
+    headers: List[str]
+    row: Callable
+    filename_prefix: str
+    bom: bool = True
+
+
+CSV_EXPORTS = {
+    'papers_csv': CsvExport(papers_export_queryset, PAPER_EXPORT_HEADERS, paper_csv_row, 'scholar_papers'),
+    'authors_csv': CsvExport(authors_export_queryset, AUTHOR_EXPORT_HEADERS, author_csv_row, 'scholar_authors'),
+    'results_csv': CsvExport(results_export_queryset, RESULT_EXPORT_HEADERS, result_csv_row, 'scholar_papers',
+                             bom=False),
+}
+
+
+def write_csv_export(fileobj, export, queryset, on_progress=None):
+    """
+    Write a CSV export to a binary file in ``EXPORT_CHUNK_SIZE`` row chunks
+
+    ``on_progress(rows_done)`` is called after every chunk and once at the end.
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig' if export.bom else 'utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(export.headers)
+
+    rows_done = 0
+    for item in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        writer.writerow(export.row(item))
+        rows_done += 1
+        if on_progress and rows_done % EXPORT_CHUNK_SIZE == 0:
+            on_progress(rows_done)
+
+    text.flush()
+    text.detach()
+    if on_progress:
+        on_progress(rows_done)
+    return rows_done
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+RANGE_READ_SIZE = 64 * 1024
+
+
+def parse_range_header(header, size):
+    """
+    ``(start, end)`` inclusive byte offsets for a single-range ``Range`` header
+
+    Returns None when the header is absent or not understood (the full file is sent)
+    and raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def iter_file_range(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = fileobj.read(min(RANGE_READ_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        fileobj.close()
+
+
+def ranged_file_response(request, fileobj, size, filename, content_type, etag=None):
+    """
+    Stream ``fileobj`` honouring a single-range ``Range`` header
+
+    Lets clients resume an interrupted download with ``Range: bytes=<received>-``.
+    ``If-Range`` with a stale ETag falls back to the full file.
+    """
+    byte_range = None
+    if not etag or request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range_header(request.headers.get('Range'), size)
+        except ValueError:
+            fileobj.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+
+    response = StreamingHttpResponse(iter_file_range(fileobj, start, length), content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    if etag:
+        response['ETag'] = etag
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+# Rows used to size Excel columns before the rest of the sheet is streamed
+EXCEL_WIDTH_SAMPLE_ROWS = 200
+EXCEL_MAX_COLUMN_WIDTH = 50
+# Papers above this count are exported by an ExportJob instead of in the request
+EXCEL_SYNC_MAX_ROWS = 5000
+EXCEL_PROGRESS_EVERY = 1000
+
+AUTHOR_SUMMARY_HEADERS = ['Author Name', 'Papers Count', 'H-Index', 'Total Citations', 'Affiliations']
+
+
+def excel_paper_row(paper):
+    authors_list = [author.full_name for author in paper.authors.all()]
+
+    # Convert timezone-aware datetimes to naive datetimes for Excel
+    return [
+        paper.id,
+        paper.scraping_session.id if paper.scraping_session else '',
+        paper.scraping_session.query if paper.scraping_session else '',
+        paper.semantic_scholar_id,
+        paper.title,
+        paper.abstract,
+        paper.publication_year,
+        paper.venue,
+        paper.doi,
+        paper.url,
+        paper.pdf_url,
+        paper.citation_count,
+        paper.reference_count,
+        paper.influential_citation_count,
+        'Yes' if paper.is_open_access else 'No',
+        "; ".join(authors_list),
+        len(authors_list),
+        paper.scraped_at.replace(tzinfo=None) if paper.scraped_at else None,
+        paper.updated_at.replace(tzinfo=None) if paper.updated_at else None,
+    ]
+
+
+def session_summary_rows(session):
+    return [
+        ['Session ID', session.id],
+        ['Query', session.query],
+        ['Year From', session.year_from or 'Any'],
+        ['Year To', session.year_to or 'Any'],
+        ['Limit', session.limit],
+        ['Fields of Study', ', '.join(session.fields_of_study) if session.fields_of_study else 'Any'],
+        ['Publication Types', ', '.join(session.publication_types) if session.publication_types else 'Any'],
+        ['Min Citation Count', session.min_citation_count or 'Any'],
+        ['Open Access Only', 'Yes' if session.open_access_only else 'No'],
+        ['Status', session.status],
+        ['Papers Found', session.papers_found],
+        ['Papers Saved', session.papers_saved],
+        ['Errors Count', session.errors_count],
+        ['Created At', session.created_at.replace(tzinfo=None) if session.created_at else None],
+        ['Completed At', session.completed_at.replace(tzinfo=None) if session.completed_at else None],
+        ['Duration', str(session.duration) if session.duration else 'N/A']
+    ]
+
+
+def write_only_sheet(workbook, title, headers, rows):
+    """
+    Stream ``rows`` into a write-only worksheet
+
+    Column widths must be set before the first row is written, so they are estimated
+    from the headers and the first ``EXCEL_WIDTH_SAMPLE_ROWS`` rows only.
+    """
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    worksheet = workbook.create_sheet(title)
+    rows = iter(rows)
+    sample = list(islice(rows, EXCEL_WIDTH_SAMPLE_ROWS))
+
+    widths = [len(str(header)) for header in headers]
+    for row in sample:
+        for col, value in enumerate(row):
+            if value is not None:
+                widths[col] = max(widths[col], len(str(value)))
+    for col, width in enumerate(widths, 1):
+        worksheet.column_dimensions[get_column_letter(col)].width = min(width + 2, EXCEL_MAX_COLUMN_WIDTH)
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+
+    for row in chain(sample, rows):
+        worksheet.append(row)
+
+    return worksheet
+
+
+def write_results_workbook(fileobj, papers, authors, session=None, on_progress=None):
+    """
+    Write the papers, authors summary and optional session summary sheets to ``fileobj``
+
+    Uses an openpyxl write-only workbook so rows are flushed to disk as they are
+    written; ``on_progress(rows_done)`` is called every ``EXCEL_PROGRESS_EVERY`` papers.
+    """
+    import openpyxl
+
+    def paper_rows():
+        rows_done = 0
+        for paper in papers.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield excel_paper_row(paper)
+            rows_done += 1
+            if on_progress and rows_done % EXCEL_PROGRESS_EVERY == 0:
+                on_progress(rows_done)
+        if on_progress and rows_done % EXCEL_PROGRESS_EVERY:
+            on_progress(rows_done)
+
+    author_rows = (
+        [
+            author.full_name,
+            author.papers_count,
+            author.h_index,
+            author.citation_count,
+            "; ".join(author.affiliations) if author.affiliations else ""
+        ]
+        for author in authors
+    )
+
+    workbook = openpyxl.Workbook(write_only=True)
+    write_only_sheet(workbook, "Papers", PAPER_EXPORT_HEADERS, paper_rows())
+    write_only_sheet(workbook, "Authors Summary", AUTHOR_SUMMARY_HEADERS, author_rows)
+    if session:
+        write_only_sheet(workbook, "Session Summary", ['Parameter', 'Value'], session_summary_rows(session))
+    workbook.save(fileobj)
+
+
+def results_export_querysets(profile, params):
+    """Papers, top authors and session selected by the results export query params"""
+    _, session_pk = parse_session_id(params)
+    papers = ScholarRawRecord.objects.filter(session_records_filter(profile, session_pk)).select_related(
+        'profile', 'scraping_session'
+    ).prefetch_related('authors')
+    authors = ScholarAuthor.objects.filter(
+        session_records_filter(profile, session_pk, prefix='scholar_raw_records__')
+    )
+    session = None
+    if session_pk is not None:
+        session = ScrapingSession.objects.filter(id=session_pk, profile=profile).first()
+
+    query = params.get('query')
+    if query:
+        papers = apply_search_query(papers, query)
+
+    year_from = params.get('year_from')
+    if year_from:
+        try:
+            papers = papers.filter(publication_year__gte=int(year_from))
+        except ValueError:
+            pass
+
+    year_to = params.get('year_to')
+    if year_to:
+        try:
+            papers = papers.filter(publication_year__lte=int(year_to))
+        except ValueError:
+            pass
+
+    papers = papers.order_by('-scraped_at')
+    limit = params.get('limit')
+    if limit:
+        try:
+            papers = papers[:int(limit)]
+        except ValueError:
+            pass
+
+    authors = authors.annotate(
+        papers_count=Count('scholar_raw_records', distinct=True)
+    ).order_by('-papers_count')[:100]  # Top 100 authors
+
+    return papers, authors, session
+
+
+def results_export_filename(session_id=None):
+    return export_filename("scholar_analysis", "xlsx", session_id)
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from dip.models import ScholarAuthor, ScholarRawRecord
+from scholar.scholar.pipelines import ScholarBulkPipeline, ScholarPipeline
+
+
+def synthetic_items(prefix, papers, authors_per_paper):
+    for i in range(papers):
+        yield {
+            'semantic_scholar_id': f'{prefix}-paper-{i}',
+            'title': f'Synthetic paper {i}',
+            'abstract': 'Lorem ipsum dolor sit amet. ' * 20,
+            'publication_year': 1990 + i % 35,
+            'venue': f'Venue {i % 50}',
+            'doi': f'10.0000/{prefix}.{i}',
+            'url': f'https://www.semanticscholar.org/paper/{prefix}-{i}',
+            'pdf_url': '',
+            'citation_count': i % 1000,
+            'reference_count': i % 100,
+            'influential_citation_count': i % 10,
+            'is_open_access': i % 2 == 0,
+            'profile': None,
+            'session_id': None,
+            'authors_data': [
+                {
+                    'semantic_scholar_id': f'{prefix}-author-{(i + j) % (papers // 2 or 1)}',
+                    'full_name': f'Author {(i + j) % (papers // 2 or 1)}',
+                    'url': '',
+                    'h_index': None,
+                    'paper_count': 0,
+                    'citation_count': 0,
+                    'affiliations': [],
+                }
+                for j in range(authors_per_paper)
+            ],
+        }
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput of the per-item and the bulk upsert item pipelines on synthetic papers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--papers', type=int, default=10000, help='Number of synthetic papers')
+        parser.add_argument('--authors', type=int, default=3, help='Authors per paper')
+        parser.add_argument('--batch_size', type=int, default=500, help='Bulk pipeline batch size')
+
+    def handle(self, *args, **options):
+        papers = options['papers']
+        authors = options['authors']
+
+        try:
+            per_item = asyncio.run(self.run_per_item('bench-item', papers, authors))
+            bulk = asyncio.run(self.run_bulk('bench-bulk', papers, authors, options['batch_size']))
+        finally:
+            ScholarRawRecord.objects.filter(semantic_scholar_id__startswith='bench-').delete()
+            ScholarAuthor.objects.filter(semantic_scholar_id__startswith='bench-').delete()
+
+        self.stdout.write(f'{"pipeline":<10} {"seconds":>9} {"papers/s":>10}')
+        self.stdout.write(f'{"per-item":<10} {per_item:>9.2f} {papers / per_item:>10.1f}')
+        self.stdout.write(f'{"bulk":<10} {bulk:>9.2f} {papers / bulk:>10.1f}')
+        self.stdout.write(f'\nSpeedup: {per_item / bulk:.1f}x')
+
+    async def run_per_item(self, prefix, papers, authors):
+        pipeline = ScholarPipeline()
+        spider = SimpleNamespace(papers_saved=0, errors_count=0)
+
+        started = time.perf_counter()
+        for item in synthetic_items(prefix, papers, authors):
+            await pipeline.process_item(item, spider)
+        return time.perf_counter() - started
+
+    async def run_bulk(self, prefix, papers, authors, batch_size):
+        pipeline = ScholarBulkPipeline(batch_size=batch_size)
+        spider = SimpleNamespace(papers_saved=0, errors_count=0)
+
+        started = time.perf_counter()
+        for item in synthetic_items(prefix, papers, authors):
+            await pipeline.process_item(item, spider)
+        await pipeline.flush(spider)
+        return time.perf_counter() - started
@@ -0,0 +1,48 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from dip.tasks import CRAWL_RUNNERS
+
+
+class Command(BaseCommand):
+    help = 'Measure per-job wall time of the subprocess and in-process scraper execution modes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', type=str, default='graph neural networks', help='The search query')
+        parser.add_argument('--limit', type=int, default=1, help='Papers per job, keep small to isolate overhead')
+        parser.add_argument('--runs', type=int, default=3, help='Jobs per execution mode')
+        parser.add_argument('--modes', nargs='+', default=['subprocess', 'in_process'],
+                            choices=list(CRAWL_RUNNERS), help='Execution modes to benchmark')
+
+    def handle(self, *args, **options):
+        results = {}
+
+        for mode in options['modes']:
+            run_crawl = CRAWL_RUNNERS[mode]
+            timings = []
+
+            for run in range(options['runs']):
+                started = time.perf_counter()
+                result = run_crawl(query=options['query'], limit=options['limit'])
+                elapsed = time.perf_counter() - started
+                timings.append(elapsed)
+
+                self.stdout.write(f'{mode} run {run + 1}: {elapsed:.2f}s (return code {result["returncode"]})')
+
+            results[mode] = timings
+
+        self.stdout.write('')
+        self.stdout.write(f'{"mode":<12} {"first":>8} {"mean":>8} {"min":>8} {"warm mean":>10}')
+        for mode, timings in results.items():
+            warm = timings[1:] or timings
+            self.stdout.write(
+                f'{mode:<12} {timings[0]:>7.2f}s {statistics.mean(timings):>7.2f}s '
+                f'{min(timings):>7.2f}s {statistics.mean(warm):>9.2f}s'
+            )
+
+        if len(results) == 2:
+            (mode_a, a), (mode_b, b) = results.items()
+            saved = statistics.mean(a[1:] or a) - statistics.mean(b[1:] or b)
+            self.stdout.write(f'\nWarm per-job overhead saved by {mode_b} over {mode_a}: {saved:.2f}s')
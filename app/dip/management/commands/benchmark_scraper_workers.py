@@ -0,0 +1,114 @@
+import socket
+import subprocess
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from celery_app import app
+from dip.models import Profile, ScrapingSession
+from dip.progress import TERMINAL_STATUSES
+from dip.tasks import scrape_raw_data
+
+LOADTEST_QUEUE = 'scraper.raw-data.loadtest'
+LOADTEST_USERNAME = 'scraper-loadtest'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure how long scraper workers take to drain a queue of scrape sessions at several '
+        'concurrency levels. Crawls hit the real API through the shared rate limiter and '
+        'upsert papers, so run it against a staging database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=50, help='Sessions queued per run')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8], help='Worker concurrency levels')
+        parser.add_argument('--pool', type=str, default='prefork', choices=['prefork', 'threads'], help='Worker pool')
+        parser.add_argument('--query', type=str, default='graph neural networks', help='The search query')
+        parser.add_argument('--limit', type=int, default=20, help='Papers per session')
+        parser.add_argument('--timeout', type=int, default=3600, help='Seconds to wait for one run to drain')
+        parser.add_argument('--keep', action='store_true', help='Keep the load test sessions and their papers')
+
+    def handle(self, *args, **options):
+        profile = self.loadtest_profile()
+        results = []
+
+        for concurrency in options['concurrency']:
+            worker, node_name = self.start_worker(options['pool'], concurrency)
+            try:
+                sessions = self.enqueue(profile, options['sessions'], options['query'], options['limit'])
+                drain, failures = self.wait_for_drain(sessions, options['timeout'])
+            finally:
+                worker.terminate()
+                worker.wait(timeout=60)
+
+            results.append((concurrency, drain, failures))
+            self.stdout.write(f'concurrency {concurrency}: drained in {drain:.1f}s ({failures} failed)')
+
+            if not options['keep']:
+                ScrapingSession.objects.filter(id__in=sessions).delete()
+
+        self.stdout.write('')
+        self.stdout.write(f'{"concurrency":>11} {"drain s":>9} {"sessions/min":>13} {"failed":>7} {"speedup":>8}')
+        baseline = results[0][1]
+        for concurrency, drain, failures in results:
+            self.stdout.write(
+                f'{concurrency:>11} {drain:>9.1f} {options["sessions"] / drain * 60:>13.1f} '
+                f'{failures:>7} {baseline / drain:>7.1f}x'
+            )
+
+    @staticmethod
+    def loadtest_profile():
+        user, _ = User.objects.get_or_create(username=LOADTEST_USERNAME)
+        profile, _ = Profile.objects.get_or_create(user=user)
+        return profile
+
+    def start_worker(self, pool, concurrency):
+        """Start a worker on a dedicated queue and wait until it answers pings"""
+        node_name = f'loadtest-{concurrency}@{socket.gethostname()}'
+        worker = subprocess.Popen([
+            sys.executable, '-m', 'celery', '-A', 'celery_app', 'worker',
+            '-Q', LOADTEST_QUEUE, '-n', node_name, '-l', 'warning',
+            f'--pool={pool}', f'--concurrency={concurrency}', '--prefetch-multiplier=1',
+        ])
+
+        for _ in range(60):
+            if app.control.ping(destination=[node_name], timeout=1):
+                return worker, node_name
+            if worker.poll() is not None:
+                break
+        worker.terminate()
+        raise RuntimeError(f'Worker {node_name} did not start')
+
+    @staticmethod
+    def enqueue(profile, count, query, limit):
+        """Queue ``count`` sessions; each asks for a different year so responses are not cached"""
+        session_ids = []
+        for i in range(count):
+            year = 2024 - i % 50
+            session = ScrapingSession.objects.create(
+                profile=profile, query=query, year_from=year, year_to=year, limit=limit, status='PENDING'
+            )
+            scrape_raw_data.apply_async(
+                kwargs={
+                    'query': query, 'year_from': year, 'year_to': year, 'limit': limit,
+                    'profile_id': profile.id, 'session_id': session.id,
+                },
+                queue=LOADTEST_QUEUE,
+                routing_key=LOADTEST_QUEUE,
+            )
+            session_ids.append(session.id)
+        return session_ids
+
+    @staticmethod
+    def wait_for_drain(session_ids, timeout):
+        """Seconds until every session reached a terminal status, and how many failed"""
+        started = time.perf_counter()
+        while time.perf_counter() - started < timeout:
+            statuses = list(ScrapingSession.objects.filter(id__in=session_ids).values_list('status', flat=True))
+            if all(status in TERMINAL_STATUSES for status in statuses):
+                return time.perf_counter() - started, statuses.count('FAILURE')
+            time.sleep(1)
+        raise RuntimeError(f'Queue did not drain within {timeout}s')
@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from dip.models import ScholarRawRecord
+from dip.search import apply_search_query
+
+PREFIX = 'bench-search-'
+
+VOCABULARY = (
+    'graph neural network learning deep model attention transformer protein folding '
+    'climate ocean carbon quantum circuit error correction reinforcement policy robot '
+    'vision segmentation language translation speech retrieval ranking causal inference '
+    'bayesian sampling genome sequencing cancer imaging federated privacy compiler '
+    'database index query optimization distributed consensus storage energy battery'
+).split()
+
+
+def random_text(rng, words):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+class Command(BaseCommand):
+    help = 'Compare icontains and full-text search latency for the results query filter on seeded rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Rows to seed')
+        parser.add_argument('--runs', type=int, default=20, help='Timed runs per query and method')
+        parser.add_argument('--queries', nargs='+', default=['protein folding', 'quantum', 'federated privacy'],
+                            help='Search queries to time')
+        parser.add_argument('--batch_size', type=int, default=5000, help='Seeding batch size')
+        parser.add_argument('--keep', action='store_true', help='Keep seeded rows for further runs')
+
+    def handle(self, *args, **options):
+        try:
+            self.seed(options['rows'], options['batch_size'])
+
+            self.stdout.write(f'{"query":<20} {"method":<10} {"median ms":>10} {"p95 ms":>8} {"rows":>8}')
+            for query in options['queries']:
+                for method, build in (('icontains', self.icontains), ('fts', self.full_text)):
+                    timings, rows = self.time_query(build(query), options['runs'])
+                    p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+                    self.stdout.write(
+                        f'{query:<20} {method:<10} {statistics.median(timings):>10.1f} {p95:>8.1f} {rows:>8}'
+                    )
+        finally:
+            if not options['keep']:
+                ScholarRawRecord.objects.filter(semantic_scholar_id__startswith=PREFIX).delete()
+
+    def seed(self, rows, batch_size):
+        existing = ScholarRawRecord.objects.filter(semantic_scholar_id__startswith=PREFIX).count()
+        rng = random.Random(42)
+
+        for start in range(existing, rows, batch_size):
+            ScholarRawRecord.objects.bulk_create([
+                ScholarRawRecord(
+                    semantic_scholar_id=f'{PREFIX}{i}',
+                    title=random_text(rng, 8),
+                    abstract=random_text(rng, 150),
+                    publication_year=1990 + i % 35,
+                    citation_count=i % 1000,
+                )
+                for i in range(start, min(start + batch_size, rows))
+            ])
+            self.stdout.write(f'Seeded {min(start + batch_size, rows)} / {rows}')
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {ScholarRawRecord._meta.db_table}')
+
+    @staticmethod
+    def base_queryset():
+        return ScholarRawRecord.objects.filter(semantic_scholar_id__startswith=PREFIX)
+
+    def icontains(self, query):
+        return self.base_queryset().filter(
+            Q(title__icontains=query) | Q(abstract__icontains=query)
+        ).order_by('-scraped_at')
+
+    def full_text(self, query):
+        return apply_search_query(self.base_queryset(), query).order_by('-rank', '-id')
+
+    @staticmethod
+    def time_query(queryset, runs):
+        """Time the first results page, as the results view would fetch it"""
+        timings = []
+        rows = 0
+        for _ in range(runs):
+            started = time.perf_counter()
+            rows = len(list(queryset[:20]))
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, rows
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from dip.models import Profile
+from dip.stats import rebuild_profile_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stats rollups of profiles from their stored records.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile_id', type=int, nargs='+', help='Profiles to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        profile_ids = options.get('profile_id') or Profile.objects.order_by('id').values_list('id', flat=True)
+
+        for profile_id in profile_ids:
+            rebuild_profile_stats(profile_id)
+            self.stdout.write(f'Rebuilt stats for profile {profile_id}')
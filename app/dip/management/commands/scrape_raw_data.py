@@ -2,9 +2,10 @@
 import logging
 import json
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from scrapy.crawler import CrawlerProcess
 from scrapy.settings import Settings
+from dip.crawler import crawl_finish_reason
 from scholar.scholar import settings as project_settings
 from scholar.scholar.spiders.raw_data_spider import RawDataSpider
 
@@ -29,6 +30,11 @@ class Command(BaseCommand):
         parser.add_argument('--publication_types', type=str, help='JSON list of publication types')
         parser.add_argument('--min_citation_count', type=int, help='Minimum citation count filter')
         parser.add_argument('--open_access_only', action='store_true', help='Only open access papers')
+        parser.add_argument('--search_mode', type=str, default='relevance', choices=['relevance', 'bulk'],
+                            help='relevance (offset paging) or bulk (token paging)')
+        parser.add_argument('--continuation_token', type=str, help='Bulk search token to resume from')
+        parser.add_argument('--shard', type=str, help='Year window label when running one shard of a session')
+        parser.add_argument('--resume', action='store_true', help="Continue from the session's saved checkpoint")
 
     def handle(self, *args, **options):
         query = options['query']
@@ -56,6 +62,10 @@ class Command(BaseCommand):
 
         min_citation_count = options.get('min_citation_count')
         open_access_only = options.get('open_access_only', False)
+        search_mode = options.get('search_mode', 'relevance')
+        continuation_token = options.get('continuation_token')
+        shard = options.get('shard')
+        resume = options.get('resume', False)
 
         logger.info(f'Starting Semantic Scholar scraping:')
         logger.info(f'  Query: {query}')
@@ -67,10 +77,14 @@ class Command(BaseCommand):
         logger.info(f'  Open access only: {open_access_only}')
         logger.info(f'  Profile ID: {profile_id}')
         logger.info(f'  Session ID: {session_id}')
+        logger.info(f'  Search mode: {search_mode}')
+        logger.info(f'  Shard: {shard}')
+        logger.info(f'  Resume: {resume}')
 
         process = CrawlerProcess(custom_settings)
+        crawler = process.create_crawler(RawDataSpider)
         process.crawl(
-            RawDataSpider,
+            crawler,
             query=query,
             year_from=year_from,
             year_to=year_to,
@@ -80,8 +94,17 @@ class Command(BaseCommand):
             fields_of_study=fields_of_study,
             publication_types=publication_types,
             min_citation_count=min_citation_count,
-            open_access_only=open_access_only
+            open_access_only=open_access_only,
+            search_mode=search_mode,
+            continuation_token=continuation_token,
+            shard=shard,
+            resume=resume
         )
         process.start()
 
+        # A non-zero exit makes the Celery task retry the crawl from its checkpoint
+        finish_reason = crawl_finish_reason(crawler.stats.get_stats())
+        if finish_reason != 'finished':
+            raise CommandError(f"Spider finished with reason: {finish_reason}")
+
         logger.info('Semantic Scholar scraping completed successfully.')
@@ -1,15 +1,62 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
 from django.contrib.auth.models import AnonymousUser
-from dip.models import Profile
+from dip.profiles import get_cached_profile
+
 
 class AttachUserProfileMiddleware(MiddlewareMixin):
+    """
+    Sets ``request.profile`` to a lazy object resolved on first access
+
+    The profile comes from ``get_cached_profile`` so most requests never query it,
+    and views should use ``request.profile`` rather than ``request.user.profile``
+    so they all share the one resolved object.
+    """
+
     def process_request(self, request):
         user = getattr(request, 'user', None)
 
         if user and not isinstance(user, AnonymousUser) and user.is_authenticated:
-            try:
-                request.profile = Profile.objects.get(user=user)
-            except Profile.DoesNotExist:
-                request.profile = None
+            request.profile = SimpleLazyObject(lambda: get_cached_profile(user.pk))
         else:
             request.profile = None
+
+
+@database_sync_to_async
+def get_token_user_profile(token):
+    """User and profile for a valid OAuth2 access token, (None, None) otherwise"""
+    from core.auth.validators import get_cached_access_token
+
+    access_token = get_cached_access_token(token)
+    if access_token is None or not access_token.is_valid() or access_token.user is None:
+        return None, None
+
+    return access_token.user, get_cached_profile(access_token.user_id)
+
+
+class OAuth2TokenAuthMiddleware(BaseMiddleware):
+    """
+    Channels counterpart of OAuth2 authentication plus AttachUserProfileMiddleware
+
+    Reads the bearer token from the ``Authorization`` header or, since browsers cannot
+    set headers on WebSocket and EventSource requests, the ``access_token`` query param.
+    """
+
+    async def __call__(self, scope, receive, send):
+        token = None
+        headers = dict(scope.get('headers') or [])
+        authorization = headers.get(b'authorization', b'').decode()
+        if authorization.lower().startswith('bearer '):
+            token = authorization[7:].strip()
+        if not token:
+            token = parse_qs(scope.get('query_string', b'').decode()).get('access_token', [None])[0]
+
+        user, profile = await get_token_user_profile(token) if token else (None, None)
+        scope['user'] = user or AnonymousUser()
+        scope['profile'] = profile
+
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0007_scrapingsession_scholarrawrecord_scraping_session_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='continuation_token',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='search_mode',
+            field=models.CharField(choices=[('relevance', 'Relevance'), ('bulk', 'Bulk')], default='relevance', max_length=20),
+        ),
+    ]
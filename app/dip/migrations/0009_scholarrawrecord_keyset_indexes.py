@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0008_scrapingsession_search_mode'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=models.Index(fields=['profile', 'scraped_at', 'id'], name='dip_scholar_profile_7ddfae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=models.Index(fields=['profile', 'publication_year', 'id'], name='dip_scholar_profile_b1fc25_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=models.Index(fields=['profile', 'citation_count', 'id'], name='dip_scholar_profile_e498b2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=models.Index(fields=['profile', 'title', 'id'], name='dip_scholar_profile_20ae47_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=models.Index(fields=['scraping_session', 'scraped_at', 'id'], name='dip_scholar_scrapin_aab148_idx'),
+        ),
+    ]
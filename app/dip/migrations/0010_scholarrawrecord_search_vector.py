@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-17 04:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0009_scholarrawrecord_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarrawrecord',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('abstract', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='dip_scholar_search__45e1e5_gin'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 04:46
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0010_scholarrawrecord_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='scholarauthor',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('full_name'), name='gin_trgm_ops'), name='dip_author_full_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('venue'), name='gin_trgm_ops'), name='dip_record_venue_trgm'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-17 04:51
+
+import dip.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0011_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('papers_csv', 'Papers CSV'), ('authors_csv', 'Authors CSV'), ('results_csv', 'Results CSV'), ('papers_excel', 'Papers Excel')], max_length=20)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('task_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('STARTED', 'Started'), ('SUCCESS', 'Success'), ('FAILURE', 'Failure')], default='PENDING', max_length=20)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('rows_total', models.IntegerField(blank=True, null=True)),
+                ('rows_done', models.IntegerField(default=0)),
+                ('file', models.FileField(blank=True, max_length=500, null=True, upload_to=dip.models.export_file_path)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='dip.profile')),
+            ],
+            options={
+                'verbose_name': 'Export Job',
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['profile', 'created_at'], name='dip_exportj_profile_907a73_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-17 05:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0012_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('papers_count', models.IntegerField(default=0)),
+                ('authors_count', models.IntegerField(default=0)),
+                ('citations_total', models.BigIntegerField(default=0)),
+                ('citations_max', models.IntegerField(default=0)),
+                ('open_access_count', models.IntegerField(default=0)),
+                ('papers_by_year', models.JSONField(default=dict)),
+                ('venue_counts', models.JSONField(default=dict)),
+                ('scraped_by_day', models.JSONField(default=dict)),
+                ('top_cited', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_rollups', to='dip.profile')),
+                ('scraping_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stats_rollups', to='dip.scrapingsession')),
+            ],
+            options={
+                'verbose_name': 'Stats Rollup',
+                'verbose_name_plural': 'Stats Rollups',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('scraping_session__isnull', False)), fields=('profile', 'scraping_session'), name='dip_stats_rollup_session_unique'), models.UniqueConstraint(condition=models.Q(('scraping_session__isnull', True)), fields=('profile',), name='dip_stats_rollup_profile_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-17 05:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0013_statsrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='results_session',
+            field=models.ForeignKey(blank=True, help_text='In-flight session whose crawl this request was attached to', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='subscriber_sessions', to='dip.scrapingsession'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0014_scrapingsession_coalescing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='checkpoint',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
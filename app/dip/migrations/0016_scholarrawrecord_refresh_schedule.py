@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 05:13
+
+import dip.models
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0015_scrapingsession_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarrawrecord',
+            name='citation_velocity',
+            field=models.FloatField(default=0, help_text='Estimated new citations per day'),
+        ),
+        # Papers stored before the scheduler existed are due right away
+        migrations.AddField(
+            model_name='scholarrawrecord',
+            name='next_refresh_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='scholarrawrecord',
+            name='next_refresh_at',
+            field=models.DateTimeField(default=dip.models.default_next_refresh),
+        ),
+        migrations.AddField(
+            model_name='scholarrawrecord',
+            name='refreshed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='scholarrawrecord',
+            index=models.Index(fields=['next_refresh_at', '-citation_count'], name='dip_record_refresh_due'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dip', '0016_scholarrawrecord_refresh_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CitationEdge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paper_id', models.CharField(max_length=100)),
+                ('cited_id', models.CharField(db_index=True, max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Citation Edge',
+                'verbose_name_plural': 'Citation Edges',
+                'constraints': [models.UniqueConstraint(fields=('paper_id', 'cited_id'), name='dip_citation_edge_unique')],
+            },
+        ),
+    ]
@@ -1,5 +1,17 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+
+def default_next_refresh():
+    """Freshly scraped papers wait the shortest refresh interval, see dip.refresh"""
+    return timezone.now() + timedelta(days=settings.PAPER_REFRESH['MIN_INTERVAL_DAYS'])
 
 
 class Profile(models.Model):
@@ -35,6 +47,18 @@ class ScholarRawRecord(models.Model):
     authors = models.ManyToManyField('ScholarAuthor', blank=True, related_name='scholar_raw_records')
     scraped_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Metric refresh schedule, see dip.refresh
+    refreshed_at = models.DateTimeField(blank=True, null=True)
+    next_refresh_at = models.DateTimeField(default=default_next_refresh)
+    citation_velocity = models.FloatField(default=0, help_text='Estimated new citations per day')
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('abstract', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = 'Scholar Raw Record'
@@ -44,6 +68,17 @@ class ScholarRawRecord(models.Model):
             models.Index(fields=['publication_year']),
             models.Index(fields=['citation_count']),
             models.Index(fields=['venue']),
+            # Keyset pagination: (profile, sort field, id) for every sortable column
+            models.Index(fields=['profile', 'scraped_at', 'id']),
+            models.Index(fields=['profile', 'publication_year', 'id']),
+            models.Index(fields=['profile', 'citation_count', 'id']),
+            models.Index(fields=['profile', 'title', 'id']),
+            models.Index(fields=['scraping_session', 'scraped_at', 'id']),
+            # Refresh scheduler: most overdue first, most cited first among equals
+            models.Index(fields=['next_refresh_at', '-citation_count'], name='dip_record_refresh_due'),
+            GinIndex(fields=['search_vector']),
+            # Trigram index on UPPER(venue) serves venue__icontains / __istartswith
+            GinIndex(OpClass(Upper('venue'), name='gin_trgm_ops'), name='dip_record_venue_trgm'),
         ]
 
     def __str__(self):
@@ -68,6 +103,7 @@ class ScholarAuthor(models.Model):
         indexes = [
             models.Index(fields=['h_index']),
             models.Index(fields=['citation_count']),
+            GinIndex(OpClass(Upper('full_name'), name='gin_trgm_ops'), name='dip_author_full_name_trgm'),
         ]
 
     def __str__(self):
@@ -89,6 +125,10 @@ class ScrapingSession(models.Model):
     publication_types = models.JSONField(default=list)
     min_citation_count = models.IntegerField(blank=True, null=True)
     open_access_only = models.BooleanField(default=False)
+    search_mode = models.CharField(max_length=20, choices=[
+        ('relevance', 'Relevance'),
+        ('bulk', 'Bulk'),
+    ], default='relevance')
 
     # Session metadata
     task_id = models.CharField(max_length=100, blank=True, null=True)
@@ -100,6 +140,16 @@ class ScrapingSession(models.Model):
         ('RETRY', 'Retry'),
         ('REVOKED', 'Revoked')
     ], default='PENDING')
+    continuation_token = models.TextField(blank=True, null=True)
+    # Finished page offsets and committed paper ids of an interrupted crawl, see dip.checkpoint
+    checkpoint = models.JSONField(default=dict, blank=True)
+
+    # Identical requests share one crawl, see dip.coalesce
+    fingerprint = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    results_session = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, blank=True, null=True, related_name='subscriber_sessions',
+        help_text='In-flight session whose crawl this request was attached to'
+    )
 
     # Results
     papers_found = models.IntegerField(default=0)
@@ -152,3 +202,134 @@ class ScrapingSession(models.Model):
             params.append("Open access only")
 
         return " | ".join(params)
+
+
+def export_file_path(instance, filename):
+    return f'exports/{instance.profile_id}/{filename}'
+
+
+class ExportJob(models.Model):
+    """
+    A results export generated in the background by dip.tasks.run_export_job
+    """
+    KIND_CHOICES = [
+        ('papers_csv', 'Papers CSV'),
+        ('authors_csv', 'Authors CSV'),
+        ('results_csv', 'Results CSV'),
+        ('papers_excel', 'Papers Excel'),
+    ]
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+
+    task_id = models.CharField(max_length=100, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=[
+        ('PENDING', 'Pending'),
+        ('STARTED', 'Started'),
+        ('SUCCESS', 'Success'),
+        ('FAILURE', 'Failure'),
+    ], default='PENDING')
+    error = models.TextField(blank=True, null=True)
+
+    # Progress
+    rows_total = models.IntegerField(blank=True, null=True)
+    rows_done = models.IntegerField(default=0)
+
+    # Result
+    file = models.FileField(upload_to=export_file_path, max_length=500, blank=True, null=True)
+    file_size = models.BigIntegerField(blank=True, null=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Export Job'
+        verbose_name_plural = 'Export Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['profile', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Export {self.id}: {self.kind} ({self.status})"
+
+    @property
+    def progress(self):
+        """Share of rows written, from 0 to 100"""
+        if self.status == 'SUCCESS':
+            return 100.0
+        if not self.rows_total:
+            return 0.0
+        return round(min(self.rows_done / self.rows_total, 1) * 100, 1)
+
+
+class StatsRollup(models.Model):
+    """
+    Precomputed results statistics for a profile's session, or the whole profile
+
+    Rows with ``scraping_session`` set are moved by each batch the ingestion pipelines
+    write and recomputed when the crawl closes (see dip.stats); the profile row
+    (``scraping_session`` null) is kept in step by applying each session row's change to it.
+    """
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='stats_rollups')
+    scraping_session = models.ForeignKey(
+        ScrapingSession, on_delete=models.CASCADE, blank=True, null=True, related_name='stats_rollups'
+    )
+
+    papers_count = models.IntegerField(default=0)
+    authors_count = models.IntegerField(default=0)
+    citations_total = models.BigIntegerField(default=0)
+    citations_max = models.IntegerField(default=0)
+    open_access_count = models.IntegerField(default=0)
+
+    # {"2021": 12, ...}, {"NeurIPS": 3, ...} and {"2025-01-31": 40, ...}
+    papers_by_year = models.JSONField(default=dict)
+    venue_counts = models.JSONField(default=dict)
+    scraped_by_day = models.JSONField(default=dict)
+    top_cited = models.JSONField(default=list)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Stats Rollup'
+        verbose_name_plural = 'Stats Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['profile', 'scraping_session'],
+                condition=models.Q(scraping_session__isnull=False),
+                name='dip_stats_rollup_session_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['profile'],
+                condition=models.Q(scraping_session__isnull=True),
+                name='dip_stats_rollup_profile_unique',
+            ),
+        ]
+
+    def __str__(self):
+        scope = f"session {self.scraping_session_id}" if self.scraping_session_id else "all sessions"
+        return f"Stats for profile {self.profile_id}, {scope}"
+
+
+class CitationEdge(models.Model):
+    """
+    ``paper_id`` cites ``cited_id``, both Semantic Scholar paper ids
+
+    Neither end has to be a stored ScholarRawRecord, which keeps rows small and lets
+    the citation graph crawl (see dip.citation_graph) insert them in bulk.
+    """
+    paper_id = models.CharField(max_length=100)
+    cited_id = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        verbose_name = 'Citation Edge'
+        verbose_name_plural = 'Citation Edges'
+        constraints = [
+            models.UniqueConstraint(fields=['paper_id', 'cited_id'], name='dip_citation_edge_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.paper_id} -> {self.cited_id}'
@@ -0,0 +1,141 @@
+import base64
+import json
+from typing import List
+from urllib.parse import urlencode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.db.models import Func, Q, Value
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+RESULT_SORT_FIELDS = [
+    'publication_year', '-publication_year',
+    'citation_count', '-citation_count',
+    'title', '-title',
+    'scraped_at', '-scraped_at'
+]
+
+
+class Row(Func):
+    """SQL row constructor, lets ``(field, id) < (value, id)`` use a composite index"""
+    function = 'ROW'
+    output_field = models.Field()
+
+
+class KeysetPagination:
+    """
+    Cursor pagination over a composite ``(sort field, id)`` key
+
+    Pages are fetched with an index range scan from the last row of the previous page
+    instead of ``OFFSET``, and no ``COUNT(*)`` is run. Only forward links are provided.
+    Nullable sort fields follow PostgreSQL ordering: NULLs last ascending, first descending.
+    Their NULL rows are read as a separate segment once the other rows run out, so
+    every query stays a range on the ``(sort field, id)`` index.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordering: str, page_size=None, max_page_size=None):
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.page_size = page_size or self.page_size
+        self.max_page_size = max_page_size or self.max_page_size
+        self.next_cursor = None
+        self.request = None
+
+    @staticmethod
+    def is_requested(request) -> bool:
+        """Cursor mode is used when the client sends a cursor or asks for it explicitly"""
+        return (
+            KeysetPagination.cursor_query_param in request.query_params
+            or request.query_params.get('pagination') == 'cursor'
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj) -> str:
+        value = getattr(obj, self.field_name)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        payload = json.dumps({'v': value, 'id': obj.pk}).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def decode_cursor(self, queryset, cursor: str):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            field = queryset.model._meta.get_field(self.field_name)
+            value = field.to_python(payload['v']) if payload['v'] is not None else None
+            return value, int(payload['id'])
+        except (ValueError, KeyError, TypeError, DjangoValidationError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+
+    def segments_after(self, queryset, value, pk) -> List:
+        """
+        Querysets holding the rows strictly after ``(value, pk)``, to be read in order
+
+        A row comparison never matches NULL, and ORing ``IS NULL`` into it would turn
+        the index range into a filter, so the NULL rows of a nullable field get their
+        own segment. A cursor on a NULL row continues within that segment by id.
+        """
+        field = self.field_name
+        nullable = queryset.model._meta.get_field(field).null
+        lookup = 'lt' if self.descending else 'gt'
+
+        if value is None:
+            segments = [queryset.filter(Q(**{f'{field}__isnull': True, f'id__{lookup}': pk}))]
+            if self.descending:
+                segments.append(queryset.filter(**{f'{field}__isnull': False}))
+            return segments
+
+        segments = [
+            queryset.alias(_keyset=Row(field, 'id')).filter(**{f'_keyset__{lookup}': Row(Value(value), Value(pk))})
+        ]
+        if nullable and not self.descending:
+            segments.append(queryset.filter(**{f'{field}__isnull': True}))
+        return segments
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        sign = '-' if self.descending else ''
+        queryset = queryset.order_by(f'{sign}{self.field_name}', f'{sign}id')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        segments = self.segments_after(queryset, *self.decode_cursor(queryset, cursor)) if cursor else [queryset]
+
+        page_size = self.get_page_size(request)
+        page = []
+        for segment in segments:
+            page.extend(segment[:page_size + 1 - len(page)])
+            if len(page) > page_size:
+                break
+
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.next_cursor
+        params.pop('pagination', None)
+        return self.request.build_absolute_uri(f'{self.request.path}?{urlencode(params, doseq=True)}')
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.core.cache import cache
+
+from dip.models import Profile
+
+PROFILE_CACHE_TTL = 5 * 60
+# Local entries are only invalidated in the process that saved the profile,
+# so keep them short-lived to bound staleness across workers
+PROFILE_LOCAL_TTL = 30
+PROFILE_LOCAL_MAX_SIZE = 1024
+
+_MISSING = object()
+
+
+class ProfileLRU:
+    """Thread-safe, size-bounded map of user id -> (profile or None, expiry)"""
+
+    def __init__(self, max_size: int = PROFILE_LOCAL_MAX_SIZE, ttl: float = PROFILE_LOCAL_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return _MISSING
+            profile, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return _MISSING
+            self._entries.move_to_end(user_id)
+            return profile
+
+    def set(self, user_id, profile):
+        with self._lock:
+            self._entries[user_id] = (profile, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_profiles = ProfileLRU()
+
+
+def profile_cache_key(user_id) -> str:
+    return f'profile:user:{user_id}'
+
+
+def get_cached_profile(user_id) -> Optional[Profile]:
+    """
+    Profile of the user, looked up in the process-local LRU, then Redis, then the database
+
+    Users without a profile are cached as ``None`` too, so they do not hit the database
+    on every request either.
+    """
+    profile = local_profiles.get(user_id)
+    if profile is not _MISSING:
+        return profile
+
+    key = profile_cache_key(user_id)
+    profile = cache.get(key, _MISSING)
+    if profile is _MISSING:
+        profile = Profile.objects.filter(user_id=user_id).first()
+        cache.set(key, profile, PROFILE_CACHE_TTL)
+
+    local_profiles.set(user_id, profile)
+    return profile
+
+
+def invalidate_cached_profile(user_id):
+    local_profiles.delete(user_id)
+    cache.delete(profile_cache_key(user_id))
+
+
+def request_profile(request) -> Optional[Profile]:
+    """
+    The caller's profile, or a real None
+
+    ``request.profile`` is a lazy object, and a lazy None is not accepted as a
+    query value, so views filter by this instead.
+    """
+    return getattr(request, 'profile', None) or None
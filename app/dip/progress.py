@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from dip.models import ScrapingSession
+
+logger = logging.getLogger(__name__)
+
+# Spider counters are published at most this often per session
+PROGRESS_MIN_INTERVAL = 1.0
+# Spider counter deltas are written to the session row this often
+COUNTER_FLUSH_INTERVAL = 2.0
+SNAPSHOT_CACHE_TTL = 24 * 60 * 60
+TERMINAL_STATUSES = {'SUCCESS', 'FAILURE', 'REVOKED'}
+
+# Session fields fed by spider counters: session field -> spider attribute
+SESSION_COUNTERS = {
+    'papers_found': 'papers_processed',
+    'papers_saved': 'papers_saved',
+    'errors_count': 'errors_count',
+}
+# Snapshot fields whose change moves its ``updated_at``
+SNAPSHOT_DATA_FIELDS = ('status', *SESSION_COUNTERS)
+
+
+def session_group_name(session_id) -> str:
+    return f'scrape-session-{session_id}'
+
+
+def session_snapshot(session, updated_at: Optional[str] = None) -> Dict[str, Any]:
+    """Current state of a session, sent to subscribers when they connect"""
+    return {
+        'event': 'snapshot',
+        'session_id': session.id,
+        'profile_id': session.profile_id,
+        'query': session.query,
+        'status': session.status,
+        'papers_found': session.papers_found,
+        'papers_saved': session.papers_saved,
+        'errors_count': session.errors_count,
+        'updated_at': updated_at or timezone.now().isoformat(),
+        'timestamp': time.time(),
+    }
+
+
+def snapshot_cache_key(session_id) -> str:
+    return f'scrape-session:{session_id}:snapshot'
+
+
+def cache_session_snapshot(session) -> Dict[str, Any]:
+    """
+    Store the session's current counters and status for cheap progress reads
+
+    ``updated_at`` is the time the counters or status last changed, so a refresh
+    that finds them unchanged keeps the previous value. Without a cached snapshot,
+    a finished session dates from its completion.
+    """
+    key = snapshot_cache_key(session.id)
+    previous = cache.get(key)
+    if previous and all(previous.get(field) == getattr(session, field) for field in SNAPSHOT_DATA_FIELDS):
+        updated_at = previous['updated_at']
+    elif previous is None and session.status in TERMINAL_STATUSES and session.completed_at:
+        updated_at = session.completed_at.isoformat()
+    else:
+        updated_at = None
+
+    snapshot = session_snapshot(session, updated_at)
+    cache.set(key, snapshot, SNAPSHOT_CACHE_TTL)
+    return snapshot
+
+
+def get_session_snapshot(session_id) -> Optional[Dict[str, Any]]:
+    """Cached snapshot of a session, loaded from the database on a miss"""
+    snapshot = cache.get(snapshot_cache_key(session_id))
+    if snapshot is not None:
+        return snapshot
+
+    session = ScrapingSession.objects.filter(id=session_id).first()
+    return cache_session_snapshot(session) if session else None
+
+
+class SessionCounterFlusher:
+    """
+    Writes spider counter deltas to the ScrapingSession row
+
+    Each flush is a single ``UPDATE ... SET field = field + delta`` so concurrent
+    writers never lose increments, followed by a snapshot refresh. Flushes run in
+    database threads and may overlap, e.g. the periodic one and the one on close,
+    so they are serialised to write each delta only once.
+    """
+
+    def __init__(self, session_id: int):
+        self.session_id = session_id
+        self.flushed = {field: 0 for field in SESSION_COUNTERS}
+        self.lock = threading.Lock()
+
+    def flush(self, spider) -> bool:
+        with self.lock:
+            current = {field: getattr(spider, attribute, 0) for field, attribute in SESSION_COUNTERS.items()}
+            deltas = {field: current[field] - self.flushed[field] for field in SESSION_COUNTERS}
+            if not any(deltas.values()):
+                return False
+
+            ScrapingSession.objects.filter(id=self.session_id).update(**{
+                field: F(field) + delta for field, delta in deltas.items() if delta
+            })
+            self.flushed = current
+
+        session = ScrapingSession.objects.filter(id=self.session_id).first()
+        if session:
+            cache_session_snapshot(session)
+        return True
+
+
+def _progress_message(session_id, fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'type': 'scrape.progress',
+        'payload': {'session_id': session_id, 'timestamp': time.time(), **fields},
+    }
+
+
+async def apublish_progress(session_id, **fields):
+    """Send a progress event to everyone subscribed to the session"""
+    channel_layer = get_channel_layer()
+    if not session_id or channel_layer is None:
+        return
+
+    try:
+        await channel_layer.group_send(session_group_name(session_id), _progress_message(session_id, fields))
+    except Exception as e:
+        logger.warning(f"Could not publish progress for session {session_id}: {e}")
+
+
+def publish_progress(session_id, **fields):
+    """Synchronous ``apublish_progress`` for Celery tasks"""
+    async_to_sync(apublish_progress)(session_id, **fields)
+
+
+class ProgressPublisher:
+    """
+    Coalesces spider counters into at most one event per ``min_interval``
+
+    Pipelines call ``update`` after every write; counters that change between two
+    events are carried by the next one, and ``flush`` sends whatever is still pending.
+    """
+
+    def __init__(self, session_id: Optional[int], min_interval: float = PROGRESS_MIN_INTERVAL):
+        self.session_id = session_id
+        self.min_interval = min_interval
+        self.last_published = 0.0
+        self.pending = False
+
+    async def update(self, spider):
+        self.pending = True
+        if time.monotonic() - self.last_published >= self.min_interval:
+            await self.flush(spider)
+
+    async def flush(self, spider):
+        if not self.session_id or not self.pending:
+            return
+
+        self.pending = False
+        self.last_published = time.monotonic()
+        fields = dict(
+            papers_processed=getattr(spider, 'papers_processed', 0),
+            papers_saved=getattr(spider, 'papers_saved', 0),
+            errors_count=getattr(spider, 'errors_count', 0),
+        )
+        # Each shard reports its own counters; the session totals are in the snapshot
+        if getattr(spider, 'shard', None):
+            fields['shard'] = spider.shard
+        await apublish_progress(self.session_id, event='progress', **fields)
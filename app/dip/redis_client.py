@@ -0,0 +1,23 @@
+import threading
+
+import redis
+from django.conf import settings
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis_client() -> redis.Redis:
+    """Process-wide connection to the Redis instance behind CACHES['default']"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = redis.Redis.from_url(settings.CACHES['default']['LOCATION'])
+        return _client
+
+
+def reset_redis_client():
+    """Forget the client so a forked worker process opens its own connections"""
+    global _client
+    with _client_lock:
+        _client = None
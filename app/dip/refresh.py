@@ -0,0 +1,191 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from dip.clients.semantic_scholar import SemanticScholarAPI
+from dip.models import ScholarRawRecord
+from dip.stats import StatsRefresher
+
+logger = logging.getLogger(__name__)
+
+REFRESH_LOCK_KEY = 'papers:refresh:lock'
+
+# Only the metrics that move after publication are re-fetched
+REFRESH_API_FIELDS = "paperId,citationCount,referenceCount,influentialCitationCount,isOpenAccess,openAccessPdf"
+
+METRIC_FIELDS = ['citation_count', 'reference_count', 'influential_citation_count', 'is_open_access', 'pdf_url']
+SCHEDULE_FIELDS = ['next_refresh_at']
+REFRESHED_SCHEDULE_FIELDS = ['refreshed_at', 'citation_velocity', 'next_refresh_at']
+
+# Fields whose change moves the stats rollups, see dip.stats
+STATS_FIELDS = {'citation_count', 'is_open_access'}
+
+
+def refresh_budget() -> int:
+    """Batch requests one run may make: API_SHARE of the shared rate over one schedule period"""
+    config = settings.PAPER_REFRESH
+    rate = settings.SEMANTIC_SCHOLAR_RATE_LIMIT['rate']
+    return max(1, int(rate * config['API_SHARE'] * config['SCHEDULE_SECONDS']))
+
+
+def refresh_interval(velocity: float, publication_year: Optional[int], now: datetime) -> timedelta:
+    """
+    Time until the paper is expected to gain TARGET_CITATIONS new citations
+
+    Papers from the last RECENT_YEARS years are capped at a proportionally shorter
+    maximum, since their counts tend to move before any velocity has been observed.
+    """
+    config = settings.PAPER_REFRESH
+    min_days, max_days = config['MIN_INTERVAL_DAYS'], config['MAX_INTERVAL_DAYS']
+
+    if publication_year:
+        age = max(now.year - publication_year, 0)
+        if age < config['RECENT_YEARS']:
+            max_days = max(min_days, max_days * (age + 1) / (config['RECENT_YEARS'] + 1))
+
+    days = config['TARGET_CITATIONS'] / velocity if velocity > 0 else max_days
+    return timedelta(days=min(max(days, min_days), max_days))
+
+
+def estimate_velocity(record: ScholarRawRecord, old_citations: int, now: datetime) -> float:
+    """
+    Citations per day, smoothed over refreshes
+
+    The first refresh has no earlier observation, so the lifetime average since
+    the middle of the publication year is used instead.
+    """
+    if record.refreshed_at:
+        days = max((now - record.refreshed_at).total_seconds() / 86400, 1 / 24)
+        observed = max(record.citation_count - old_citations, 0) / days
+        return (record.citation_velocity + observed) / 2
+
+    if not record.publication_year:
+        return 0.0
+    published = datetime(record.publication_year, 7, 1, tzinfo=now.tzinfo)
+    days = max((now - published).days, 30)
+    return record.citation_count / days
+
+
+def paper_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Model values for a paper/batch record"""
+    open_access_pdf = data.get('openAccessPdf')
+    return {
+        'citation_count': data.get('citationCount') or 0,
+        'reference_count': data.get('referenceCount') or 0,
+        'influential_citation_count': data.get('influentialCitationCount') or 0,
+        'is_open_access': bool(data.get('isOpenAccess')),
+        'pdf_url': (open_access_pdf.get('url') or '') if isinstance(open_access_pdf, dict) else '',
+    }
+
+
+def apply_paper_metrics(record: ScholarRawRecord, data: Dict[str, Any]) -> Tuple[str, ...]:
+    """Set the fetched metrics on ``record`` and return the names of those that changed"""
+    changed = []
+    for field, value in paper_metrics(data).items():
+        if getattr(record, field) != value:
+            setattr(record, field, value)
+            changed.append(field)
+    return tuple(changed)
+
+
+def due_papers(now: datetime, limit: int) -> List[ScholarRawRecord]:
+    return list(
+        ScholarRawRecord.objects.filter(next_refresh_at__lte=now, semantic_scholar_id__isnull=False)
+        .order_by('next_refresh_at', '-citation_count')
+        .only(
+            'id', 'semantic_scholar_id', 'scraping_session_id', 'publication_year',
+            'refreshed_at', 'next_refresh_at', 'citation_velocity', *METRIC_FIELDS,
+        )[:limit]
+    )
+
+
+def refresh_papers(api: SemanticScholarAPI, records: List[ScholarRawRecord], stats: StatsRefresher) -> Dict[str, int]:
+    """
+    Re-fetch one batch of papers and store what changed
+
+    Records are grouped by the set of columns that changed, so each ``bulk_update``
+    writes only those columns plus the schedule. Papers the API reported as unknown
+    keep their metrics and are rescheduled from their current velocity. A failed
+    request raises before anything is written, so the batch stays due.
+    """
+    now = timezone.now()
+    fetched = api.get_papers_batch(
+        [record.semantic_scholar_id for record in records], fields=REFRESH_API_FIELDS, raise_errors=True
+    )
+
+    groups = defaultdict(list)
+    for record in records:
+        data = fetched.get(record.semantic_scholar_id)
+        if data is None:
+            record.next_refresh_at = now + refresh_interval(record.citation_velocity, record.publication_year, now)
+            groups[None].append(record)
+            continue
+
+        old_citations = record.citation_count
+        changed = apply_paper_metrics(record, data)
+        record.citation_velocity = estimate_velocity(record, old_citations, now)
+        record.refreshed_at = now
+        record.next_refresh_at = now + refresh_interval(record.citation_velocity, record.publication_year, now)
+        groups[changed].append(record)
+
+        if STATS_FIELDS.intersection(changed):
+            stats.mark(record.scraping_session_id)
+
+    for changed, group in groups.items():
+        fields = SCHEDULE_FIELDS if changed is None else [*changed, *REFRESHED_SCHEDULE_FIELDS]
+        ScholarRawRecord.objects.bulk_update(group, fields)
+
+    return {
+        'refreshed': len(records) - len(groups.get(None, [])),
+        'changed': sum(len(group) for changed, group in groups.items() if changed),
+        'missing': len(groups.get(None, [])),
+    }
+
+
+def refresh_stale_papers(max_requests: Optional[int] = None) -> Dict[str, int]:
+    """
+    Refresh the most overdue papers within the run's request budget
+
+    Runs do not overlap: a run still in progress when beat fires again makes the
+    next one skip. The response cache is bypassed so metrics are current.
+    """
+    config = settings.PAPER_REFRESH
+    max_requests = max_requests or refresh_budget()
+    totals = {'requests': 0, 'refreshed': 0, 'changed': 0, 'missing': 0}
+
+    if not cache.add(REFRESH_LOCK_KEY, 1, config['SCHEDULE_SECONDS'] * 2):
+        logger.info("Paper refresh already running, skipping")
+        return totals
+
+    try:
+        api = SemanticScholarAPI()
+        api.cache = None
+        stats = StatsRefresher()
+
+        while totals['requests'] < max_requests:
+            records = due_papers(timezone.now(), config['BATCH_SIZE'])
+            if not records:
+                break
+
+            try:
+                result = refresh_papers(api, records, stats)
+            except requests.exceptions.RequestException as e:
+                # Leave the schedule alone and try again on the next run
+                logger.warning(f"Paper refresh stopped, batch request failed: {e}")
+                break
+            totals['requests'] += 1
+            for key, value in result.items():
+                totals[key] += value
+
+        stats.refresh()
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+
+    logger.info(f"Paper refresh: {totals}")
+    return totals
@@ -0,0 +1,17 @@
+from django.urls import path
+
+from dip.consumers import ScrapeProgressConsumer, ScrapeProgressSSEConsumer
+from dip.middleware import OAuth2TokenAuthMiddleware
+
+
+websocket_urlpatterns = [
+    path('ws/scraping-session/<int:session_id>/', ScrapeProgressConsumer.as_asgi()),
+]
+
+# Matched before the Django application, only these need token auth in ASGI
+http_urlpatterns = [
+    path(
+        'api/v1/scraping-session/<int:session_id>/events/',
+        OAuth2TokenAuthMiddleware(ScrapeProgressSSEConsumer.as_asgi())
+    ),
+]
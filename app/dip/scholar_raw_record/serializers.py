@@ -6,4 +6,4 @@ from dip.models import ScholarRawRecord
 class ScholarRawRecordSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScholarRawRecord
-        fields = '__all__'
+        exclude = ['search_vector']
@@ -1,14 +1,36 @@
-import csv
+import tempfile
+
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from dip.scholar_raw_record.serializers import ScholarRawRecordSerializer
-from dip.models import ScholarRawRecord, ScholarAuthor, ScrapingSession
-from django.db.models import Q, Count
-from django.http import HttpResponse
-from datetime import datetime
+from dip.export_job.serializers import ExportJobSerializer
+from dip.models import ScholarRawRecord, ExportJob
+from dip.pagination import KeysetPagination, RESULT_SORT_FIELDS
+from dip.coalesce import session_records_filter
+from dip.profiles import request_profile
+from dip.exports import (
+    CSV_EXPORTS,
+    EXCEL_SYNC_MAX_ROWS,
+    EXPORT_CHUNK_SIZE,
+    export_filename,
+    results_export_filename,
+    results_export_querysets,
+    streaming_csv_response,
+    write_results_workbook,
+)
+from dip.tasks import run_export_job
+from dip.progress import TERMINAL_STATUSES, get_session_snapshot
+from django.http import FileResponse
+
+# Actions that may read records of another profile's crawl through an attached session
+SHARED_RESULTS_ACTIONS = ('list',)
+
 
 class ScholarRawRecordPagination(PageNumberPagination):
     page_size = 10
@@ -21,447 +43,192 @@ class ScholarRawRecordViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = ScholarRawRecordPagination
 
-    def get_queryset(self):
-        queryset = ScholarRawRecord.objects.filter(profile=self.request.profile)
+    @property
+    def paginator(self):
+        """Switch to keyset pagination when the client asks for a cursor"""
+        if not hasattr(self, '_paginator'):
+            if self.action == 'list' and KeysetPagination.is_requested(self.request):
+                self._paginator = KeysetPagination(
+                    ordering=self.get_sort_by(),
+                    page_size=self.pagination_class.page_size,
+                    max_page_size=self.pagination_class.max_page_size,
+                )
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_sort_by(self):
+        sort_by = self.request.query_params.get('sort_by', '-scraped_at')
+        return sort_by if sort_by in RESULT_SORT_FIELDS else '-scraped_at'
 
+    def get_queryset(self):
         # Filter by scraping session if provided
-        session_id = self.request.query_params.get('session_id')
-        if session_id:
-            try:
-                queryset = queryset.filter(scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
+        try:
+            session_id = int(self.request.query_params.get('session_id'))
+        except (ValueError, TypeError):
+            session_id = None
+
+        if self.action in SHARED_RESULTS_ACTIONS:
+            records = session_records_filter(request_profile(self.request), session_id)
+        else:
+            # Records shared through an attached session stay read-only for the subscriber
+            records = Q(profile=request_profile(self.request))
+            if session_id is not None:
+                records &= Q(scraping_session_id=session_id)
 
-        return queryset.select_related('profile', 'scraping_session').prefetch_related('authors')
+        queryset = ScholarRawRecord.objects.filter(records)
+
+        return queryset.order_by(self.get_sort_by()).select_related(
+            'profile', 'scraping_session'
+        ).prefetch_related('authors')
 
     @action(detail=False, methods=['get'], url_path='results/export-csv')
     def export_results_csv(self, request):
         """Export scraping results to CSV for analysts"""
-        profile = request.profile
-
-        # Start with base queryset
-        queryset = ScholarRawRecord.objects.filter(profile=profile).select_related('profile',
-                                                                                   'scraping_session').prefetch_related(
-            'authors')
-
-        # Filter by session if provided
-        session_id = request.query_params.get('session_id')
-        if session_id:
-            try:
-                queryset = queryset.filter(scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
-
-        # Apply other filters
-        query = request.query_params.get('query')
-        if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) | Q(abstract__icontains=query)
-            )
-
-        year_from = request.query_params.get('year_from')
-        if year_from:
-            try:
-                queryset = queryset.filter(publication_year__gte=int(year_from))
-            except ValueError:
-                pass
-
-        year_to = request.query_params.get('year_to')
-        if year_to:
-            try:
-                queryset = queryset.filter(publication_year__lte=int(year_to))
-            except ValueError:
-                pass
+        return self.stream_csv_export(request, CSV_EXPORTS['papers_csv'])
 
-        venue = request.query_params.get('venue')
-        if venue:
-            queryset = queryset.filter(venue__icontains=venue)
-
-        min_citations = request.query_params.get('min_citations')
-        if min_citations:
-            try:
-                queryset = queryset.filter(citation_count__gte=int(min_citations))
-            except ValueError:
-                pass
-
-        # Limit results for performance
-        limit = request.query_params.get('limit', 10000)
-        try:
-            limit = min(int(limit), 50000)  # Max 50k records
-        except ValueError:
-            limit = 10000
-
-        queryset = queryset.order_by('-scraped_at')[:limit]
-
-        # Create filename with session info
-        filename_parts = ["scholar_papers"]
-        if session_id:
-            filename_parts.append(f"session_{session_id}")
-
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename_parts.append(timestamp)
-        filename = "_".join(filename_parts) + ".csv"
-
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        response.write('\ufeff')
-        writer = csv.writer(response)
-
-        # Updated headers with session info
-        headers = [
-            'ID', 'Session ID', 'Session Query', 'Semantic Scholar ID', 'Title', 'Abstract',
-            'Publication Year', 'Venue', 'DOI', 'URL', 'PDF URL', 'Citation Count',
-            'Reference Count', 'Influential Citation Count', 'Open Access', 'Authors',
-            'Author Count', 'Scraped Date', 'Updated Date'
-        ]
-        writer.writerow(headers)
-
-        # Write data rows with session info
-        for paper in queryset:
-            authors_list = [author.full_name for author in paper.authors.all()]
-            authors_str = "; ".join(authors_list)
-
-            writer.writerow([
-                paper.id,
-                paper.scraping_session.id if paper.scraping_session else '',
-                paper.scraping_session.query if paper.scraping_session else '',
-                paper.semantic_scholar_id,
-                paper.title,
-                paper.abstract,
-                paper.publication_year,
-                paper.venue,
-                paper.doi,
-                paper.url,
-                paper.pdf_url,
-                paper.citation_count,
-                paper.reference_count,
-                paper.influential_citation_count,
-                'Yes' if paper.is_open_access else 'No',
-                authors_str,
-                len(authors_list),
-                paper.scraped_at.strftime('%Y-%m-%d %H:%M:%S'),
-                paper.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-
-        return response
+    def stream_csv_export(self, request, export):
+        """Stream one of the CSV_EXPORTS for the caller's profile and query params"""
+        queryset = export.queryset(request_profile(request), request.query_params)
+        rows = (export.row(item) for item in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+        filename = export_filename(export.filename_prefix, 'csv', request.query_params.get('session_id'))
+        return streaming_csv_response(filename, export.headers, rows, bom=export.bom)
 
     @action(detail=False, methods=['get'], url_path='results/export-excel')
     def export_results_excel(self, request):
-        """Export scraping results to Excel for analysts"""
+        """
+        Export scraping results to Excel for analysts
+
+        Small exports are written with a write-only workbook spooled to a temp file and
+        returned directly. Larger ones (or ``?async=true``) become an ExportJob; poll
+        ``/export-job/<id>/`` for progress and fetch ``/export-job/<id>/download/``.
+        """
         try:
-            import openpyxl
-            from openpyxl.styles import Font, PatternFill
+            import openpyxl  # noqa: F401
         except ImportError:
             return Response({
                 "error": "Excel export requires openpyxl library. Please install it."
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        from django.http import HttpResponse
-        from datetime import datetime
-        import io
-
-        profile = request.profile
-
-        # Get filtered queryset with session support
-        queryset = ScholarRawRecord.objects.filter(profile=profile).select_related('profile',
-                                                                                   'scraping_session').prefetch_related(
-            'authors')
-
-        # Filter by session if provided
-        session_id = request.query_params.get('session_id')
-        if session_id:
-            try:
-                queryset = queryset.filter(scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
-
-        # Apply other filters
-        query = request.query_params.get('query')
-        if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) | Q(abstract__icontains=query)
-            )
-
-        year_from = request.query_params.get('year_from')
-        if year_from:
-            try:
-                queryset = queryset.filter(publication_year__gte=int(year_from))
-            except ValueError:
-                pass
-
-        year_to = request.query_params.get('year_to')
-        if year_to:
-            try:
-                queryset = queryset.filter(publication_year__lte=int(year_to))
-            except ValueError:
-                pass
-
-        limit = request.query_params.get('limit', 10000)
-        try:
-            limit = min(int(limit), 50000)
-        except ValueError:
-            limit = 10000
-
-        queryset = queryset.order_by('-scraped_at')[:limit]
-
-        # Create Excel workbook
-        wb = openpyxl.Workbook()
-
-        # Papers sheet
-        ws_papers = wb.active
-        ws_papers.title = "Papers"
-
-        # Headers with styling (updated with session info)
-        headers = [
-            'ID', 'Session ID', 'Session Query', 'Semantic Scholar ID', 'Title', 'Abstract',
-            'Publication Year', 'Venue', 'DOI', 'URL', 'PDF URL', 'Citation Count',
-            'Reference Count', 'Influential Citation Count', 'Open Access', 'Authors',
-            'Author Count', 'Scraped Date', 'Updated Date'
-        ]
-
-        # Style headers
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-
-        for col, header in enumerate(headers, 1):
-            cell = ws_papers.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-
-        # Write data with session info
-        for row, paper in enumerate(queryset, 2):
-            authors_list = [author.full_name for author in paper.authors.all()]
-            authors_str = "; ".join(authors_list)
-
-            # Convert timezone-aware datetimes to naive datetimes for Excel
-            scraped_at_naive = paper.scraped_at.replace(tzinfo=None) if paper.scraped_at else None
-            updated_at_naive = paper.updated_at.replace(tzinfo=None) if paper.updated_at else None
-
-            data = [
-                paper.id,
-                paper.scraping_session.id if paper.scraping_session else '',
-                paper.scraping_session.query if paper.scraping_session else '',
-                paper.semantic_scholar_id,
-                paper.title,
-                paper.abstract,
-                paper.publication_year,
-                paper.venue,
-                paper.doi,
-                paper.url,
-                paper.pdf_url,
-                paper.citation_count,
-                paper.reference_count,
-                paper.influential_citation_count,
-                'Yes' if paper.is_open_access else 'No',
-                authors_str,
-                len(authors_list),
-                scraped_at_naive,
-                updated_at_naive
-            ]
-
-            for col, value in enumerate(data, 1):
-                ws_papers.cell(row=row, column=col, value=value)
-
-        # Auto-adjust column widths
-        for column in ws_papers.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)  # Max width 50
-            ws_papers.column_dimensions[column_letter].width = adjusted_width
-
-        # Authors summary sheet
-        ws_authors = wb.create_sheet("Authors Summary")
-
-        # Get author statistics (with session filter if applicable)
-        author_stats_query = ScholarAuthor.objects.filter(scholar_raw_records__profile=profile)
-        if session_id:
-            try:
-                author_stats_query = author_stats_query.filter(scholar_raw_records__scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
-
-        author_stats = author_stats_query.annotate(
-            papers_count=Count('scholar_raw_records', distinct=True)
-        ).order_by('-papers_count')[:100]  # Top 100 authors
-
-        # Authors headers
-        author_headers = ['Author Name', 'Papers Count', 'H-Index', 'Total Citations', 'Affiliations']
-        for col, header in enumerate(author_headers, 1):
-            cell = ws_authors.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-
-        # Authors data
-        for row, author in enumerate(author_stats, 2):
-            affiliations_str = "; ".join(author.affiliations) if author.affiliations else ""
-            data = [
-                author.full_name,
-                author.papers_count,
-                author.h_index,
-                author.citation_count,
-                affiliations_str
-            ]
-
-            for col, value in enumerate(data, 1):
-                ws_authors.cell(row=row, column=col, value=value)
-
-        # Session Summary sheet (if session_id provided)
-        if session_id:
-            ws_session = wb.create_sheet("Session Summary")
-
-            try:
-                from dip.models import ScrapingSession
-                session = ScrapingSession.objects.get(id=int(session_id), profile=profile)
-
-                # Session info headers
-                session_headers = ['Parameter', 'Value']
-                for col, header in enumerate(session_headers, 1):
-                    cell = ws_session.cell(row=1, column=col, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-
-                # Session data
-                session_data = [
-                    ['Session ID', session.id],
-                    ['Query', session.query],
-                    ['Year From', session.year_from or 'Any'],
-                    ['Year To', session.year_to or 'Any'],
-                    ['Limit', session.limit],
-                    ['Fields of Study', ', '.join(session.fields_of_study) if session.fields_of_study else 'Any'],
-                    ['Publication Types', ', '.join(session.publication_types) if session.publication_types else 'Any'],
-                    ['Min Citation Count', session.min_citation_count or 'Any'],
-                    ['Open Access Only', 'Yes' if session.open_access_only else 'No'],
-                    ['Status', session.status],
-                    ['Papers Found', session.papers_found],
-                    ['Papers Saved', session.papers_saved],
-                    ['Errors Count', session.errors_count],
-                    ['Created At', session.created_at.replace(tzinfo=None) if session.created_at else None],
-                    ['Completed At', session.completed_at.replace(tzinfo=None) if session.completed_at else None],
-                    ['Duration', str(session.duration) if session.duration else 'N/A']
-                ]
-
-                for row, (param, value) in enumerate(session_data, 2):
-                    ws_session.cell(row=row, column=1, value=param)
-                    ws_session.cell(row=row, column=2, value=value)
-
-            except Exception as e:
-                # If session not found, just skip this sheet
-                wb.remove(ws_session)
-
-        # Save to BytesIO
-        excel_buffer = io.BytesIO()
-        wb.save(excel_buffer)
-        excel_buffer.seek(0)
-
-        # Create filename with session info
-        filename_parts = ["scholar_analysis"]
-        if session_id:
-            filename_parts.append(f"session_{session_id}")
+        profile = request_profile(request)
+        params = request.query_params.dict()
+        papers, authors, session = results_export_querysets(profile, params)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename_parts.append(timestamp)
-        filename = "_".join(filename_parts) + ".xlsx"
-
-        response = HttpResponse(
-            excel_buffer.getvalue(),
+        if params.pop('async', None) == 'true' or papers.count() > EXCEL_SYNC_MAX_ROWS:
+            job = ExportJob.objects.create(profile=profile, kind='papers_excel', params=params)
+            transaction.on_commit(lambda: run_export_job.delay(job.id))
+            return Response({
+                "message": "Excel export has been queued.",
+                "job": ExportJobSerializer(job, context={'request': request}).data,
+                "status_url": request.build_absolute_uri(reverse('export-job-detail', kwargs={'pk': job.id})),
+            }, status=status.HTTP_202_ACCEPTED)
+
+        spool = tempfile.TemporaryFile()
+        write_results_workbook(spool, papers, authors, session)
+        spool.seek(0)
+
+        return FileResponse(
+            spool,
+            as_attachment=True,
+            filename=results_export_filename(params.get('session_id')),
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        return response
 
     @action(detail=False, methods=['get'], url_path='results/export-authors-csv')
     def export_authors_csv(self, request):
         """Export authors data to CSV for analysts"""
-        import csv
-        from django.http import HttpResponse
-        from datetime import datetime
+        return self.stream_csv_export(request, CSV_EXPORTS['authors_csv'])
 
-        profile = request.profile
+    @staticmethod
+    def celery_task_status(task_id):
+        """State of a Celery task as reported by ``check_data_ready``"""
+        from celery.result import AsyncResult
 
-        # Get authors related to user's papers with session filter
-        authors_query = ScholarAuthor.objects.filter(scholar_raw_records__profile=profile)
+        try:
+            task_result = AsyncResult(task_id)
+            return {
+                "task_id": task_id,
+                "status": task_result.status,  # PENDING, STARTED, SUCCESS, FAILURE, RETRY, REVOKED
+                "ready": task_result.ready(),
+                "successful": task_result.successful() if task_result.ready() else None,
+                "result": task_result.result if task_result.ready() else None
+            }
+        except Exception as e:
+            return {
+                "task_id": task_id,
+                "status": "UNKNOWN",
+                "error": str(e)
+            }
+
+    @staticmethod
+    def session_data_ready(snapshot, last_check, profile, task_status=None):
+        """
+        ``check_data_ready`` response for one session, built from its cached snapshot
+
+        The records table is only read for ``new_papers_count`` and ``preview_papers``
+        when the snapshot changed after ``last_check``.
+        """
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
 
-        session_id = request.query_params.get('session_id')
-        if session_id:
-            try:
-                authors_query = authors_query.filter(scholar_raw_records__scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
+        last_check_dt = None
+        if last_check:
+            last_check_dt = parse_datetime(last_check)
+            if not last_check_dt:
+                return Response({
+                    "error": "Invalid last_check datetime format. Use ISO format."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(last_check_dt):
+                last_check_dt = timezone.make_aware(last_check_dt)
 
-        authors = authors_query.distinct().prefetch_related('scholar_raw_records')
+        updated_at = parse_datetime(snapshot['updated_at'])
+        finished = snapshot['status'] in TERMINAL_STATUSES
+        has_new_data = snapshot['papers_saved'] > 0 and (last_check_dt is None or updated_at > last_check_dt)
 
-        # Create filename with session info
-        filename_parts = ["scholar_authors"]
-        if session_id:
-            filename_parts.append(f"session_{session_id}")
-
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename_parts.append(timestamp)
-        filename = "_".join(filename_parts) + ".csv"
-
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        response.write('\ufeff')  # BOM
-        writer = csv.writer(response)
-
-        # Headers
-        headers = [
-            'ID', 'Semantic Scholar ID', 'Full Name', 'URL', 'H-Index',
-            'Paper Count', 'Citation Count', 'Affiliations', 'Papers in Dataset',
-            'Papers in Session', 'Created Date', 'Updated Date'
-        ]
-        writer.writerow(headers)
-
-        # Data
-        for author in authors:
-            papers_in_dataset = author.scholar_raw_records.filter(profile=profile).count()
-
-            # Papers in current session (if session filter applied)
-            papers_in_session = papers_in_dataset
-            if session_id:
-                try:
-                    papers_in_session = author.scholar_raw_records.filter(
-                        profile=profile,
-                        scraping_session_id=int(session_id)
-                    ).count()
-                except (ValueError, TypeError):
-                    papers_in_session = 0
-
-            affiliations_str = "; ".join(author.affiliations) if author.affiliations else ""
-
-            writer.writerow([
-                author.id,
-                author.semantic_scholar_id,
-                author.full_name,
-                author.url,
-                author.h_index,
-                author.paper_count,
-                author.citation_count,
-                affiliations_str,
-                papers_in_dataset,
-                papers_in_session,
-                author.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                author.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-
-        return response
+        extra = {}
+        if task_status:
+            extra["task_status"] = task_status
+        if last_check_dt:
+            new_papers_count = 0
+            if has_new_data:
+                new_papers = ScholarRawRecord.objects.filter(
+                    session_records_filter(profile, snapshot['session_id']),
+                    scraped_at__gt=last_check_dt
+                ).order_by('-scraped_at')
+                new_papers_count = new_papers.count()
+                if new_papers_count > 0:
+                    extra["preview_papers"] = list(new_papers[:3].values(
+                        'id', 'title', 'publication_year', 'citation_count', 'scraped_at'
+                    ))
+            extra["new_papers_count"] = new_papers_count
+
+        return Response({
+            "data_ready": has_new_data,
+            "session_id": snapshot['session_id'],
+            "status": snapshot['status'],
+            "papers_found": snapshot['papers_found'],
+            "papers_saved": snapshot['papers_saved'],
+            "errors_count": snapshot['errors_count'],
+            "updated_at": snapshot['updated_at'],
+            "last_check": last_check,
+            "current_time": timezone.now().isoformat(),
+            "should_continue_polling": not finished,
+            "recommended_interval": None if finished else 3,
+            "ready_for_download": snapshot['status'] == 'SUCCESS',
+            "session_info": {
+                "query": snapshot['query'],
+                "status": snapshot['status'],
+                "total_papers": snapshot['papers_saved']
+            },
+            **extra
+        })
 
     @action(detail=False, methods=['get'], url_path='data-ready')
     def check_data_ready(self, request):
         """Check if new data is available for download based on Celery task status"""
         from django.utils import timezone
-        from celery.result import AsyncResult
 
-        profile = request.profile
+        profile = request_profile(request)
 
         # Get parameters
         last_check = request.query_params.get('last_check')  # ISO datetime string
@@ -471,33 +238,23 @@ class ScholarRawRecordViewSet(viewsets.ModelViewSet):
         # Start with base queryset
         base_queryset = ScholarRawRecord.objects.filter(profile=profile)
 
-        # Apply session filter if provided
+        # Session progress comes from the cached snapshot kept by the spider and task
         if session_id:
             try:
-                base_queryset = base_queryset.filter(scraping_session_id=int(session_id))
+                snapshot = get_session_snapshot(int(session_id))
             except (ValueError, TypeError):
                 return Response({
                     "error": "Invalid session_id format. Must be integer."
                 }, status=status.HTTP_400_BAD_REQUEST)
 
+            if snapshot is None or snapshot['profile_id'] != getattr(profile, 'id', None):
+                return Response({"error": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            task_status = self.celery_task_status(task_id) if task_id else None
+            return self.session_data_ready(snapshot, last_check, profile, task_status)
+
         # Get Celery task status if task_id provided
-        task_status = None
-        if task_id:
-            try:
-                task_result = AsyncResult(task_id)
-                task_status = {
-                    "task_id": task_id,
-                    "status": task_result.status,  # PENDING, STARTED, SUCCESS, FAILURE, RETRY, REVOKED
-                    "ready": task_result.ready(),
-                    "successful": task_result.successful() if task_result.ready() else None,
-                    "result": task_result.result if task_result.ready() else None
-                }
-            except Exception as e:
-                task_status = {
-                    "task_id": task_id,
-                    "status": "UNKNOWN",
-                    "error": str(e)
-                }
+        task_status = self.celery_task_status(task_id) if task_id else None
 
         if last_check:
             try:
@@ -557,20 +314,6 @@ class ScholarRawRecordViewSet(viewsets.ModelViewSet):
                         response_data["message"] = "Unknown task status"
                         response_data["should_continue_polling"] = False
 
-                # Add session info if session_id provided
-                if session_id:
-                    response_data["session_id"] = int(session_id)
-                    try:
-                        from dip.models import ScrapingSession
-                        session = ScrapingSession.objects.get(id=int(session_id), profile=profile)
-                        response_data["session_info"] = {
-                            "query": session.query,
-                            "status": getattr(session, 'status', 'unknown'),
-                            "total_papers": getattr(session, 'papers_saved', 0) or 0
-                        }
-                    except:
-                        pass
-
                 # Add preview papers if available
                 if new_papers_count > 0:
                     response_data["preview_papers"] = list(new_papers[:3].values(
@@ -611,20 +354,4 @@ class ScholarRawRecordViewSet(viewsets.ModelViewSet):
                 response_data["task_failed"] = True
                 response_data["error_details"] = task_status.get("result")
 
-        # Add session info if provided
-        if session_id:
-            response_data["session_id"] = int(session_id)
-            try:
-                session = ScrapingSession.objects.get(id=int(session_id), profile=profile)
-                response_data["session_info"] = {
-                    "query": session.query,
-                    "status": getattr(session, 'status', 'unknown'),
-                    "created_at": session.created_at.isoformat() if session.created_at else None,
-                    "completed_at": getattr(session, 'completed_at', None)
-                }
-                if hasattr(session, 'completed_at') and session.completed_at:
-                    response_data["session_info"]["completed_at"] = session.completed_at.isoformat()
-            except:
-                pass
-
         return Response(response_data)
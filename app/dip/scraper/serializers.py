@@ -15,6 +15,13 @@ class ScraperInputSerializer(CustomErrorSerializerMixin, serializers.Serializer)
         'JournalArticle', 'Conference', 'Review', 'Book', 'BookSection', 'Dataset'
     ]
 
+    SEARCH_MODES = ['relevance', 'bulk']
+
+    # Relevance search pages by offset and the API stops at offset 1000;
+    # bulk search pages by continuation token and can run to the end of results
+    RELEVANCE_MAX_LIMIT = 1000
+    BULK_MAX_LIMIT = 500000
+
     query = serializers.CharField(
         required=True,
         max_length=500,
@@ -41,9 +48,17 @@ class ScraperInputSerializer(CustomErrorSerializerMixin, serializers.Serializer)
         required=False,
         allow_null=True,
         min_value=1,
-        max_value=1000,
+        max_value=BULK_MAX_LIMIT,
         default=100,
-        help_text="Maximum number of results to return (1-1000)"
+        help_text=f"Maximum number of results to return "
+                  f"(1-{RELEVANCE_MAX_LIMIT}, up to {BULK_MAX_LIMIT} in bulk mode)"
+    )
+
+    search_mode = serializers.ChoiceField(
+        choices=SEARCH_MODES,
+        required=False,
+        default='relevance',
+        help_text="'relevance' for ranked offset paging, 'bulk' for token-paged corpus pulls"
     )
 
     fields_of_study = serializers.ListField(
@@ -120,6 +135,12 @@ class ScraperInputSerializer(CustomErrorSerializerMixin, serializers.Serializer)
                 })
 
         limit = data.get('limit', 100)
+        if data.get('search_mode', 'relevance') == 'relevance' and limit and limit > self.RELEVANCE_MAX_LIMIT:
+            raise serializers.ValidationError({
+                'limit': f"Relevance search is limited to {self.RELEVANCE_MAX_LIMIT} results. "
+                         f"Use search_mode 'bulk' for larger result sets."
+            })
+
         min_citations = data.get('min_citation_count')
 
         if min_citations and min_citations > 100 and limit > 100:
@@ -138,7 +159,9 @@ class ScraperInputSerializer(CustomErrorSerializerMixin, serializers.Serializer)
             },
             'limit_range': {
                 'min': 1,
-                'max': 1000,
+                'max': cls.RELEVANCE_MAX_LIMIT,
+                'bulk_max': cls.BULK_MAX_LIMIT,
                 'default': 100
-            }
+            },
+            'search_modes': cls.SEARCH_MODES
         }
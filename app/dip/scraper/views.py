@@ -1,14 +1,17 @@
 import logging
-from django.utils import timezone
-from datetime import timedelta
-from django.db import models
+import uuid
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Count, Avg
-from dip.models import ScholarRawRecord, ScholarAuthor
+from dip.models import ScholarRawRecord
+from dip.profiles import request_profile
+from dip.pagination import KeysetPagination, RESULT_SORT_FIELDS
+from dip.exports import CSV_EXPORTS, EXPORT_CHUNK_SIZE, export_filename, streaming_csv_response
+from dip.coalesce import attach_subscriber, claim_or_attach, scrape_fingerprint, session_records_filter
+from dip.search import SUGGEST_MAX_LIMIT, apply_search_query, suggest_authors, suggest_venues
+from dip.stats import get_stats_rollup, rebuild_profile_stats, stats_response_data
 from .serializers import ScraperInputSerializer
 from .result_serializers import ScholarRawRecordSerializer, ScholarAuthorSerializer
 from ..tasks import scrape_raw_data
@@ -32,12 +35,18 @@ class ScraperViewSet(viewsets.ViewSet):
         serializer = ScraperInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        fingerprint = scrape_fingerprint(serializer.validated_data)
+        profile = request_profile(request)
+
+        # Known before the task is queued, so requests attaching to this crawl can report it
+        task_id = str(uuid.uuid4())
+        session = None
         session_id = None
         try:
             from dip.models import ScrapingSession
 
             session = ScrapingSession.objects.create(
-                profile=request.user.profile if hasattr(request.user, 'profile') else None,
+                profile=profile,
                 query=serializer.validated_data['query'],
                 year_from=serializer.validated_data.get('year_from'),
                 year_to=serializer.validated_data.get('year_to'),
@@ -46,6 +55,9 @@ class ScraperViewSet(viewsets.ViewSet):
                 publication_types=serializer.validated_data.get('publication_types', []),
                 min_citation_count=serializer.validated_data.get('min_citation_count'),
                 open_access_only=serializer.validated_data.get('open_access_only', False),
+                search_mode=serializer.validated_data.get('search_mode', 'relevance'),
+                fingerprint=fingerprint,
+                task_id=task_id,
                 status='started'
             )
             session_id = session.id
@@ -62,20 +74,42 @@ class ScraperViewSet(viewsets.ViewSet):
             'publication_types': serializer.validated_data.get('publication_types', []),
             'min_citation_count': serializer.validated_data.get('min_citation_count'),
             'open_access_only': serializer.validated_data.get('open_access_only', False),
-            'profile_id': request.user.profile.id if hasattr(request.user, 'profile') else None,
+            'search_mode': serializer.validated_data.get('search_mode', 'relevance'),
+            'profile_id': profile.id if profile else None,
             'session_id': session_id
         }
 
-        task = scrape_raw_data.delay(**task_params)
+        # An identical crawl already in flight serves this request too
+        leader = None
+        if session:
+            try:
+                leader = claim_or_attach(session)
+                if leader:
+                    attach_subscriber(session, leader)
+            except Exception as e:
+                logger.warning(f"Could not coalesce session {session_id}, crawling separately: {e}")
+                leader = None
+
+        if leader:
+            task_id = leader.task_id
+        else:
+            scrape_raw_data.apply_async(kwargs=task_params, task_id=task_id)
 
         return Response({
-            "message": "Scraping task has been initiated.",
-            "task_id": task.id,
+            "message": "Attached to an identical scraping task in progress." if leader
+            else "Scraping task has been initiated.",
+            "task_id": task_id,
             "session_id": session_id,
+            "results_session_id": leader.id if leader else None,
+            "progress": {
+                "websocket": f"/ws/scraping-session/{session_id}/",
+                "sse": f"/api/v1/scraping-session/{session_id}/events/",
+            } if session_id else None,
             "parameters": {
                 "query": task_params['query'],
                 "year_range": f"{task_params['year_from'] or 'Any'} - {task_params['year_to'] or 'Any'}",
                 "limit": task_params['limit'],
+                "search_mode": task_params['search_mode'],
                 "filters_applied": len([f for f in [
                     task_params['fields_of_study'],
                     task_params['publication_types'],
@@ -89,24 +123,43 @@ class ScraperViewSet(viewsets.ViewSet):
     def get_filter_options(self, request):
         return Response(ScraperInputSerializer.get_filter_options(), status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request):
+        """Venue and author name completions for a prefix, scoped to the caller's profile"""
+        prefix = request.query_params.get('q', '').strip()[:100]
+        if not prefix:
+            return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), SUGGEST_MAX_LIMIT)
+        except ValueError:
+            limit = 10
+
+        profile = request_profile(request)
+        suggest_type = request.query_params.get('type', 'all')
+
+        response_data = {"query": prefix}
+        if suggest_type in ('all', 'venue'):
+            response_data["venues"] = suggest_venues(profile, prefix, limit)
+        if suggest_type in ('all', 'author'):
+            response_data["authors"] = suggest_authors(profile, prefix, limit)
+
+        return Response(response_data)
+
     @action(detail=False, methods=['get'], url_path='results')
     def get_results(self, request):
+        try:
+            session_id = int(request.query_params.get('session_id'))
+        except (ValueError, TypeError):
+            session_id = None
+
         queryset = ScholarRawRecord.objects.filter(
-            profile=request.user.profile if hasattr(request.user, 'profile') else None
+            session_records_filter(request_profile(request), session_id)
         ).select_related('profile').prefetch_related('authors')
 
-        session_id = request.query_params.get('session_id')
-        if session_id:
-            try:
-                queryset = queryset.filter(scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
-
         query = request.query_params.get('query')
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) | Q(abstract__icontains=query)
-            )
+            queryset = apply_search_query(queryset, query)
 
         year_from = request.query_params.get('year_from')
         if year_from:
@@ -138,16 +191,24 @@ class ScraperViewSet(viewsets.ViewSet):
             queryset = queryset.filter(is_open_access=True)
 
         sort_by = request.query_params.get('sort_by', '-scraped_at')
-        valid_sort_fields = [
-            'publication_year', '-publication_year',
-            'citation_count', '-citation_count',
-            'title', '-title',
-            'scraped_at', '-scraped_at'
-        ]
-        if sort_by in valid_sort_fields:
-            queryset = queryset.order_by(sort_by)
-
-        paginator = self.pagination_class()
+        if sort_by == 'relevance' and query:
+            # Rank is computed per query, so relevance is paged by page number only
+            queryset = queryset.order_by('-rank', '-id')
+            paginator = self.pagination_class()
+        else:
+            if sort_by not in RESULT_SORT_FIELDS:
+                sort_by = '-scraped_at'
+
+            if KeysetPagination.is_requested(request):
+                paginator = KeysetPagination(
+                    ordering=sort_by,
+                    page_size=self.pagination_class.page_size,
+                    max_page_size=self.pagination_class.max_page_size,
+                )
+            else:
+                queryset = queryset.order_by(sort_by)
+                paginator = self.pagination_class()
+
         page = paginator.paginate_queryset(queryset, request)
 
         if page is not None:
@@ -159,103 +220,41 @@ class ScraperViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'], url_path='stats')
     def get_stats(self, request):
-        profile = request.user.profile if hasattr(request.user, 'profile') else None
-        session_id = request.query_params.get('session_id')
+        profile = request_profile(request)
+        try:
+            session_id = int(request.query_params.get('session_id'))
+        except (ValueError, TypeError):
+            session_id = None
 
-        papers = ScholarRawRecord.objects.filter(profile=profile)
-        if session_id:
-            try:
-                papers = papers.filter(scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
+        rollup = get_stats_rollup(profile, session_id) if profile else None
 
-        if not papers.exists():
+        if rollup is None or not rollup.papers_count:
             return Response({
                 "message": "No data available",
                 "total_papers": 0
             })
 
-        total_papers = papers.count()
-        total_authors = ScholarAuthor.objects.filter(
-            scholar_raw_records__profile=profile
-        ).distinct().count()
-
-        if session_id:
-            try:
-                total_authors = ScholarAuthor.objects.filter(
-                    scholar_raw_records__profile=profile,
-                    scholar_raw_records__scraping_session_id=int(session_id)
-                ).distinct().count()
-            except (ValueError, TypeError):
-                pass
-
-        papers_by_year = papers.values('publication_year').annotate(
-            count=Count('id')
-        ).order_by('publication_year')
-
-        papers_by_year_dict = {
-            str(item['publication_year']): item['count']
-            for item in papers_by_year
-            if item['publication_year']
-        }
-
-        top_venues = papers.values('venue').annotate(
-            count=Count('id')
-        ).filter(venue__isnull=False, venue__gt='').order_by('-count')[:10]
-
-        citation_stats = papers.aggregate(
-            total_citations=models.Sum('citation_count'),
-            avg_citations=Avg('citation_count'),
-            max_citations=models.Max('citation_count')
-        )
-
-        open_access_count = papers.filter(is_open_access=True).count()
-        open_access_percentage = (open_access_count / total_papers * 100) if total_papers > 0 else 0
-
-        recent_papers = papers.filter(
-            scraped_at__gte=timezone.now() - timedelta(days=30)
-        ).count()
-
-        top_cited = papers.order_by('-citation_count')[:5]
-        top_cited_data = ScholarRawRecordSerializer(top_cited, many=True).data
-
-        return Response({
-            "total_papers": total_papers,
-            "total_authors": total_authors,
-            "papers_by_year": papers_by_year_dict,
-            "top_venues": [
-                {"venue": item['venue'], "count": item['count']}
-                for item in top_venues
-            ],
-            "citation_stats": {
-                "total_citations": citation_stats['total_citations'] or 0,
-                "average_citations": round(citation_stats['avg_citations'] or 0, 2),
-                "max_citations": citation_stats['max_citations'] or 0
-            },
-            "open_access": {
-                "count": open_access_count,
-                "percentage": round(open_access_percentage, 1)
-            },
-            "recent_activity": {
-                "papers_last_30_days": recent_papers
-            },
-            "top_cited_papers": top_cited_data
-        })
+        return Response(stats_response_data(rollup))
 
     @action(detail=False, methods=['delete'], url_path='results/clear')
     def clear_results(self, request):
-        profile = request.user.profile if hasattr(request.user, 'profile') else None
+        profile = request_profile(request)
         session_id = request.query_params.get('session_id')
 
         queryset = ScholarRawRecord.objects.filter(profile=profile)
         if session_id:
             try:
-                queryset = queryset.filter(scraping_session_id=int(session_id))
+                session_id = int(session_id)
+                queryset = queryset.filter(scraping_session_id=session_id)
             except (ValueError, TypeError):
-                pass
+                session_id = None
 
         deleted_count, _ = queryset.delete()
 
+        # Deltas cannot take papers back out of top_cited or citations_max
+        if profile:
+            rebuild_profile_stats(profile.id)
+
         return Response({
             "message": "Results cleared successfully",
             "deleted_count": deleted_count
@@ -263,41 +262,13 @@ class ScraperViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'], url_path='results/export')
     def export_results(self, request):
-        import csv
-        from django.http import HttpResponse
-
-        profile = request.user.profile if hasattr(request.user, 'profile') else None
-        papers = ScholarRawRecord.objects.filter(profile=profile).order_by('-scraped_at')
+        profile = request_profile(request)
+        export = CSV_EXPORTS['results_csv']
 
-        session_id = request.query_params.get('session_id')
-        if session_id:
-            try:
-                papers = papers.filter(scraping_session_id=int(session_id))
-            except (ValueError, TypeError):
-                pass
+        papers = export.queryset(profile, request.query_params)
+        rows = (export.row(paper) for paper in papers.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+        filename = export_filename(
+            export.filename_prefix, 'csv', request.query_params.get('session_id'), timestamp=False
+        )
 
-        response = HttpResponse(content_type='text/csv')
-        filename = f'scholar_papers_session_{session_id}.csv' if session_id else 'scholar_papers.csv'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'Title', 'Authors', 'Year', 'Venue', 'Citation Count',
-            'DOI', 'Open Access', 'URL', 'Scraped Date'
-        ])
-
-        for paper in papers:
-            authors = ", ".join([author.full_name for author in paper.authors.all()])
-            writer.writerow([
-                paper.title,
-                authors,
-                paper.publication_year,
-                paper.venue,
-                paper.citation_count,
-                paper.doi,
-                'Yes' if paper.is_open_access else 'No',
-                paper.url,
-                paper.scraped_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-
-        return response
+        return streaming_csv_response(filename, export.headers, rows, bom=export.bom)
@@ -1,8 +1,18 @@
-from rest_framework import viewsets
+import uuid
+
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from dip.models import ScrapingSession
+from dip.profiles import request_profile
+from dip.tasks import expand_citation_graph, scrape_raw_data, scrape_task_params
 from .serializers import ScrapingSessionSerializer
 
+RESUMABLE_STATUSES = ('FAILURE', 'REVOKED')
+
 
 class ScrapingSessionViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ScrapingSessionSerializer
@@ -10,6 +20,67 @@ class ScrapingSessionViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         return ScrapingSession.objects.filter(
-            profile=self.request.user.profile,
+            profile=request_profile(self.request),
             status='SUCCESS'
         ).order_by('-completed_at')
+
+    @action(detail=True, methods=['post'], url_path='resume')
+    def resume(self, request, pk=None):
+        """Restart a failed or revoked crawl from its last checkpoint"""
+        session = get_object_or_404(ScrapingSession, pk=pk, profile=request_profile(request))
+
+        if session.results_session_id:
+            return Response({
+                "error": "Session is attached to another session's crawl and has nothing to resume.",
+                "results_session_id": session.results_session_id,
+            }, status=status.HTTP_409_CONFLICT)
+
+        task_id = str(uuid.uuid4())
+        updated = ScrapingSession.objects.filter(
+            id=session.id, status__in=RESUMABLE_STATUSES
+        ).update(status='PENDING', completed_at=None, task_id=task_id)
+        if not updated:
+            return Response({
+                "error": "Only failed or revoked sessions can be resumed.",
+                "status": session.status,
+            }, status=status.HTTP_409_CONFLICT)
+
+        scrape_raw_data.apply_async(kwargs=scrape_task_params(session), task_id=task_id)
+
+        return Response({
+            "message": "Scraping task has been resumed.",
+            "task_id": task_id,
+            "session_id": session.id,
+            "checkpoint": {
+                "pages_done": len(session.checkpoint.get('offsets') or []),
+                "papers_stored": len(session.checkpoint.get('seen_ids') or []),
+                "continuation_token": bool(session.continuation_token),
+            },
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'], url_path='expand-citations')
+    def expand_citations(self, request, pk=None):
+        """Store the citation graph around the session's papers, ``depth`` hops out"""
+        session = self.get_object()
+
+        try:
+            depth = int(request.data.get('depth', 1))
+            max_papers = int(request.data['max_papers']) if request.data.get('max_papers') else None
+        except (TypeError, ValueError):
+            return Response({"error": "depth and max_papers must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_depth = settings.CITATION_GRAPH['MAX_DEPTH']
+        if not 1 <= depth <= max_depth:
+            return Response({"error": f"depth must be between 1 and {max_depth}."}, status=status.HTTP_400_BAD_REQUEST)
+        if max_papers is not None:
+            max_papers = min(max(max_papers, 1), settings.CITATION_GRAPH['MAX_PAPERS'])
+
+        task_id = expand_citation_graph.delay(session.id, depth, max_papers).id
+
+        return Response({
+            "message": "Citation graph expansion has been initiated.",
+            "task_id": task_id,
+            "session_id": session.id,
+            "depth": depth,
+            "max_papers": max_papers or settings.CITATION_GRAPH['MAX_PAPERS'],
+        }, status=status.HTTP_202_ACCEPTED)
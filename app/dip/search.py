@@ -0,0 +1,62 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db.models import Count, F
+
+from dip.models import ScholarAuthor, ScholarRawRecord
+
+SEARCH_CONFIG = 'english'
+
+
+def apply_search_query(queryset, query):
+    """
+    Filter records by the ``query`` param against the ``search_vector`` column
+
+    Uses the GIN index on ``search_vector`` and annotates ``rank`` (title matches weigh
+    more than abstract matches) so callers can order by relevance.
+    """
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=search_query).annotate(
+        rank=SearchRank(F('search_vector'), search_query)
+    )
+
+
+SUGGEST_CACHE_TTL = 300
+SUGGEST_MAX_LIMIT = 25
+
+
+def _suggest_cache_key(profile_id, kind, prefix, limit):
+    return f'suggest:{profile_id}:{kind}:{limit}:{prefix.casefold()}'
+
+
+def suggest_venues(profile, prefix, limit=10):
+    """Most common venues in the profile's records starting with ``prefix``"""
+    key = _suggest_cache_key(profile.id if profile else None, 'venue', prefix, limit)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = [
+            {'venue': row['venue'], 'count': row['count']}
+            for row in ScholarRawRecord.objects.filter(profile=profile, venue__istartswith=prefix)
+            .values('venue')
+            .annotate(count=Count('id'))
+            .order_by('-count', 'venue')[:limit]
+        ]
+        cache.set(key, suggestions, SUGGEST_CACHE_TTL)
+    return suggestions
+
+
+def suggest_authors(profile, prefix, limit=10):
+    """Authors of the profile's records whose name starts with ``prefix``, most prolific first"""
+    key = _suggest_cache_key(profile.id if profile else None, 'author', prefix, limit)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = list(
+            ScholarAuthor.objects.filter(
+                full_name__istartswith=prefix,
+                scholar_raw_records__profile=profile,
+            )
+            .values('id', 'full_name')
+            .annotate(papers_count=Count('scholar_raw_records'))
+            .order_by('-papers_count', 'full_name')[:limit]
+        )
+        cache.set(key, suggestions, SUGGEST_CACHE_TTL)
+    return suggestions
@@ -0,0 +1,117 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from dip.clients.semantic_scholar import SemanticScholarAPI
+
+logger = logging.getLogger(__name__)
+
+# Sessions asking for fewer papers run as one task
+SHARD_MIN_LIMIT = 200
+# Relevance search stops at offset 1000 in every window
+RELEVANCE_SHARD_MAX_LIMIT = 1000
+
+FILTER_KEYS = ('fields_of_study', 'publication_types', 'min_citation_count', 'open_access_only')
+
+
+def year_windows(year_from: int, year_to: int, max_windows: int) -> List[Tuple[int, int]]:
+    """Split ``year_from..year_to`` into at most ``max_windows`` contiguous windows of near equal size"""
+    years = year_to - year_from + 1
+    count = max(1, min(max_windows, years))
+    size, extra = divmod(years, count)
+
+    windows = []
+    start = year_from
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0) - 1
+        windows.append((start, end))
+        start = end + 1
+    return windows
+
+
+def allocate_limits(totals: List[int], limit: int, cap: Optional[int] = None) -> List[int]:
+    """
+    Split ``limit`` across windows in proportion to the hits each one still has
+
+    No window gets more than its ``total`` (or ``cap``); what a small window cannot
+    use is handed to the larger ones, with rounding leftovers going to the largest
+    fractional shares.
+    """
+    capacity = [min(total, cap) if cap else total for total in totals]
+    if sum(capacity) <= limit:
+        return capacity
+
+    allocated = [0] * len(capacity)
+    remaining = limit
+
+    while remaining > 0:
+        open_windows = [i for i, room in enumerate(capacity) if allocated[i] < room]
+        if not open_windows:
+            break
+
+        room = {i: capacity[i] - allocated[i] for i in open_windows}
+        total_room = sum(room.values())
+        shares = {i: remaining * room[i] / total_room for i in open_windows}
+
+        given = 0
+        for i, share in shares.items():
+            allocated[i] += int(share)
+            given += int(share)
+
+        if given == 0:
+            by_fraction = sorted(open_windows, key=lambda i: shares[i] - int(shares[i]), reverse=True)
+            for i in by_fraction[:remaining]:
+                allocated[i] += 1
+            break
+
+        remaining -= given
+
+    return allocated
+
+
+def window_total(api: SemanticScholarAPI, query: str, search_mode: str, year_from: int, year_to: int,
+                 filters: Dict[str, Any]) -> int:
+    """
+    Hits the API reports for one window
+
+    The request matches the first one the shard's spider makes, so the response
+    cache serves it again when the shard starts.
+    """
+    if search_mode == 'bulk':
+        response = api.search_papers_bulk(query, year_from=year_from, year_to=year_to, **filters)
+    else:
+        response = api.search_papers(query, year_from=year_from, year_to=year_to, limit=100, offset=0, **filters)
+    return int(response.get('total') or 0)
+
+
+def plan_shards(query: str, year_from: Optional[int], year_to: Optional[int], limit: int,
+                search_mode: str = 'relevance', **filters) -> Optional[List[Dict[str, int]]]:
+    """
+    Year-window shards with adaptive limits, or None when the session should run as one task
+
+    Bulk search pages through a continuation token that only the previous page
+    produces, so both search modes are sharded by year window rather than by token.
+    """
+    max_shards = settings.SCRAPER_MAX_SHARDS
+    year_to = year_to or timezone.now().year
+    if max_shards < 2 or not year_from or year_to <= year_from or (limit or 0) < SHARD_MIN_LIMIT:
+        return None
+
+    filters = {key: filters.get(key) for key in FILTER_KEYS}
+    api = SemanticScholarAPI()
+    windows = year_windows(year_from, year_to, max_shards)
+    totals = [window_total(api, query, search_mode, start, end, filters) for start, end in windows]
+
+    cap = RELEVANCE_SHARD_MAX_LIMIT if search_mode == 'relevance' else None
+    limits = allocate_limits(totals, limit, cap)
+
+    shards = [
+        {'year_from': start, 'year_to': end, 'limit': shard_limit}
+        for (start, end), shard_limit in zip(windows, limits)
+        if shard_limit > 0
+    ]
+    logger.info(f"Shard plan for '{query}' {year_from}-{year_to}: totals {totals}, shards {shards}")
+
+    return shards if len(shards) > 1 else None
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from dip.models import Profile
+from dip.profiles import invalidate_cached_profile
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    invalidate_cached_profile(instance.user_id)
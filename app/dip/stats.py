@@ -0,0 +1,405 @@
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from dip.models import ScholarRawRecord, ScrapingSession, StatsRollup
+
+logger = logging.getLogger(__name__)
+
+STATS_TOP_VENUES = 10
+STATS_TOP_CITED = 5
+STATS_RECENT_DAYS = 30
+# Pipelines refresh the rollups of the sessions they wrote to at most this often
+STATS_REFRESH_INTERVAL = 5.0
+
+SUMMED_FIELDS = ('papers_count', 'citations_total', 'open_access_count')
+COUNTER_FIELDS = ('papers_by_year', 'venue_counts', 'scraped_by_day')
+# Record columns a batch change is computed from, see rows_change
+ROLLUP_ROW_FIELDS = (
+    'id', 'profile_id', 'scraping_session_id', 'citation_count', 'is_open_access',
+    'publication_year', 'venue', 'scraped_at',
+)
+
+
+def compute_rollup(papers) -> Dict[str, Any]:
+    """Every rollup field for a queryset of records, computed from scratch"""
+    from dip.scraper.result_serializers import ScholarRawRecordSerializer
+
+    papers = papers.order_by()
+    totals = papers.aggregate(
+        papers_count=Count('id'),
+        citations_total=Sum('citation_count'),
+        citations_max=Max('citation_count'),
+        open_access_count=Count('id', filter=Q(is_open_access=True)),
+    )
+
+    through = ScholarRawRecord.authors.through
+    top_cited = papers.order_by('-citation_count', '-id').prefetch_related('authors')[:STATS_TOP_CITED]
+
+    return {
+        'papers_count': totals['papers_count'],
+        'citations_total': totals['citations_total'] or 0,
+        'citations_max': totals['citations_max'] or 0,
+        'open_access_count': totals['open_access_count'],
+        'authors_count': through.objects.filter(
+            scholarrawrecord__in=papers.values('id')
+        ).values('scholarauthor_id').distinct().count(),
+        'papers_by_year': {
+            str(year): count
+            for year, count in papers.filter(publication_year__isnull=False)
+            .values_list('publication_year').annotate(count=Count('id'))
+        },
+        'venue_counts': {
+            venue: count
+            for venue, count in papers.filter(venue__isnull=False, venue__gt='')
+            .values_list('venue').annotate(count=Count('id'))
+        },
+        'scraped_by_day': {
+            day.isoformat(): count
+            for day, count in papers.annotate(day=TruncDate('scraped_at'))
+            .values_list('day').annotate(count=Count('id'))
+        },
+        'top_cited': ScholarRawRecordSerializer(top_cited, many=True).data,
+    }
+
+
+def merge_top_cited(*lists: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Most cited papers across several top lists; later lists win for the same paper"""
+    papers = {}
+    for papers_list in lists:
+        for paper in papers_list:
+            papers[paper['id']] = paper
+    return sorted(
+        papers.values(), key=lambda paper: (paper['citation_count'], paper['id']), reverse=True
+    )[:STATS_TOP_CITED]
+
+
+def apply_rollup_change(target: StatsRollup, old: Dict[str, Any], new: Dict[str, Any]):
+    """
+    Move ``target`` by the difference between a session's old and new rollup
+
+    Sums and counters stay exact. ``citations_max`` and ``top_cited`` only grow here,
+    so they can lag behind papers that leave the profile until ``rebuild_profile_stats``.
+    """
+    for field in SUMMED_FIELDS:
+        setattr(target, field, getattr(target, field) + new.get(field, 0) - old.get(field, 0))
+
+    for field in COUNTER_FIELDS:
+        counts = Counter(getattr(target, field))
+        counts.update(new.get(field, {}))
+        counts.subtract(old.get(field, {}))
+        setattr(target, field, {key: value for key, value in counts.items() if value > 0})
+
+    target.citations_max = max(target.citations_max, new.get('citations_max', 0))
+    target.top_cited = merge_top_cited(target.top_cited, new.get('top_cited', []))
+
+
+def rollup_values(rollup: StatsRollup) -> Dict[str, Any]:
+    return {field: getattr(rollup, field) for field in (*SUMMED_FIELDS, *COUNTER_FIELDS, 'citations_max', 'top_cited')}
+
+
+def rows_change(old_rows: Iterable[Dict[str, Any]], new_rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Signed change of the summed and counted rollup fields from ``old_rows`` to ``new_rows``
+
+    Rows are record value dicts with the ``ROLLUP_ROW_FIELDS``. ``top_ids`` lists the
+    most cited of the new rows, the only ones that can enter the top list.
+    """
+    change = {field: 0 for field in SUMMED_FIELDS}
+    change.update({field: Counter() for field in COUNTER_FIELDS})
+    new_rows = list(new_rows)
+
+    for rows, sign in ((old_rows, -1), (new_rows, 1)):
+        for row in rows:
+            change['papers_count'] += sign
+            change['citations_total'] += sign * (row['citation_count'] or 0)
+            change['open_access_count'] += sign * bool(row['is_open_access'])
+            if row['publication_year'] is not None:
+                change['papers_by_year'][str(row['publication_year'])] += sign
+            if row['venue']:
+                change['venue_counts'][row['venue']] += sign
+            change['scraped_by_day'][timezone.localdate(row['scraped_at']).isoformat()] += sign
+
+    top = sorted(new_rows, key=lambda row: (row['citation_count'] or 0, row['id']), reverse=True)[:STATS_TOP_CITED]
+    change['top_ids'] = [row['id'] for row in top]
+    return change
+
+
+def merge_changes(target: Dict[str, Any], change: Dict[str, Any]):
+    """Add ``change`` to the pending ``target`` change of the same session"""
+    for field in SUMMED_FIELDS:
+        target[field] += change[field]
+    for field in COUNTER_FIELDS:
+        target[field].update(change[field])
+    target['top_ids'] = list(dict.fromkeys([*target['top_ids'], *change['top_ids']]))
+
+
+def top_cited_data(paper_ids: List[int]) -> List[Dict[str, Any]]:
+    from dip.scraper.result_serializers import ScholarRawRecordSerializer
+
+    papers = ScholarRawRecord.objects.filter(id__in=paper_ids).order_by('-citation_count', '-id')
+    return ScholarRawRecordSerializer(papers.prefetch_related('authors')[:STATS_TOP_CITED], many=True).data
+
+
+def apply_session_changes(changes: Dict[Tuple[int, int], Dict[str, Any]]):
+    """
+    Fold pending batch changes into the session rollups and their profile rows
+
+    ``changes`` is keyed by ``(profile_id, session_id)`` of the written records. No
+    records are scanned, except to build a session's first rollup row, which then
+    already holds the change. Like the profile row, ``citations_max`` and ``top_cited``
+    only grow here, the final ``refresh_session_stats`` of a crawl makes them exact.
+    """
+    session_profiles = dict(
+        ScrapingSession.objects.filter(id__in={session_id for _, session_id in changes}).values_list('id', 'profile_id')
+    )
+
+    for (profile_id, session_id), change in changes.items():
+        # Records written for another profile's session are not part of its rollup
+        if session_profiles.get(session_id) != profile_id:
+            continue
+        if not StatsRollup.objects.filter(profile_id=profile_id, scraping_session=None).exists():
+            rebuild_profile_stats(profile_id)
+            continue
+
+        top_cited = top_cited_data(change['top_ids'])
+        with transaction.atomic():
+            rollup, created = StatsRollup.objects.select_for_update().get_or_create(
+                profile_id=profile_id, scraping_session_id=session_id
+            )
+            if created:
+                old = rollup_values(rollup)
+                new = compute_rollup(ScholarRawRecord.objects.filter(profile_id=profile_id, scraping_session_id=session_id))
+                for field, value in new.items():
+                    setattr(rollup, field, value)
+            else:
+                old, new = {}, {
+                    **change,
+                    'top_cited': top_cited,
+                    'citations_max': max([paper['citation_count'] for paper in top_cited], default=0),
+                }
+                apply_rollup_change(rollup, old, new)
+            rollup.save()
+
+            profile_rollup, _ = StatsRollup.objects.select_for_update().get_or_create(
+                profile_id=profile_id, scraping_session=None
+            )
+            apply_rollup_change(profile_rollup, old, new)
+            profile_rollup.save()
+
+
+def counts_toward_profile(session_id, profile_id, results_session_id, results_profile_id) -> bool:
+    """
+    Whether a session's rollup is part of its profile's totals
+
+    An attached session reads its leader's records. When the leader is the profile's
+    own session those records are already counted, and when the profile attached to
+    the same crawl more than once only its first attached session adds them.
+    """
+    if not results_session_id:
+        return True
+    if results_profile_id == profile_id:
+        return False
+    first_attached = ScrapingSession.objects.filter(
+        profile_id=profile_id, results_session_id=results_session_id
+    ).order_by('id').values_list('id', flat=True).first()
+    return first_attached == session_id
+
+
+def refresh_session_stats(session_ids: Iterable[int], final: bool = False):
+    """
+    Recompute the rollups of ``session_ids`` and carry the change into their profile rows
+
+    Only the sessions' own records are scanned, so this stays cheap however large the
+    profile is. The profile's distinct author count cannot be carried over that way and
+    is recounted only when ``final`` is set, i.e. once a session finishes.
+    A profile without a rollup yet is rebuilt from scratch instead.
+    """
+    sessions = ScrapingSession.objects.filter(id__in=set(session_ids) - {None}).values_list(
+        'id', 'profile_id', 'results_session_id', 'results_session__profile_id'
+    )
+
+    for session_id, profile_id, results_session_id, results_profile_id in sessions:
+        if not StatsRollup.objects.filter(profile_id=profile_id, scraping_session=None).exists():
+            rebuild_profile_stats(profile_id)
+            continue
+
+        if results_session_id:
+            # Attached to another session's crawl, see dip.coalesce
+            papers = ScholarRawRecord.objects.filter(scraping_session_id=results_session_id)
+        else:
+            papers = ScholarRawRecord.objects.filter(profile_id=profile_id, scraping_session_id=session_id)
+
+        with transaction.atomic():
+            rollup, _ = StatsRollup.objects.select_for_update().get_or_create(
+                profile_id=profile_id, scraping_session_id=session_id
+            )
+            # Computed under the lock, so a slower concurrent refresh cannot store an older rollup
+            new = compute_rollup(papers)
+            old = rollup_values(rollup)
+            for field, value in new.items():
+                setattr(rollup, field, value)
+            rollup.save()
+
+            profile_rollup, _ = StatsRollup.objects.select_for_update().get_or_create(
+                profile_id=profile_id, scraping_session=None
+            )
+            if counts_toward_profile(session_id, profile_id, results_session_id, results_profile_id):
+                apply_rollup_change(profile_rollup, old, new)
+            if final:
+                profile_rollup.authors_count = compute_profile_authors_count(profile_id)
+            profile_rollup.save()
+
+
+def compute_profile_authors_count(profile_id) -> int:
+    through = ScholarRawRecord.authors.through
+    return through.objects.filter(
+        scholarrawrecord__profile_id=profile_id
+    ).values('scholarauthor_id').distinct().count()
+
+
+def rebuild_profile_stats(profile_id):
+    """Recompute every rollup of a profile from its records and the crawls it attached to"""
+    papers = ScholarRawRecord.objects.filter(profile_id=profile_id)
+    session_ids = set(papers.exclude(scraping_session=None).values_list('scraping_session_id', flat=True).distinct())
+    attached_session_ids = list(ScrapingSession.objects.filter(
+        profile_id=profile_id, results_session__isnull=False
+    ).values_list('id', flat=True))
+
+    with transaction.atomic():
+        StatsRollup.objects.filter(profile_id=profile_id).delete()
+        StatsRollup.objects.create(profile_id=profile_id, **compute_rollup(papers))
+        StatsRollup.objects.bulk_create([
+            StatsRollup(
+                profile_id=profile_id,
+                scraping_session_id=session_id,
+                **compute_rollup(papers.filter(scraping_session_id=session_id)),
+            )
+            for session_id in session_ids
+        ])
+
+    if attached_session_ids:
+        refresh_session_stats(attached_session_ids)
+
+
+def get_stats_rollup(profile, session_id=None) -> Optional[StatsRollup]:
+    """
+    Rollup of the profile or one of its sessions, built on first use
+
+    Profiles with records from before rollups existed are rebuilt once, and sessions
+    without a row yet (e.g. still empty) get a zero row.
+    """
+    rollup = StatsRollup.objects.filter(profile=profile, scraping_session_id=session_id).first()
+    if rollup is not None:
+        return rollup
+
+    if session_id is None:
+        rebuild_profile_stats(profile.id)
+    else:
+        refresh_session_stats(ScrapingSession.objects.filter(id=session_id, profile=profile).values_list('id', flat=True))
+
+    return StatsRollup.objects.filter(profile=profile, scraping_session_id=session_id).first()
+
+
+def stats_response_data(rollup: StatsRollup) -> Dict[str, Any]:
+    """The ``stats`` endpoint payload for a rollup"""
+    total_papers = rollup.papers_count
+    recent_since = (timezone.now() - timedelta(days=STATS_RECENT_DAYS)).date().isoformat()
+    top_venues = sorted(rollup.venue_counts.items(), key=lambda item: (-item[1], item[0]))[:STATS_TOP_VENUES]
+
+    return {
+        "total_papers": total_papers,
+        "total_authors": rollup.authors_count,
+        "papers_by_year": dict(sorted(rollup.papers_by_year.items())),
+        "top_venues": [
+            {"venue": venue, "count": count}
+            for venue, count in top_venues
+        ],
+        "citation_stats": {
+            "total_citations": rollup.citations_total,
+            "average_citations": round(rollup.citations_total / total_papers, 2) if total_papers else 0,
+            "max_citations": rollup.citations_max
+        },
+        "open_access": {
+            "count": rollup.open_access_count,
+            "percentage": round(rollup.open_access_count / total_papers * 100, 1) if total_papers else 0
+        },
+        "recent_activity": {
+            "papers_last_30_days": sum(
+                count for day, count in rollup.scraped_by_day.items() if day >= recent_since
+            )
+        },
+        "top_cited_papers": rollup.top_cited,
+    }
+
+
+class StatsRefresher:
+    """
+    Collects the sessions a pipeline wrote to and refreshes their rollups
+
+    Sessions passed to ``mark`` are recomputed from their records. Writers that know
+    the rows they replaced report them to ``add_rows`` instead, and their changes are
+    folded into the rollups without a scan; those sessions are recomputed once, by
+    ``refresh(final=True)`` on spider close. ``refresh_if_due`` refreshes at most every
+    ``interval`` seconds. Failures are logged, never raised into the pipeline.
+    """
+
+    def __init__(self, interval: float = STATS_REFRESH_INTERVAL):
+        self.interval = interval
+        self.dirty = set()
+        self.changes: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        # Sessions whose rollups moved by changes since the last final refresh
+        self.changed = set()
+        self.last_refresh = time.monotonic()
+
+    def mark(self, *session_ids):
+        self.dirty.update(session_id for session_id in session_ids if session_id)
+
+    def add_rows(self, old_rows: Iterable[Dict[str, Any]], new_rows: Iterable[Dict[str, Any]]):
+        """Queue the change of records going from ``old_rows`` to ``new_rows``"""
+        grouped = {}
+        for rows, index in ((old_rows, 0), (new_rows, 1)):
+            for row in rows:
+                if row['scraping_session_id']:
+                    key = (row['profile_id'], row['scraping_session_id'])
+                    grouped.setdefault(key, ([], []))[index].append(row)
+
+        for key, (old, new) in grouped.items():
+            change = rows_change(old, new)
+            if key in self.changes:
+                merge_changes(self.changes[key], change)
+            else:
+                self.changes[key] = change
+
+    @property
+    def due(self) -> bool:
+        return bool(self.dirty or self.changes) and time.monotonic() - self.last_refresh >= self.interval
+
+    def refresh_if_due(self):
+        if self.due:
+            self.refresh()
+
+    def refresh(self, final: bool = False):
+        session_ids, self.dirty = self.dirty, set()
+        changes, self.changes = self.changes, {}
+        self.last_refresh = time.monotonic()
+
+        if final:
+            session_ids |= self.changed | {session_id for _, session_id in changes}
+            self.changed, changes = set(), {}
+        try:
+            if changes:
+                # Recorded first, so the final refresh also repairs a change that failed to apply
+                self.changed.update(session_id for _, session_id in changes)
+                apply_session_changes(changes)
+            if session_ids:
+                refresh_session_stats(session_ids, final=final)
+        except Exception as e:
+            logger.warning(f"Could not refresh stats for sessions {sorted(session_ids | {key[1] for key in changes})}: {e}")
@@ -1,33 +1,26 @@
+import os
 import subprocess
+import tempfile
 import logging
 import json
 from celery import shared_task
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
 from django.utils import timezone
-from dip.models import ScrapingSession
+from dip.models import ExportJob, ScrapingSession
+from dip.progress import cache_session_snapshot, publish_progress
+from dip.sharding import plan_shards
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def scrape_raw_data(query=None, year_from=None, year_to=None, limit=100,
-                    fields_of_study=None, publication_types=None,
-                    min_citation_count=None, open_access_only=False,
-                    profile_id=None, session_id=None):
-    session = None
-    if session_id:
-        try:
-            session = ScrapingSession.objects.get(id=session_id)
-            session.status = 'RUNNING'
-            session.task_id = scrape_raw_data.request.id
-            session.started_at = timezone.now()
-            session.save()
-        except ScrapingSession.DoesNotExist:
-            logger.error(f"Session {session_id} not found")
-
-    logger.info(f"Запускаємо Scrapy з параметрами:")
-    logger.info(f"  query={query}")
-    logger.info(f"  session_id={session_id}")
-
+def build_scrape_command(query=None, year_from=None, year_to=None, limit=100,
+                         fields_of_study=None, publication_types=None,
+                         min_citation_count=None, open_access_only=False,
+                         profile_id=None, session_id=None,
+                         search_mode='relevance', continuation_token=None,
+                         shard=None, resume=False):
     cmd = ['python', 'manage.py', 'scrape_raw_data']
 
     # Додаємо параметри команди...
@@ -53,42 +46,399 @@ def scrape_raw_data(query=None, year_from=None, year_to=None, limit=100,
         cmd += ['--min_citation_count', str(min_citation_count)]
     if open_access_only:
         cmd += ['--open_access_only']
+    if search_mode:
+        cmd += ['--search_mode', search_mode]
+    if continuation_token:
+        cmd += ['--continuation_token', continuation_token]
+    if shard:
+        cmd += ['--shard', shard]
+    if resume:
+        cmd += ['--resume']
+
+    return cmd
+
+
+def run_subprocess_crawl(**spider_kwargs):
+    """Run the crawl in a fresh `manage.py scrape_raw_data` process"""
+    cmd = build_scrape_command(**spider_kwargs)
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    logger.info(f"[Scrapy STDOUT]\n{result.stdout}")
+    if result.stderr:
+        logger.warning(f"[Scrapy STDERR]\n{result.stderr}")
+
+    return {
+        'returncode': result.returncode,
+        'error': result.stderr if result.returncode else None,
+        'stats': None,
+    }
+
 
+def run_in_process_crawl(**spider_kwargs):
+    """Run the crawl on the worker's long-lived reactor"""
+    from dip.crawler import in_process_crawler
+    from scholar.scholar.spiders.raw_data_spider import RawDataSpider
+
+    spider_kwargs['fields_of_study'] = spider_kwargs.get('fields_of_study') or []
+    spider_kwargs['publication_types'] = spider_kwargs.get('publication_types') or []
+
+    close_old_connections()
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        logger.info(f"[Scrapy STDOUT]\n{result.stdout}")
-        if result.stderr:
-            logger.warning(f"[Scrapy STDERR]\n{result.stderr}")
+        result = in_process_crawler.crawl(RawDataSpider, **spider_kwargs)
+    except Exception as e:
+        logger.exception("In-process crawl crashed")
+        return {'returncode': 1, 'error': str(e), 'stats': None}
+    finally:
+        close_old_connections()
 
-        if session:
-            session.status = 'SUCCESS'
-            session.completed_at = timezone.now()
+    logger.info(f"[Scrapy STATS]\n{json.dumps(result['stats'], indent=2, default=str)}")
+
+    return {
+        'returncode': result['returncode'],
+        'error': f"Spider finished with reason: {result['finish_reason']}" if result['returncode'] else None,
+        'stats': result['stats'],
+    }
+
+
+def announce_session_status(session, **extra):
+    """Refresh the cached snapshot and notify subscribers after a status change"""
+    session.refresh_from_db()
+    cache_session_snapshot(session)
+    publish_progress(session.id, event='status', status=session.status, **extra)
+
+
+def finish_coalesced_requests(session):
+    """Hand the finished crawl's results to identical requests attached to it"""
+    from dip.coalesce import release_single_flight
+
+    try:
+        release_single_flight(session)
+    except Exception as e:
+        logger.error(f"Could not release session {session.id} to attached requests: {e}")
+
+
+CRAWL_RUNNERS = {
+    'subprocess': run_subprocess_crawl,
+    'in_process': run_in_process_crawl,
+}
+
+
+def get_crawl_runner(execution_mode=None):
+    execution_mode = execution_mode or settings.SCRAPER_EXECUTION_MODE
+    return CRAWL_RUNNERS.get(execution_mode, run_subprocess_crawl)
+
+
+def finish_session(session, succeeded, error=None, failed_runs=1):
+    """Set the final status of a session and tell its subscribers"""
+    changes = {'status': 'SUCCESS' if succeeded else 'FAILURE', 'completed_at': timezone.now()}
+    if succeeded:
+        # A finished crawl has nothing to resume
+        changes.update(checkpoint={}, continuation_token=None)
+    else:
+        # The spider bumps errors_count while it runs, so add to the stored value
+        changes['errors_count'] = F('errors_count') + failed_runs
+    ScrapingSession.objects.filter(id=session.id).update(**changes)
+    session.refresh_from_db()
+
+    if succeeded:
+        announce_session_status(session)
+    else:
+        announce_session_status(session, error=(error or '')[-500:])
+    finish_coalesced_requests(session)
+
+
+def merge_crawl_stats(results):
+    """Sum the numeric Scrapy stats of several crawls"""
+    merged = {}
+    for result in results:
+        for key, value in (result.get('stats') or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def start_sharded_scrape(session, shards, execution_mode=None, **crawl_kwargs):
+    """Run the session's year-window shards as a group, finalised by a chord callback"""
+    from celery import chord
+
+    header = [
+        scrape_shard.s(execution_mode=execution_mode, **{**crawl_kwargs, **shard})
+        for shard in shards
+    ]
+    result = chord(header)(finalize_sharded_scrape.s(session_id=session.id))
+    logger.info(f"Session {session.id} split into {len(shards)} shards, finalised by task {result.id}")
+    return result
+
+
+class CrawlFailed(Exception):
+    """A crawl stopped with an error; raised so Celery retries the task"""
+
+
+def scrape_task_params(session):
+    """``scrape_raw_data`` arguments that rerun a session"""
+    return {
+        'query': session.query,
+        'year_from': session.year_from,
+        'year_to': session.year_to,
+        'limit': session.limit,
+        'fields_of_study': session.fields_of_study,
+        'publication_types': session.publication_types,
+        'min_citation_count': session.min_citation_count,
+        'open_access_only': session.open_access_only,
+        'search_mode': session.search_mode,
+        'profile_id': session.profile_id,
+        'session_id': session.id,
+    }
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(CrawlFailed,),
+    max_retries=settings.SCRAPER_MAX_RETRIES,
+    retry_backoff=settings.SCRAPER_RETRY_BACKOFF,
+    retry_backoff_max=settings.SCRAPER_RETRY_BACKOFF_MAX,
+    retry_jitter=True,
+    # A worker that dies mid-crawl hands the task back to the queue instead of losing it
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def scrape_raw_data(self, query=None, year_from=None, year_to=None, limit=100,
+                    fields_of_study=None, publication_types=None,
+                    min_citation_count=None, open_access_only=False,
+                    profile_id=None, session_id=None, execution_mode=None,
+                    search_mode='relevance', continuation_token=None):
+    session = None
+    resume = False
+    if session_id:
+        try:
+            session = ScrapingSession.objects.get(id=session_id)
+            session.status = 'RUNNING'
+            session.task_id = self.request.id
+            session.started_at = timezone.now()
             session.save()
+            announce_session_status(session)
+
+            # Retried, redelivered and resumed runs continue from the saved checkpoint
+            resume = bool(session.checkpoint or session.continuation_token)
+        except ScrapingSession.DoesNotExist:
+            logger.error(f"Session {session_id} not found")
+
+    crawl_kwargs = dict(
+        query=query,
+        year_from=year_from,
+        year_to=year_to,
+        limit=limit,
+        fields_of_study=fields_of_study,
+        publication_types=publication_types,
+        min_citation_count=min_citation_count,
+        open_access_only=open_access_only,
+        profile_id=profile_id,
+        session_id=session_id,
+        search_mode=search_mode,
+    )
+
+    # Wide year ranges run as parallel shards; a resumed crawl continues as one
+    if session and not resume and not continuation_token:
+        try:
+            shards = plan_shards(
+                query, year_from, year_to, limit, search_mode=search_mode,
+                fields_of_study=fields_of_study, publication_types=publication_types,
+                min_citation_count=min_citation_count, open_access_only=open_access_only,
+            )
+        except Exception as e:
+            logger.warning(f"Could not plan shards for session {session_id}, running as one task: {e}")
+            shards = None
+
+        if shards:
+            start_sharded_scrape(session, shards, execution_mode=execution_mode, **crawl_kwargs)
+            return {
+                "status": "sharded",
+                "message": f"Scraping split into {len(shards)} shards",
+                "query": query,
+                "profile_id": profile_id,
+                "session_id": session_id,
+                "shards": shards,
+            }
+
+    run_crawl = get_crawl_runner(execution_mode)
+
+    logger.info(f"Запускаємо Scrapy з параметрами:")
+    logger.info(f"  query={query}")
+    logger.info(f"  session_id={session_id}")
+    logger.info(f"  execution_mode={execution_mode or settings.SCRAPER_EXECUTION_MODE}")
+    logger.info(f"  search_mode={search_mode}, resuming={resume or bool(continuation_token)}")
+    logger.info(f"  attempt={self.request.retries + 1} of {self.max_retries + 1}")
+
+    result = run_crawl(continuation_token=continuation_token, resume=resume, **crawl_kwargs)
+
+    if result['returncode'] == 0:
+        if session:
+            finish_session(session, succeeded=True)
 
         return {
             "status": "success",
             "message": "Scraping completed successfully",
             "query": query,
             "profile_id": profile_id,
-            "session_id": session_id
+            "session_id": session_id,
+            "stats": result['stats'],
         }
 
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Scrapy stopped with error (return code {e.returncode})")
-        logger.error(f"STDOUT:\n{e.stdout}")
-        logger.error(f"STDERR:\n{e.stderr}")
+    logger.error(f"Scrapy stopped with error (return code {result['returncode']})")
+    if result['error']:
+        logger.error(f"ERROR:\n{result['error']}")
 
+    if self.request.retries < self.max_retries:
         if session:
-            session.status = 'FAILURE'
-            session.completed_at = timezone.now()
-            session.errors_count += 1
-            session.save()
+            ScrapingSession.objects.filter(id=session.id).update(status='RETRY', errors_count=F('errors_count') + 1)
+            session.refresh_from_db()
+            announce_session_status(session, error=(result['error'] or '')[-500:])
+        raise CrawlFailed(result['error'] or f"Scrapy stopped with return code {result['returncode']}")
 
-        return {
-            "status": "error",
-            "message": f"Scraping failed with return code {e.returncode}",
-            "error": e.stderr,
-            "query": query,
-            "profile_id": profile_id,
-            "session_id": session_id
-        }
+    if session:
+        finish_session(session, succeeded=False, error=result['error'])
+
+    return {
+        "status": "error",
+        "message": f"Scraping failed with return code {result['returncode']}",
+        "error": result['error'],
+        "query": query,
+        "profile_id": profile_id,
+        "session_id": session_id,
+        "stats": result['stats'],
+    }
+
+
+@shared_task
+def scrape_shard(execution_mode=None, **crawl_kwargs):
+    """
+    Crawl one year window of a sharded session
+
+    Counters go to the shared session row as deltas, so shards never overwrite each
+    other. Errors are returned rather than raised, otherwise the chord callback
+    would not run.
+    """
+    shard = f"{crawl_kwargs['year_from']}-{crawl_kwargs['year_to']}"
+    logger.info(f"Shard {shard} of session {crawl_kwargs.get('session_id')}: limit {crawl_kwargs['limit']}")
+
+    try:
+        result = get_crawl_runner(execution_mode)(shard=shard, **crawl_kwargs)
+    except Exception as e:
+        logger.exception(f"Shard {shard} crashed")
+        result = {'returncode': 1, 'error': str(e), 'stats': None}
+
+    return {**result, 'shard': shard, 'limit': crawl_kwargs['limit']}
+
+
+@shared_task
+def finalize_sharded_scrape(results, session_id):
+    """Chord callback: merge shard results and set the session's final status"""
+    failed = [result for result in results if result['returncode']]
+    stats = merge_crawl_stats(results)
+
+    session = ScrapingSession.objects.filter(id=session_id).first()
+    if session:
+        error = "\n".join(f"Shard {result['shard']}: {result['error']}" for result in failed) or None
+        finish_session(session, succeeded=not failed, error=error, failed_runs=len(failed))
+
+    logger.info(f"Session {session_id} finished: {len(results) - len(failed)} of {len(results)} shards succeeded")
+
+    return {
+        "status": "error" if failed else "success",
+        "session_id": session_id,
+        "shards": [
+            {'shard': result['shard'], 'limit': result['limit'], 'returncode': result['returncode']}
+            for result in results
+        ],
+        "stats": stats,
+    }
+
+
+
+@shared_task(ignore_result=True)
+def refresh_stale_papers():
+    """Beat task: refresh metrics of the most overdue papers (see dip.refresh)"""
+    from dip.refresh import refresh_stale_papers as refresh
+
+    close_old_connections()
+    try:
+        return refresh()
+    finally:
+        close_old_connections()
+
+
+@shared_task
+def expand_citation_graph(session_id, depth=1, max_papers=None):
+    """Store the citation graph around a session's papers (see dip.citation_graph)"""
+    from dip.citation_graph import expand_session_citations
+
+    return expand_session_citations(session_id, depth, max_papers)
+
+
+def write_export_job(job, spool, on_progress):
+    """Generate the file for ``job`` into ``spool``, returns (filename, rows_total)"""
+    from dip.exports import (
+        CSV_EXPORTS,
+        export_filename,
+        results_export_filename,
+        results_export_querysets,
+        write_csv_export,
+        write_results_workbook,
+    )
+
+    session_id = job.params.get('session_id')
+
+    if job.kind == 'papers_excel':
+        papers, authors, session = results_export_querysets(job.profile, job.params)
+        rows_total = papers.count()
+        ExportJob.objects.filter(id=job.id).update(rows_total=rows_total)
+        write_results_workbook(spool, papers, authors, session, on_progress=on_progress)
+        return results_export_filename(session_id), rows_total
+
+    export = CSV_EXPORTS[job.kind]
+    queryset = export.queryset(job.profile, job.params)
+    rows_total = queryset.count()
+    ExportJob.objects.filter(id=job.id).update(rows_total=rows_total)
+    write_csv_export(spool, export, queryset, on_progress=on_progress)
+    return export_filename(export.filename_prefix, 'csv', session_id), rows_total
+
+
+@shared_task
+def run_export_job(job_id):
+    """Generate an ExportJob file in chunks, tracking rows_done, and store it"""
+    from django.core.files import File
+
+    job = ExportJob.objects.select_related('profile').get(id=job_id)
+    job.status = 'STARTED'
+    job.task_id = run_export_job.request.id
+    job.started_at = timezone.now()
+    job.rows_done = 0
+    job.save(update_fields=['status', 'task_id', 'started_at', 'rows_done'])
+
+    def on_progress(rows_done):
+        ExportJob.objects.filter(id=job.id).update(rows_done=rows_done)
+
+    try:
+        with tempfile.TemporaryFile() as spool:
+            filename, rows_total = write_export_job(job, spool, on_progress)
+            job.file_size = spool.tell()
+            spool.seek(0)
+            job.file.save(filename, File(spool), save=False)
+    except Exception as e:
+        logger.exception(f"Export job {job_id} failed")
+        job.status = 'FAILURE'
+        job.error = str(e)
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'completed_at'])
+        return {"status": "error", "job_id": job_id, "error": str(e)}
+
+    job.status = 'SUCCESS'
+    job.rows_total = rows_total
+    job.rows_done = rows_total
+    job.completed_at = timezone.now()
+    job.save(update_fields=['status', 'file', 'file_size', 'rows_total', 'rows_done', 'completed_at'])
+
+    logger.info(f"Export job {job_id} stored as {job.file.name} ({rows_total} rows)")
+
+    return {"status": "success", "job_id": job_id, "file_name": job.file.name, "rows": rows_total}
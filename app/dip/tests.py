@@ -1,3 +1,322 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from dip.crawler import in_process_crawler
+from dip.models import Profile, ScholarAuthor, ScholarRawRecord, ScrapingSession, StatsRollup
+from dip.pagination import KeysetPagination
+from dip.progress import cache_session_snapshot
+from dip.export_job.views import ExportJobViewSet
+from dip.scholar_raw_record.views import ScholarRawRecordViewSet
+from dip.scraping_session.views import ScrapingSessionViewSet
+from dip.stats import StatsRefresher, compute_rollup, rebuild_profile_stats, refresh_session_stats
+from scholar.scholar.pipelines import PIPELINE_ERROR_REASON, ScholarBulkPipeline
+from scholar.scholar.spiders.raw_data_spider import RawDataSpider
+
+
+class ExportAuthorsCsvQueriesTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='analyst', password='secret')
+        self.profile = Profile.objects.create(user=self.user)
+        self.session = ScrapingSession.objects.create(profile=self.profile, query='graphs')
+        self.other_session = ScrapingSession.objects.create(profile=self.profile, query='proteins')
+        self.factory = APIRequestFactory()
+
+    def create_authors(self, count):
+        start = ScholarAuthor.objects.count()
+        for i in range(start, start + count):
+            author = ScholarAuthor.objects.create(
+                semantic_scholar_id=f'author-{i}',
+                full_name=f'Author {i}',
+            )
+            in_session = ScholarRawRecord.objects.create(
+                profile=self.profile,
+                scraping_session=self.session,
+                semantic_scholar_id=f'paper-{author.id}-a',
+            )
+            in_other_session = ScholarRawRecord.objects.create(
+                profile=self.profile,
+                scraping_session=self.other_session,
+                semantic_scholar_id=f'paper-{author.id}-b',
+            )
+            in_session.authors.add(author)
+            in_other_session.authors.add(author)
+
+    def export(self, **params):
+        """Run the export and return (query count, csv rows without header)"""
+        request = self.factory.get('/api/v1/scholar-raw-record/results/export-authors-csv/', params)
+        force_authenticate(request, user=self.user)
+        request.profile = self.profile
+        view = ScholarRawRecordViewSet.as_view({'get': 'export_authors_csv'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = view(request)
+            content = b''.join(response.streaming_content).decode('utf-8-sig')
+
+        return len(queries), content.strip().splitlines()[1:]
+
+    def test_query_count_does_not_grow_with_authors(self):
+        self.create_authors(2)
+        few_queries, few_rows = self.export(session_id=self.session.id)
+
+        self.create_authors(20)
+        many_queries, many_rows = self.export(session_id=self.session.id)
+
+        self.assertEqual(len(few_rows), 2)
+        self.assertEqual(len(many_rows), 22)
+        self.assertEqual(few_queries, many_queries)
+
+    def test_counts_papers_in_dataset_and_session(self):
+        self.create_authors(3)
+
+        _, rows = self.export(session_id=self.session.id)
+        for row in rows:
+            papers_in_dataset, papers_in_session = row.split(',')[8:10]
+            self.assertEqual((papers_in_dataset, papers_in_session), ('2', '1'))
+
+        _, rows = self.export()
+        for row in rows:
+            papers_in_dataset, papers_in_session = row.split(',')[8:10]
+            self.assertEqual((papers_in_dataset, papers_in_session), ('2', '2'))
+
+
+class AttachedSessionRecordsTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.owner_profile = Profile.objects.create(user=self.owner)
+        self.subscriber = User.objects.create_user(username='subscriber', password='secret')
+        self.subscriber_profile = Profile.objects.create(user=self.subscriber)
+
+        self.leader = ScrapingSession.objects.create(profile=self.owner_profile, query='graphs')
+        self.attached = ScrapingSession.objects.create(
+            profile=self.subscriber_profile, query='graphs', results_session=self.leader
+        )
+        self.record = ScholarRawRecord.objects.create(
+            profile=self.owner_profile,
+            scraping_session=self.leader,
+            semantic_scholar_id='shared-paper',
+            title='Shared paper',
+        )
+        self.factory = APIRequestFactory()
+
+    def call(self, method, actions, pk=None, **data):
+        url = f'/api/v1/scholar-raw-record/?session_id={self.attached.id}'
+        request = getattr(self.factory, method)(url, data, format='json')
+        force_authenticate(request, user=self.subscriber)
+        request.profile = self.subscriber_profile
+        view = ScholarRawRecordViewSet.as_view(actions)
+        return view(request, pk=pk) if pk else view(request)
+
+    def test_list_reads_the_shared_records(self):
+        response = self.call('get', {'get': 'list'})
+        self.assertEqual([paper['id'] for paper in response.data['results']], [self.record.id])
+
+    def test_cannot_write_records_of_another_profile(self):
+        response = self.call('patch', {'patch': 'partial_update'}, pk=self.record.id, title='Changed')
+        self.assertEqual(response.status_code, 404)
+
+        response = self.call('delete', {'delete': 'destroy'}, pk=self.record.id)
+        self.assertEqual(response.status_code, 404)
+
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.title, 'Shared paper')
+
+
+class UserWithoutProfileTest(TestCase):
+    """``request.profile`` is a lazy None for users without a Profile"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='no-profile', password='secret')
+        self.factory = APIRequestFactory()
+
+    def get(self, viewset, path):
+        request = self.factory.get(path)
+        force_authenticate(request, user=self.user)
+        request.profile = SimpleLazyObject(lambda: None)
+        return viewset.as_view({'get': 'list'})(request)
+
+    def test_lists_are_empty(self):
+        for viewset, path in (
+            (ScholarRawRecordViewSet, '/api/v1/scholar-raw-record/'),
+            (ScrapingSessionViewSet, '/api/v1/scraping-session/'),
+            (ExportJobViewSet, '/api/v1/export-job/'),
+        ):
+            response = self.get(viewset, path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertEqual(response.data['results'] if 'results' in response.data else response.data, [], path)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SessionDataReadyTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='poller', password='secret')
+        self.profile = Profile.objects.create(user=self.user)
+        self.session = ScrapingSession.objects.create(
+            profile=self.profile, query='graphs', status='STARTED', papers_found=1, papers_saved=1
+        )
+        self.record = ScholarRawRecord.objects.create(
+            profile=self.profile,
+            scraping_session=self.session,
+            semantic_scholar_id='new-paper',
+            title='New paper',
+        )
+        self.factory = APIRequestFactory()
+
+    def get(self, **params):
+        request = self.factory.get('/api/v1/scholar-raw-record/data-ready/', {'session_id': self.session.id, **params})
+        force_authenticate(request, user=self.user)
+        request.profile = self.profile
+        return ScholarRawRecordViewSet.as_view({'get': 'check_data_ready'})(request)
+
+    def test_naive_last_check_reports_new_papers(self):
+        snapshot = cache_session_snapshot(self.session)
+        last_check = (timezone.now() - timedelta(hours=1)).replace(tzinfo=None).isoformat()
+
+        response = self.get(last_check=last_check)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['data_ready'])
+        self.assertEqual(response.data['updated_at'], snapshot['updated_at'])
+        self.assertEqual(response.data['new_papers_count'], 1)
+        self.assertEqual([paper['id'] for paper in response.data['preview_papers']], [self.record.id])
+
+    def test_unchanged_counters_keep_updated_at(self):
+        snapshot = cache_session_snapshot(self.session)
+        last_check = timezone.now().isoformat()
+        self.assertEqual(cache_session_snapshot(self.session)['updated_at'], snapshot['updated_at'])
+
+        response = self.get(last_check=last_check)
+        self.assertFalse(response.data['data_ready'])
+        self.assertEqual(response.data['new_papers_count'], 0)
+
+
+class LostBatchCrawlTest(SimpleTestCase):
+    """A crawl whose batch could not be written must not finish as successful"""
+
+    @staticmethod
+    async def one_page(spider):
+        yield [{'paperId': 'lost-paper', 'title': 'Lost paper', 'authors': []}], 0, None
+
+    def test_failed_write_batch_fails_the_crawl(self):
+        with mock.patch.object(RawDataSpider, 'iter_pages', self.one_page), \
+                mock.patch.object(ScholarBulkPipeline, 'write_batch', side_effect=RuntimeError('database is down')):
+            result = in_process_crawler.crawl(RawDataSpider, query='graphs', enrich_authors=False)
+
+        self.assertEqual(result['finish_reason'], PIPELINE_ERROR_REASON)
+        self.assertEqual(result['returncode'], 1)
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='reader', password='secret')
+        self.profile = Profile.objects.create(user=user)
+        for index, year in enumerate([2021, None, 2019, None, 2020]):
+            ScholarRawRecord.objects.create(
+                profile=self.profile, semantic_scholar_id=f'paper-{index}', title=f'Paper {index}', publication_year=year
+            )
+        self.queryset = ScholarRawRecord.objects.filter(profile=self.profile)
+        self.factory = APIRequestFactory()
+
+    def walk(self, ordering):
+        years, cursor = [], None
+        while True:
+            params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            paginator = KeysetPagination(ordering)
+            years += [paper.publication_year for paper in paginator.paginate_queryset(
+                self.queryset, Request(self.factory.get('/', params))
+            )]
+            cursor = paginator.next_cursor
+            if not cursor:
+                return years
+
+    def test_nullable_field_reaches_the_null_rows(self):
+        self.assertEqual(self.walk('publication_year'), [2019, 2020, 2021, None, None])
+        self.assertEqual(self.walk('-publication_year'), [None, None, 2021, 2020, 2019])
+
+    def test_not_null_field_is_a_single_range(self):
+        paginator = KeysetPagination('citation_count')
+        segments = paginator.segments_after(self.queryset, 0, 1)
+        self.assertEqual(len(segments), 1)
+        self.assertNotIn('IS NULL', str(segments[0].query))
+
+
+class AttachedSessionStatsTest(TestCase):
+    """Papers shared through an attached session are counted once per profile"""
+
+    def setUp(self):
+        self.owner_profile = Profile.objects.create(user=User.objects.create_user(username='owner', password='secret'))
+        self.other_profile = Profile.objects.create(user=User.objects.create_user(username='other', password='secret'))
+        self.leader = ScrapingSession.objects.create(profile=self.owner_profile, query='graphs')
+        for index in range(5):
+            ScholarRawRecord.objects.create(
+                profile=self.owner_profile, scraping_session=self.leader,
+                semantic_scholar_id=f'paper-{index}', title=f'Paper {index}',
+            )
+        rebuild_profile_stats(self.owner_profile.id)
+        rebuild_profile_stats(self.other_profile.id)
+
+    def attach(self, profile):
+        session = ScrapingSession.objects.create(profile=profile, query='graphs', results_session=self.leader)
+        refresh_session_stats([session.id], final=True)
+        return session
+
+    def papers_count(self, profile, session=None):
+        return StatsRollup.objects.get(profile=profile, scraping_session=session).papers_count
+
+    def test_resubmitted_scrape_is_not_counted_twice(self):
+        attached = self.attach(self.owner_profile)
+        self.assertEqual(self.papers_count(self.owner_profile), 5)
+        self.assertEqual(self.papers_count(self.owner_profile, attached), 5)
+
+        rebuild_profile_stats(self.owner_profile.id)
+        self.assertEqual(self.papers_count(self.owner_profile), 5)
+
+    def test_other_profile_counts_the_shared_crawl_once(self):
+        self.attach(self.other_profile)
+        self.attach(self.other_profile)
+        self.assertEqual(self.papers_count(self.other_profile), 5)
+
+        rebuild_profile_stats(self.other_profile.id)
+        self.assertEqual(self.papers_count(self.other_profile), 5)
+
+
+class BatchStatsChangeTest(TestCase):
+    """Rollups moved by the bulk pipeline's batch changes match a full recompute"""
+
+    def setUp(self):
+        self.profile = Profile.objects.create(user=User.objects.create_user(username='crawler', password='secret'))
+        self.session = ScrapingSession.objects.create(profile=self.profile, query='graphs')
+        rebuild_profile_stats(self.profile.id)
+        self.stats = StatsRefresher(interval=3600)
+
+    def item(self, paper_id, citations, year=2020, venue='NeurIPS'):
+        return {
+            'semantic_scholar_id': paper_id, 'title': paper_id, 'citation_count': citations,
+            'publication_year': year, 'venue': venue, 'is_open_access': citations > 5,
+            'profile': self.profile, 'session_id': self.session.id,
+        }
+
+    def assertMatchesRecords(self):
+        expected = compute_rollup(ScholarRawRecord.objects.filter(scraping_session=self.session))
+        for session in (self.session, None):
+            rollup = StatsRollup.objects.get(profile=self.profile, scraping_session=session)
+            for field in ('papers_count', 'citations_total', 'citations_max', 'open_access_count',
+                          'papers_by_year', 'venue_counts', 'scraped_by_day'):
+                self.assertEqual(getattr(rollup, field), expected[field], field)
+            self.assertEqual([paper['id'] for paper in rollup.top_cited], [paper['id'] for paper in expected['top_cited']])
+
+    def test_batches_move_the_rollups(self):
+        ScholarBulkPipeline.write_batch([self.item('a', 3), self.item('b', 10, venue='')], self.stats)
+        self.stats.refresh()
+        self.assertMatchesRecords()
+
+        ScholarBulkPipeline.write_batch([self.item('b', 12, year=2021), self.item('c', 1, year=None)], self.stats)
+        self.stats.refresh()
+        self.assertMatchesRecords()
@@ -4,12 +4,14 @@ from rest_framework.routers import DefaultRouter
 from dip.scraper.views import ScraperViewSet
 from dip.scholar_raw_record.views import ScholarRawRecordViewSet
 from dip.scraping_session.views import ScrapingSessionViewSet
+from dip.export_job.views import ExportJobViewSet
 
 
 router = DefaultRouter()
 router.register(r'raw-scraper', ScraperViewSet, basename='scraper')
 router.register(r'scholar-raw-record', ScholarRawRecordViewSet, basename='scholar-raw-record')
 router.register(r'scraping-session', ScrapingSessionViewSet, basename='scraping-session')
+router.register(r'export-job', ExportJobViewSet, basename='export-job')
 
 
 urlpatterns = router.urls
@@ -56,8 +56,19 @@ elif [ "$1" == 'worker-beat' ]; then
    exec celery -A celery_app beat -l info
 
 elif [ "$1" == 'worker-scraper-raw-data' ]; then
-   echo "Starting Raw Data Scraper Celery worker..."
-   exec celery -A celery_app worker -Q scraper.raw-data -l info --pool=solo --concurrency=1
+   SCRAPER_WORKER_POOL="${SCRAPER_WORKER_POOL:-prefork}"
+   SCRAPER_WORKER_CONCURRENCY="${SCRAPER_WORKER_CONCURRENCY:-4}"
+
+   echo "Starting Raw Data Scraper Celery worker (${SCRAPER_WORKER_POOL} pool, concurrency ${SCRAPER_WORKER_CONCURRENCY})..."
+   # Crawls are long, so each process reserves one task at a time
+   exec celery -A celery_app worker -Q scraper.raw-data -l info \
+        --pool="$SCRAPER_WORKER_POOL" \
+        --concurrency="$SCRAPER_WORKER_CONCURRENCY" \
+        --prefetch-multiplier=1
+
+elif [ "$1" == 'worker-exports' ]; then
+   echo "Starting Exports Celery worker..."
+   exec celery -A celery_app worker -Q exports -l info --concurrency=2
 
 else
    echo 'No valid argument provided, defaulting to infinite sleep...'
@@ -1,12 +1,66 @@
+import asyncio
 import logging
-from typing import Dict, Any
-from asgiref.sync import sync_to_async
+import time
+from typing import Dict, Any, List, Optional
+from dip.db import db_sync_to_async
 from django.db import transaction
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import task
 from dip.models import ScholarRawRecord, ScholarAuthor
+from dip.progress import ProgressPublisher
+from dip.stats import ROLLUP_ROW_FIELDS, StatsRefresher
 
 logger = logging.getLogger(__name__)
 
+PAPER_UPDATE_FIELDS = [
+    'title', 'abstract', 'publication_year', 'venue', 'doi', 'url', 'pdf_url',
+    'citation_count', 'reference_count', 'influential_citation_count',
+    'is_open_access', 'profile', 'updated_at',
+]
+
+# Papers scraped without a session keep the session they were stored with
+PAPER_SESSION_UPDATE_FIELDS = [*PAPER_UPDATE_FIELDS, 'scraping_session']
+
+AUTHOR_UPDATE_FIELDS = [
+    'full_name', 'url', 'h_index', 'paper_count', 'citation_count', 'affiliations', 'updated_at',
+]
+
+# Authors that were not enriched carry placeholder metrics which must not overwrite stored ones
+AUTHOR_PLACEHOLDER_UPDATE_FIELDS = ['full_name', 'url', 'updated_at']
+
+# A crawl that lost a batch closes with this reason, so the task retries it from the checkpoint
+PIPELINE_ERROR_REASON = 'pipeline_error'
+FAILED_BATCHES_STAT = 'bulk_pipeline/failed_batches'
+
+
+async def save_checkpoint(spider, paper_ids: List[str], always: bool = True):
+    """Report committed papers to the spider's checkpoint and persist it"""
+    checkpoint = getattr(spider, 'checkpoint', None)
+    if checkpoint is None:
+        return
+    if checkpoint.commit(paper_ids) or always:
+        await checkpoint.save()
+
+
 class ScholarPipeline:
+    progress = None
+    stats = None
+
+    def open_spider(self, spider):
+        self.progress = ProgressPublisher(getattr(spider, 'session_id', None))
+        self.stats = StatsRefresher()
+
+    def close_spider(self, spider):
+        return deferred_from_coro(self._close(spider))
+
+    async def _close(self, spider):
+        await save_checkpoint(spider, [])
+        if self.progress:
+            await self.progress.flush(spider)
+        if self.stats:
+            self.stats.mark(getattr(spider, 'session_id', None))
+            await db_sync_to_async(self.stats.refresh)(final=True)
+
     async def process_item(self, item: Dict[str, Any], spider):
         try:
             authors_data = item.pop('authors_data', [])
@@ -30,7 +84,7 @@ class ScholarPipeline:
             if session_id:
                 paper_defaults['scraping_session_id'] = session_id
 
-            paper, created = await sync_to_async(ScholarRawRecord.objects.update_or_create)(
+            paper, created = await db_sync_to_async(ScholarRawRecord.objects.update_or_create)(
                 semantic_scholar_id=item['semantic_scholar_id'],
                 defaults=paper_defaults
             )
@@ -41,7 +95,7 @@ class ScholarPipeline:
                     if not author_data.get('semantic_scholar_id'):
                         continue
 
-                    author, author_created = await sync_to_async(ScholarAuthor.objects.update_or_create)(
+                    author, author_created = await db_sync_to_async(ScholarAuthor.objects.update_or_create)(
                         semantic_scholar_id=author_data['semantic_scholar_id'],
                         defaults={
                             'full_name': author_data.get('full_name', ''),
@@ -54,7 +108,7 @@ class ScholarPipeline:
                     )
                     authors.append(author)
 
-                await sync_to_async(paper.authors.set)(authors)
+                await db_sync_to_async(paper.authors.set)(authors)
 
             action = "Created" if created else "Updated"
             session_info = f" (Session: {session_id})" if session_id else ""
@@ -62,6 +116,14 @@ class ScholarPipeline:
 
             if hasattr(spider, 'papers_saved'):
                 spider.papers_saved += 1
+            # Saving the committed ids after every item would rewrite them each time, wait for the page
+            await save_checkpoint(spider, [item['semantic_scholar_id']], always=False)
+            if self.progress:
+                await self.progress.update(spider)
+            if self.stats:
+                self.stats.mark(session_id)
+                if self.stats.due:
+                    await db_sync_to_async(self.stats.refresh)()
 
             return item
 
@@ -69,4 +131,224 @@ class ScholarPipeline:
             logger.error(f"Error saving paper {item.get('semantic_scholar_id', 'unknown')}: {e}")
             if hasattr(spider, 'errors_count'):
                 spider.errors_count += 1
+            if self.progress:
+                await self.progress.update(spider)
             raise
+
+
+class ScholarBulkPipeline:
+    """
+    Buffers items and upserts them in batches
+
+    A batch is written when BULK_PIPELINE_BATCH_SIZE items are buffered, every
+    BULK_PIPELINE_FLUSH_INTERVAL_MS milliseconds, and when the spider closes.
+    Each flush is one ``db_sync_to_async`` hop: papers and authors go through
+    ``bulk_create(update_conflicts=True)`` and the M2M rows are replaced in one insert.
+    Flushes of one pipeline never overlap, and rows are upserted in key order so
+    concurrent crawls lock shared author rows in the same order.
+    After each flush the committed papers move the crawl's checkpoint (see
+    dip.checkpoint), progress is published to the session's Channels group, and
+    the stats rollups of the sessions touched by a batch are refreshed (see dip.stats).
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval_ms: int = 2000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.buffer: List[Dict[str, Any]] = []
+        self.last_flush = time.monotonic()
+        self.flush_loop = None
+        self.progress = None
+        self.stats = None
+        self.write_lock = asyncio.Lock()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            batch_size=crawler.settings.getint('BULK_PIPELINE_BATCH_SIZE', 500),
+            flush_interval_ms=crawler.settings.getint('BULK_PIPELINE_FLUSH_INTERVAL_MS', 2000),
+        )
+
+    def open_spider(self, spider):
+        self.progress = ProgressPublisher(getattr(spider, 'session_id', None))
+        self.stats = StatsRefresher()
+        self.flush_loop = task.LoopingCall(self._flush_if_due, spider)
+        self.flush_loop.start(self.flush_interval, now=False)
+
+    def close_spider(self, spider):
+        if self.flush_loop and self.flush_loop.running:
+            self.flush_loop.stop()
+        return deferred_from_coro(self._close(spider))
+
+    async def _close(self, spider):
+        await self.flush(spider)
+        await save_checkpoint(spider, [])
+        if self.progress:
+            await self.progress.flush(spider)
+        if self.stats:
+            self.stats.mark(getattr(spider, 'session_id', None))
+            await db_sync_to_async(self.stats.refresh)(final=True)
+
+    def _flush_if_due(self, spider):
+        if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+            return deferred_from_coro(self.flush(spider))
+
+    async def process_item(self, item: Dict[str, Any], spider):
+        self.buffer.append(dict(item))
+
+        if len(self.buffer) >= self.batch_size:
+            await self.flush(spider)
+
+        return item
+
+    async def flush(self, spider):
+        """Write everything buffered so far"""
+        batch, self.buffer = self.buffer, []
+        self.last_flush = time.monotonic()
+
+        if not batch:
+            return
+
+        try:
+            async with self.write_lock:
+                saved = await db_sync_to_async(self.write_batch)(batch, self.stats)
+                await save_checkpoint(spider, [item['semantic_scholar_id'] for item in batch])
+            logger.info(f"Saved batch of {saved} papers")
+
+            if hasattr(spider, 'papers_saved'):
+                spider.papers_saved += saved
+
+        except Exception as e:
+            logger.error(f"Error saving batch of {len(batch)} papers: {e}")
+            if hasattr(spider, 'errors_count'):
+                spider.errors_count += len(batch)
+            self.fail_crawl(spider)
+
+        if self.progress:
+            await self.progress.update(spider)
+
+    @staticmethod
+    def fail_crawl(spider):
+        """
+        Stop the crawl after a lost batch instead of letting it finish without those papers
+
+        The engine is not waited on, as a flush may run inside the pipeline's own close.
+        A crawl that is already closing keeps its reason, so the failure is also counted
+        in the stats, see ``dip.crawler.crawl_finish_reason``.
+        """
+        crawler = getattr(spider, 'crawler', None)
+        if crawler is None:
+            return
+        crawler.stats.inc_value(FAILED_BATCHES_STAT)
+        if crawler.engine:
+            crawler.engine.close_spider(spider, PIPELINE_ERROR_REASON)
+
+    @staticmethod
+    def write_batch(batch: List[Dict[str, Any]], stats: Optional[StatsRefresher] = None) -> int:
+        papers = {}
+        authors = {}
+        enriched_author_ids = set()
+        paper_authors = {}
+
+        for item in batch:
+            profile = item.get('profile')
+            paper_id = item['semantic_scholar_id']
+
+            papers[paper_id] = ScholarRawRecord(
+                semantic_scholar_id=paper_id,
+                title=item.get('title', ''),
+                abstract=item.get('abstract', ''),
+                publication_year=item.get('publication_year'),
+                venue=item.get('venue', ''),
+                doi=item.get('doi', ''),
+                url=item.get('url', ''),
+                pdf_url=item.get('pdf_url', ''),
+                citation_count=item.get('citation_count', 0),
+                reference_count=item.get('reference_count', 0),
+                influential_citation_count=item.get('influential_citation_count', 0),
+                is_open_access=item.get('is_open_access', False),
+                profile_id=profile.id if profile else None,
+                scraping_session_id=item.get('session_id'),
+            )
+
+            author_ids = []
+            for author_data in item.get('authors_data') or []:
+                author_id = author_data.get('semantic_scholar_id')
+                if not author_id:
+                    continue
+
+                authors[author_id] = ScholarAuthor(
+                    semantic_scholar_id=author_id,
+                    full_name=author_data.get('full_name', ''),
+                    url=author_data.get('url', ''),
+                    h_index=author_data.get('h_index'),
+                    paper_count=author_data.get('paper_count', 0),
+                    citation_count=author_data.get('citation_count', 0),
+                    affiliations=author_data.get('affiliations', []),
+                )
+                if author_data.get('enriched', True):
+                    enriched_author_ids.add(author_id)
+                author_ids.append(author_id)
+
+            paper_authors[paper_id] = list(dict.fromkeys(author_ids))
+
+        # Stored versions of re-scraped papers, so the stats rollups move by the batch's change
+        existing = {}
+        if stats is not None:
+            existing = {
+                row.pop('semantic_scholar_id'): row
+                for row in ScholarRawRecord.objects.filter(semantic_scholar_id__in=list(papers))
+                .values('semantic_scholar_id', *ROLLUP_ROW_FIELDS)
+            }
+
+        with transaction.atomic():
+            for has_session, update_fields in ((True, PAPER_SESSION_UPDATE_FIELDS), (False, PAPER_UPDATE_FIELDS)):
+                group = [
+                    papers[paper_id] for paper_id in sorted(papers)
+                    if (papers[paper_id].scraping_session_id is not None) == has_session
+                ]
+                if group:
+                    ScholarRawRecord.objects.bulk_create(
+                        group,
+                        update_conflicts=True,
+                        unique_fields=['semantic_scholar_id'],
+                        update_fields=update_fields,
+                    )
+
+            for enriched, update_fields in ((True, AUTHOR_UPDATE_FIELDS), (False, AUTHOR_PLACEHOLDER_UPDATE_FIELDS)):
+                group = [
+                    authors[author_id] for author_id in sorted(authors)
+                    if (author_id in enriched_author_ids) == enriched
+                ]
+                if group:
+                    ScholarAuthor.objects.bulk_create(
+                        group,
+                        update_conflicts=True,
+                        unique_fields=['semantic_scholar_id'],
+                        update_fields=update_fields,
+                    )
+
+            through = ScholarRawRecord.authors.through
+            through.objects.filter(scholarrawrecord_id__in=[paper.pk for paper in papers.values()]).delete()
+            through.objects.bulk_create([
+                through(scholarrawrecord_id=papers[paper_id].pk, scholarauthor_id=authors[author_id].pk)
+                for paper_id, author_ids in paper_authors.items()
+                for author_id in author_ids
+            ])
+
+        if stats is not None:
+            stats.add_rows(existing.values(), [
+                ScholarBulkPipeline.rollup_row(paper, existing.get(paper_id)) for paper_id, paper in papers.items()
+            ])
+            stats.refresh_if_due()
+
+        return len(papers)
+
+    @staticmethod
+    def rollup_row(paper: ScholarRawRecord, stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """The ``ROLLUP_ROW_FIELDS`` of an upserted paper as they now are in the database"""
+        row = {field: getattr(paper, field) for field in ROLLUP_ROW_FIELDS}
+        if stored:
+            # The upsert never updates scraped_at, and the session only from a batch that has one
+            row['scraped_at'] = stored['scraped_at']
+            row['scraping_session_id'] = row['scraping_session_id'] or stored['scraping_session_id']
+        return row
@@ -72,9 +72,13 @@ ROBOTSTXT_OBEY = True
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
-   "scholar.scholar.pipelines.ScholarPipeline": 300,
+   "scholar.scholar.pipelines.ScholarBulkPipeline": 300,
 }
 
+# Batching for ScholarBulkPipeline: flush after this many items or this many milliseconds
+BULK_PIPELINE_BATCH_SIZE = 500
+BULK_PIPELINE_FLUSH_INTERVAL_MS = 2000
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
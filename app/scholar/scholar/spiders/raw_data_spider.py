@@ -2,10 +2,14 @@ import logging
 from typing import Optional, List, Dict, Any
 import scrapy
 from scrapy import signals
-from asgiref.sync import sync_to_async
+from dip.db import db_sync_to_async
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import task
+from dip.checkpoint import CrawlCheckpoint
 from dip.models import Profile
+from dip.progress import COUNTER_FLUSH_INTERVAL, SessionCounterFlusher
 from scholar.scholar.items import ScholarItem
-from dip.clients.semantic_scholar import SemanticScholarAPI
+from dip.clients.async_semantic_scholar import AsyncSemanticScholarAPI
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,11 @@ class RawDataSpider(scrapy.Spider):
                  open_access_only: bool = False,
                  profile_id: Optional[int] = None,
                  session_id: Optional[int] = None,
+                 enrich_authors: bool = True,
+                 search_mode: str = 'relevance',
+                 continuation_token: Optional[str] = None,
+                 shard: Optional[str] = None,
+                 resume: bool = False,
                  *args, **kwargs):
 
         super().__init__(*args, **kwargs)
@@ -39,13 +48,23 @@ class RawDataSpider(scrapy.Spider):
         self.open_access_only = bool(open_access_only)
         self.profile_id = int(profile_id) if profile_id else None
         self.session_id = int(session_id) if session_id else None
+        self.enrich_authors = str(enrich_authors).lower() not in ('0', 'false', 'no')
+        self.search_mode = search_mode or 'relevance'
+        self.continuation_token = continuation_token or None
+        # Year window label when this crawl is one shard of a larger session
+        self.shard = shard or None
+        self.resume = str(resume).lower() not in ('0', 'false', 'no')
+        self.checkpoint: Optional[CrawlCheckpoint] = None
 
-        self.api_client = SemanticScholarAPI()
+        self.api_client = AsyncSemanticScholarAPI()
+        self.author_details: Dict[str, Dict[str, Any]] = {}
         self.papers_processed = 0
         self.papers_saved = 0
         self.errors_count = 0
+        self.counter_flusher = SessionCounterFlusher(self.session_id) if self.session_id else None
+        self.counter_loop = None
 
-        logger.info(f"Spider initialized: query={self.query}, session_id={self.session_id}")
+        logger.info(f"Spider initialized: query={self.query}, session_id={self.session_id}, shard={self.shard}")
 
     def start_requests(self):
         return []
@@ -53,35 +72,108 @@ class RawDataSpider(scrapy.Spider):
     async def start(self):
         try:
             logger.info("Starting paper search via Semantic Scholar API")
+            await self.open_checkpoint()
 
-            papers = self.api_client.search_multiple_pages(
-                query=self.query,
-                total_limit=self.limit,
-                year_from=self.year_from,
-                year_to=self.year_to,
-                fields_of_study=self.fields_of_study,
-                publication_types=self.publication_types,
-                min_citation_count=self.min_citation_count,
-                open_access_only=self.open_access_only
-            )
+            async for papers, page_key, next_token in self.iter_pages():
+                logger.info(f"Received page of {len(papers)} papers from API")
 
-            logger.info(f"Found {len(papers)} papers from API")
+                if self.checkpoint:
+                    papers = [paper for paper in papers if not self.checkpoint.is_seen(paper.get('paperId'))]
+                    self.checkpoint.start_page(
+                        page_key, [paper.get('paperId') for paper in papers], next_token,
+                        bulk=self.search_mode == 'bulk',
+                    )
 
-            for paper_data in papers:
-                try:
-                    item = await self.create_scholar_item(paper_data)
-                    if item:
-                        self.papers_processed += 1
-                        yield item
-                except Exception as e:
-                    self.errors_count += 1
-                    logger.error(f"Error processing paper {paper_data.get('paperId', 'unknown')}: {e}")
-                    continue
+                if self.enrich_authors:
+                    await self.enrich_page_authors(papers)
+
+                for paper_data in papers:
+                    try:
+                        item = await self.create_scholar_item(paper_data)
+                        if item:
+                            self.papers_processed += 1
+                            yield item
+                            continue
+                    except Exception as e:
+                        self.errors_count += 1
+                        logger.error(f"Error processing paper {paper_data.get('paperId', 'unknown')}: {e}")
+                    if self.checkpoint:
+                        self.checkpoint.discard(paper_data.get('paperId'))
 
         except Exception as e:
             logger.error(f"Error in paper search: {e}")
             raise
 
+        finally:
+            await self.api_client.aclose()
+
+    async def open_checkpoint(self):
+        """
+        Track the crawl's resume point on its session (see dip.checkpoint)
+
+        Shards share the session row, so a single checkpoint would not fit any of them.
+        """
+        if not self.session_id or self.shard:
+            return
+
+        if self.resume:
+            self.checkpoint = await db_sync_to_async(CrawlCheckpoint.load)(self.session_id)
+            self.continuation_token = self.continuation_token or self.checkpoint.token
+            logger.info(
+                f"Resuming session {self.session_id}: {len(self.checkpoint.done_offsets)} pages and "
+                f"{len(self.checkpoint.seen_ids)} papers already stored"
+            )
+        self.checkpoint = self.checkpoint or CrawlCheckpoint(self.session_id)
+        self.checkpoint.token = self.continuation_token
+
+    async def iter_pages(self):
+        """Yield ``(papers, page_key, next_token)`` for pages of the configured search mode"""
+        filters = {
+            'year_from': self.year_from,
+            'year_to': self.year_to,
+            'fields_of_study': self.fields_of_study,
+            'publication_types': self.publication_types,
+            'min_citation_count': self.min_citation_count,
+            'open_access_only': self.open_access_only,
+        }
+
+        if self.search_mode == 'bulk':
+            # Papers stored before the crawl was interrupted count towards the limit
+            stored = len(self.checkpoint.seen_ids) if self.checkpoint else 0
+            page_number = 0
+            async for papers, token in self.api_client.iter_bulk_search(
+                self.query,
+                total_limit=max(self.limit - stored, 0),
+                token=self.continuation_token,
+                **filters
+            ):
+                yield papers, page_number, token
+                page_number += 1
+        else:
+            async for papers, offset in self.api_client.iter_search_pages(
+                self.query,
+                total_limit=self.limit,
+                skip_offsets=self.checkpoint.done_offsets if self.checkpoint else (),
+                **filters
+            ):
+                yield papers, offset, None
+
+    async def enrich_page_authors(self, papers: List[Dict[str, Any]]):
+        """Fetch details of authors on this page that were not seen before via author/batch"""
+        author_ids = [
+            author['authorId']
+            for paper in papers
+            for author in paper.get('authors') or []
+            if author.get('authorId') and author['authorId'] not in self.author_details
+        ]
+        if not author_ids:
+            return
+
+        try:
+            self.author_details.update(await self.api_client.get_authors_batch(author_ids))
+        except Exception as e:
+            logger.error(f"Author enrichment failed for {len(author_ids)} authors: {e}")
+
     async def create_scholar_item(self, paper_data: Dict[str, Any]) -> Optional[ScholarItem]:
         try:
             if not paper_data.get('paperId') or not paper_data.get('title'):
@@ -115,14 +207,16 @@ class RawDataSpider(scrapy.Spider):
                 if not author.get('authorId'):
                     continue
 
+                details = self.author_details.get(author['authorId'], {})
                 author_data = {
                     'semantic_scholar_id': author['authorId'],
-                    'full_name': author.get('name', '') or '',
+                    'full_name': author.get('name', '') or details.get('name', '') or '',
                     'url': f"https://www.semanticscholar.org/author/{author['authorId']}",
-                    'h_index': None,
-                    'paper_count': 0,
-                    'citation_count': 0,
-                    'affiliations': []
+                    'h_index': details.get('hIndex'),
+                    'paper_count': details.get('paperCount', 0) or 0,
+                    'citation_count': details.get('citationCount', 0) or 0,
+                    'affiliations': details.get('affiliations') or [],
+                    'enriched': bool(details),
                 }
                 authors_data.append(author_data)
 
@@ -131,7 +225,7 @@ class RawDataSpider(scrapy.Spider):
 
             if self.profile_id:
                 try:
-                    profile = await sync_to_async(Profile.objects.get)(id=self.profile_id)
+                    profile = await db_sync_to_async(Profile.objects.get)(id=self.profile_id)
                     item['profile'] = profile
                 except Profile.DoesNotExist:
                     item['profile'] = None
@@ -146,9 +240,28 @@ class RawDataSpider(scrapy.Spider):
 
     @classmethod
     def from_crawler(cls, crawler, *args, **kwargs):
-        spider = cls(*args, **kwargs)
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
         crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
         return spider
 
+    def spider_opened(self, spider):
+        if self.counter_flusher:
+            self.counter_loop = task.LoopingCall(self.flush_counters)
+            self.counter_loop.start(COUNTER_FLUSH_INTERVAL, now=False)
+
+    def flush_counters(self):
+        """Write counter deltas to the session row (pipelines run before spider_closed)"""
+        deferred = deferred_from_coro(db_sync_to_async(self.counter_flusher.flush)(self))
+        deferred.addErrback(lambda failure: logger.error(f"Could not flush session counters: {failure.value}"))
+        return deferred
+
     def spider_closed(self, spider):
         logger.info(f"SPIDER CLOSED - Query: {self.query}, Papers: {self.papers_processed}, Saved: {self.papers_saved}, Errors: {self.errors_count}")
+        if self.api_client.cache:
+            logger.info(f"Response cache: {self.api_client.cache.stats()}")
+
+        if self.counter_flusher:
+            if self.counter_loop and self.counter_loop.running:
+                self.counter_loop.stop()
+            return self.flush_counters()
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'channels',
     'rest_framework',
     'corsheaders',
@@ -111,7 +112,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'app.wsgi.application'
-ASGI_APPLICATION = 'asgi.application'
+ASGI_APPLICATION = 'ws.application'
 
 REDIS_LINK = os.getenv('REDIS_LINK', 'redis:6379')
 CHANNEL_LAYERS = {
@@ -162,6 +163,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+OAUTH2_PROVIDER = {
+    'OAUTH2_VALIDATOR_CLASS': 'core.auth.validators.CachedOAuth2Validator',
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
@@ -200,6 +205,26 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = "/static/"
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
+
+# Generated export files go to S3 when a bucket is configured, local media otherwise
+AWS_STORAGE_BUCKET_NAME = os.getenv('AWS_STORAGE_BUCKET_NAME')
+AWS_S3_ENDPOINT_URL = os.getenv('AWS_S3_ENDPOINT_URL')
+AWS_S3_REGION_NAME = os.getenv('AWS_S3_REGION_NAME')
+
+STORAGES = {
+    'default': {
+        'BACKEND': (
+            'storages.backends.s3.S3Storage' if AWS_STORAGE_BUCKET_NAME
+            else 'django.core.files.storage.FileSystemStorage'
+        ),
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -288,6 +313,11 @@ CELERY_TASK_QUEUES = (
         Exchange('scraper.raw-data'),
         routing_key='scraper.raw-data',
     ),
+    Queue(
+        'exports',
+        Exchange('exports'),
+        routing_key='exports',
+    ),
 )
 
 CELERY_TASK_ROUTES = {
@@ -295,4 +325,94 @@ CELERY_TASK_ROUTES = {
         'queue': 'scraper.raw-data',
         'routing_key': 'scraper.raw-data',
     },
-}
\ No newline at end of file
+    'dip.tasks.scrape_shard': {
+        'queue': 'scraper.raw-data',
+        'routing_key': 'scraper.raw-data',
+    },
+    'dip.tasks.finalize_sharded_scrape': {
+        'queue': 'scraper.raw-data',
+        'routing_key': 'scraper.raw-data',
+    },
+    'dip.tasks.refresh_stale_papers': {
+        'queue': 'scraper.raw-data',
+        'routing_key': 'scraper.raw-data',
+    },
+    'dip.tasks.expand_citation_graph': {
+        'queue': 'scraper.raw-data',
+        'routing_key': 'scraper.raw-data',
+    },
+    'dip.tasks.run_export_job': {
+        'queue': 'exports',
+        'routing_key': 'exports',
+    },
+}
+
+# How dip.tasks.scrape_raw_data runs the spider: 'in_process' drives it on a long-lived
+# reactor inside the worker, 'subprocess' forks `manage.py scrape_raw_data` per job
+SCRAPER_EXECUTION_MODE = os.getenv('SCRAPER_EXECUTION_MODE', 'in_process')
+# Sessions spanning several years are split into at most this many year-window shards
+# that run as a Celery chord (see dip.sharding); below 2 disables sharding
+SCRAPER_MAX_SHARDS = int(os.getenv('SCRAPER_MAX_SHARDS', 8))
+# Failed crawls are retried with exponential backoff (seconds) and resume from their
+# checkpoint (see dip.checkpoint); after the last retry the session is marked FAILURE
+SCRAPER_MAX_RETRIES = int(os.getenv('SCRAPER_MAX_RETRIES', 3))
+SCRAPER_RETRY_BACKOFF = int(os.getenv('SCRAPER_RETRY_BACKOFF', 30))
+SCRAPER_RETRY_BACKOFF_MAX = int(os.getenv('SCRAPER_RETRY_BACKOFF_MAX', 600))
+# The scraper worker pool is set in entrypoint.sh by SCRAPER_WORKER_POOL (prefork or threads)
+# and SCRAPER_WORKER_CONCURRENCY; under threads, in-process crawls share one reactor per process
+
+SEMANTIC_SCHOLAR_API_KEY = os.getenv('SEMANTIC_SCHOLAR_API_KEY')
+
+# Token bucket shared by all workers through Redis, per API key. Public API allows
+# 100 requests per 5 minutes, so the sustained rate defaults to one request per 3 seconds.
+SEMANTIC_SCHOLAR_RATE_LIMIT = {
+    'rate': float(os.getenv('SEMANTIC_SCHOLAR_RATE', 1 / 3)),
+    'burst': int(os.getenv('SEMANTIC_SCHOLAR_BURST', 3)),
+}
+
+# Response cache for Semantic Scholar requests: 'redis' (the cache instance above),
+# 'disk' (local SQLite file) or 'none'. TTLs are matched by longest endpoint prefix.
+SEMANTIC_SCHOLAR_CACHE = {
+    'BACKEND': os.getenv('SEMANTIC_SCHOLAR_CACHE_BACKEND', 'redis'),
+    'PATH': os.getenv('SEMANTIC_SCHOLAR_CACHE_PATH', '/tmp/semantic_scholar_cache.sqlite3'),
+    'MAX_BYTES': int(os.getenv('SEMANTIC_SCHOLAR_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    'DEFAULT_TTL': 60 * 60,
+    'TTL': {
+        'paper/search': 6 * 60 * 60,
+        'paper/search/bulk': 60 * 60,
+        'paper/batch': 24 * 60 * 60,
+        'author/batch': 24 * 60 * 60,
+        'paper/': 24 * 60 * 60,
+        'author/': 24 * 60 * 60,
+    },
+}
+
+# Beat refreshes the metrics of stored papers through paper/batch, most overdue first
+# (see dip.refresh). A run may spend API_SHARE of the shared request rate over one
+# SCHEDULE_SECONDS period; intervals follow each paper's citation velocity and age.
+PAPER_REFRESH = {
+    'SCHEDULE_SECONDS': int(os.getenv('PAPER_REFRESH_SCHEDULE_SECONDS', 300)),
+    'API_SHARE': float(os.getenv('PAPER_REFRESH_API_SHARE', 0.1)),
+    'BATCH_SIZE': 500,
+    'TARGET_CITATIONS': 5,
+    'MIN_INTERVAL_DAYS': 1,
+    'MAX_INTERVAL_DAYS': 90,
+    'RECENT_YEARS': 3,
+}
+
+# Citation graph crawl from a session's papers (see dip.citation_graph). FAN_OUT[d] is how
+# many unvisited neighbours are followed from each paper at depth d (the last entry applies
+# deeper), MAX_PAPERS bounds the papers fetched per crawl.
+CITATION_GRAPH = {
+    'MAX_DEPTH': int(os.getenv('CITATION_GRAPH_MAX_DEPTH', 3)),
+    'FAN_OUT': [50, 10, 3],
+    'MAX_PAPERS': int(os.getenv('CITATION_GRAPH_MAX_PAPERS', 5000)),
+    'EDGE_BATCH_SIZE': 5000,
+}
+
+CELERY_BEAT_SCHEDULE = {
+    'refresh-stale-papers': {
+        'task': 'dip.tasks.refresh_stale_papers',
+        'schedule': PAPER_REFRESH['SCHEDULE_SECONDS'],
+    },
+}
@@ -0,0 +1,32 @@
+"""
+ASGI entrypoint served by daphne (``entrypoint.sh websocket``)
+
+WebSocket connections and the SSE progress streams are handled by Channels consumers,
+every other HTTP request falls through to the regular Django application.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+django_asgi_application = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+from django.urls import re_path  # noqa: E402
+
+from dip.middleware import OAuth2TokenAuthMiddleware  # noqa: E402
+from dip.routing import http_urlpatterns, websocket_urlpatterns  # noqa: E402
+
+
+application = ProtocolTypeRouter({
+    'http': URLRouter([
+        *http_urlpatterns,
+        re_path(r'', django_asgi_application),
+    ]),
+    'websocket': AllowedHostsOriginValidator(
+        OAuth2TokenAuthMiddleware(URLRouter(websocket_urlpatterns))
+    ),
+})